@@ -1,17 +1,35 @@
 """ The ALGO module holds the functions for running any of its available pathfinding algorithm (currently Breadth First
-Search and A*) although some variables from the config modules are needed for it to make decisions
-(diago_allowed, algo, path_found...).
-It also holds the Symmetry rectangle class and the algorithm to preprocess a map with rectangular symmetry reduction
-(unfinished)
+Search, Dijkstra, A*, Weighted A*, Greedy Best First Search, ALT, Theta*, Jump Point Search, JPS+, HPA* and D* Lite)
+although some variables from the config modules are needed for it to make decisions (diago_allowed, algo,
+path_found...).
+It also holds the preprocess of a map with rectangular symmetry reduction, the rectangles and jumps are in the rsr
+module.
 """
 from time import perf_counter_ns
 from collections import deque
+from heapq import heappush, heappop
+from itertools import count
+from threading import Event
 from typing import *
 import pygame as pg
 
 import constants as cst
 import classes
 from classes import Node
+from jps import JumpPointSearch, JumpPointSearchPlus, JumpTables, fill_path
+from rsr import SymmetryRectangles, RectangleJumps, get_free_mask
+from hpa import Hierarchy, HierarchicalQuery
+from alt import LandmarkTables, LANDMARK_COUNT
+from dstar import DStarLite
+from theta import LineOfSight, distance, fill_segments
+from flow import FieldCache
+from components import ComponentIndex
+from store import GridStore, StoreSearch
+from graph import CompiledGraph
+from batch import get_path_cost
+
+EPSILON = 0.5  # for Weighted A*, paths cost at most (1 + EPSILON) times the cheapest path
+COST_SCALE = 10  # for the bucket queue, integer cost of a straight move (diagonal moves cost 14)
 
 
 def get_dt(func):
@@ -35,20 +53,60 @@ class PathFinder:
     diago = False
     display = True
     apply_rsr = False
+    bidirectional = False  # for BFS, ASTAR and DIJKSTRA
 
     algo = "bfs"
 
-    dijkstra_cost_so_far = 0
-
-    frontier = []
-    queue = deque()  # for ASTAR
-    to_be_removed = []
+    wall_mask = None  # for JPS, wall_mask[column][row] -> bool
+    jump_tables = {}  # for JPS+, diago -> jps.JumpTables, saved with the grid
+    rectangles = None  # for RSR, rsr.SymmetryRectangles
+    hierarchy = None  # for HPA*, hpa.Hierarchy
+    landmark_tables = None  # for ALT, alt.LandmarkTables, saved with the grid
+    landmark_count = LANDMARK_COUNT
+    replanner = None  # for D* Lite, dstar.DStarLite, kept between wall edits
+    line_of_sight = None  # for THETA*, theta.LineOfSight of the last search
+    epsilon = EPSILON  # for WEIGHTED A*, the heuristic is weighted by 1 + epsilon
+    bucket_queue = False  # for ASTAR and DIJKSTRA, search with integer costs on a bucket queue (see BucketSearch)
+    grid_store = False  # for ASTAR and DIJKSTRA, search on the flat store.GridStore instead of the nodes
+    store = None  # store.GridStore of the walls and weights, kept up to date with edits (see handle_edits)
+    store_engine = None  # for ASTAR and DIJKSTRA on the grid store
+    cost_scale = COST_SCALE  # for the bucket queue, integer cost of a straight move
+
+    time_limit = 0  # ms, the searches run without display stop after it (see search), 0 for no limit
+    expansion_limit = 0  # steps, the searches run without display stop after it (see search), 0 for no limit
+    stopped_early = False  # the last search reached a limit or was cancelled, shortest_path is a partial path
+    cancel_event = None  # threading.Event, set by cancel to stop the search from another thread
+    goals = set()  # END nodes the search stops at (see init_goals)
+    reached_goal = None  # END node the last path leads to
+    flow_fields = None  # flow.FieldCache, distance and flow fields by grid version and goal
+    flow_field = None  # flow.FlowField of the last set_flow_field
+    cost_ratio = 0  # get_cost_ratio of the last Weighted A* or Greedy Best First Search path, set once it is found
+    components = None  # components.ComponentIndex, kept up to date with wall edits (see handle_edits)
+    compiled_graph = True  # searches on the plain neighbors walk graph.CompiledGraph instead of the node dicts
+    graph = None  # graph.CompiledGraph of the neighbors, compiled by set_neighbors
+    lazy_neighbors = False  # the neighbors of a node are set when it is first expanded instead of by set_neighbors
+    lazy_count = 0  # nodes whose neighbors were set on expansion since set_neighbors
+
+    frontier = []  # for BFS, current layer
+    next_frontier = []  # for BFS, layer being built from the current one
+    queue = []  # for ASTAR and DIJKSTRA, binary heap shared with the HeapSearch engine
+    search_engine = None
+    layered_engine = None  # for BFS with RSR
+    bidirectional_engine = None
     shortest_path = []
 
     run_timer = 0
 
     neighbors_prep_dt = 0
     rsr_prep_dt = 0
+    jump_tables_prep_dt = 0
+    hierarchy_prep_dt = 0
+    landmarks_prep_dt = 0
+    replan_dt = 0
+    flow_prep_dt = 0
+    components_prep_dt = 0
+    store_prep_dt = 0
+    graph_prep_dt = 0  # part of neighbors_prep_dt
     algo_dt = 0
 
     def __init__(self, grid: classes.Grid):
@@ -57,14 +115,37 @@ class PathFinder:
         :param grid: associated grid object to apply pathfinding
         """
         self.grid = grid
+        self.flow_fields = FieldCache()
+        self.cancel_event = Event()
+
+    def build_path(self, goal: Optional[Node] = None) -> List:
+        """ Creates the path from end to start (see trace_path) and marks it on the grid
 
-    def build_path(self) -> List:
-        """ Creates the path from end to start by recursively adding node.came_from from end to start and reversing
-        the path"""
+        :param goal: END node the path leads to, grid.end if None
+        :return: path from start to the goal
+        """
 
         self.path_found = True
+        self.reached_goal = goal if goal is not None else self.grid.end
+
+        path = self.trace_path(self.reached_goal)
+
+        for node in path:
+            node.status |= Node.PATH
+            cst.dirty_fills.append(node.get_fill())
 
-        current = self.grid.end
+        return path
+
+    def trace_path(self, node: Node) -> List:
+        """ Creates the path from start to a node by recursively adding node.came_from from the node to start and
+        reversing the path. The moves between jump points, RSR jumps, abstract nodes or any-angle waypoints are filled
+        in.
+
+        :param node: Last node of the path
+        :return: path from start to the node
+        """
+
+        current = node
         path = [current]
 
         while current is not self.grid.start:
@@ -73,19 +154,224 @@ class PathFinder:
 
         path.reverse()
 
-        for node in path:
-            node.status |= Node.PATH
-            cst.dirty_fills.append(node.get_fill())
+        if self.algo == self.hpa:
+            path = self.hierarchy.refine(path)
+        elif self.algo == self.theta:
+            path = fill_segments(path, self.grid.all_nodes, self.line_of_sight)
+        elif self.algo in (self.jps, self.jps_plus) or self.apply_rsr:
+            path = fill_path(path, self.grid.all_nodes, self.diago)
 
         return path
 
+    def get_partial_path(self) -> List:
+        """ Return the path from start to the most promising node reached by a search that was stopped early: the
+        node waiting to be expanded (in the BFS frontier or in the open list) that is the nearest to the goals by the
+        heuristic of A*. The bidirectional searches and D* Lite (which searches from the end) have no partial path.
+
+        :return: path from start to that node, empty if there is none
+        """
+
+        if self.bidirectional_engine or self.replanner:
+            return []
+
+        if self.store_engine:
+            engine = self.store_engine
+            all_nodes = self.grid.all_nodes
+            candidates = {all_nodes[column][row]: index
+                          for index in engine.get_open() for column, row in [self.store.position(index)]}
+            if not candidates:
+                return []
+            last = min(candidates, key=get_goals_heuristic(self.goals, self.diago))
+            return self.trace_path(self.link_store_path(engine.get_path(candidates[last])))
+
+        if self.layered_engine:
+            candidates = [node for layer in self.layered_engine.layers for node in layer]
+        elif self.algo == self.bfs:
+            candidates = self.frontier
+        else:
+            closed = self.search_engine.closed
+            candidates = [entry[-1] for entry in self.queue if entry[-1] not in closed]
+
+        if not candidates:
+            return []
+
+        return self.trace_path(min(candidates, key=get_goals_heuristic(self.goals, self.diago)))
+
+    def cancel(self) -> None:
+        """ Stops the running search at its next step (see search), can be called from another thread
+
+        :return: None
+        """
+        self.cancel_event.set()
+
+    def search(self, time_limit: float = 0, expansion_limit: int = 0) -> List:
+        """ Runs the search set by init_search until it is done, unless it is stopped early: once time_limit ms have
+        passed, after expansion_limit steps (one node is expanded per step, one layer for BFS) or when cancel is called.
+        The limits are checked between steps, 0 means no limit. A search stopped early is over (path_found is set)
+        with stopped_early set and the partial path to the most promising node as shortest_path (see
+        get_partial_path).
+
+        :param time_limit: Wall-clock time limit (ms)
+        :param expansion_limit: Maximum number of steps
+        :return: The path found, the partial path if stopped early, empty if there is no path
+        """
+
+        deadline = perf_counter_ns() + time_limit * 10 ** 6 if time_limit else None
+        steps = 0
+
+        while not self.path_found:
+            if self.cancel_event.is_set() or deadline and perf_counter_ns() >= deadline \
+                    or expansion_limit and steps >= expansion_limit:
+                self.stopped_early = True
+                self.path_found = True
+                self.shortest_path = self.get_partial_path()
+                for node in self.shortest_path:
+                    node.status |= Node.PATH
+                    cst.dirty_fills.append(node.get_fill())
+                pg.event.post(pg.event.Event(cst.NO_PATH, announcement="Search stopped, partial path shown"))
+                break
+
+            self.algo_dt += self.algo()
+            steps += 1
+
+        return self.shortest_path
+
     @get_dt
     def set_neighbors(self):
+        """ Sets the neighbors of every free node and the wall mask. With lazy_neighbors the neighbors are only
+        cleared, get_lazy_neighbors sets them when a node is first expanded and keeps them until the next call
+
+        :return: None
+        """
         for column in self.grid.all_nodes:
             for node in column:
-                if not node.status & (Node.SYM_RECT | Node.WALL):
+                if self.lazy_neighbors:
+                    node.neighbors = None
+                elif not node.status & (Node.SYM_RECT | Node.WALL):
                     node.get_neighbors(self.grid.all_nodes, self.diago)
 
+        self.wall_mask = [[bool(node.status & Node.WALL) for node in column] for column in self.grid.all_nodes]
+        self.lazy_count = 0
+
+        self.graph = None
+        if self.compiled_graph and not self.lazy_neighbors:
+            self.graph_prep_dt = self.set_graph()
+
+    def get_lazy_neighbors(self, node: Node) -> List[Tuple[Node, float]]:
+        """ Returns the passable neighbors of a node, setting them first if the node has none yet (lazy_neighbors).
+        Used as the successors of the searches on the plain neighbors in lazy mode
+
+        :param node: Expanded node
+        :return: (neighbor, cost) list
+        """
+        if node.neighbors is None:
+            node.get_neighbors(self.grid.all_nodes, self.diago)
+            self.lazy_count += 1
+        return node.get_passable_neighbors()
+
+    @get_dt
+    def set_graph(self) -> None:
+        """ Compiles the neighbors set by set_neighbors into CSR arrays (see graph.CompiledGraph), walked by the
+        searches on the plain neighbors (A*, Weighted A*, Greedy, Dijkstra, ALT and BFS) instead of the node dicts
+
+        :return: None
+        """
+        self.graph = CompiledGraph(self.grid.all_nodes)
+
+    @get_dt
+    def set_components(self) -> None:
+        """ Labels the connected components of the free cells, unless the labels already match the walls (they are
+        updated by handle_edits when walls are drawn or erased)
+
+        :return: None
+        """
+        if self.components is None or not self.components.matches(self.wall_mask):
+            self.components = ComponentIndex(self.wall_mask)
+
+    @get_dt
+    def set_jump_tables(self) -> None:
+        """ Computes the JPS+ jump distance tables for the current walls, unless the tables already computed (or
+        loaded with the grid) still match them. Needs the wall mask from set_neighbors.
+
+        :return: None
+        """
+        tables = self.jump_tables.get(self.diago)
+        if tables is None or not tables.matches(self.wall_mask, self.diago):
+            self.jump_tables = {**self.jump_tables, self.diago: JumpTables(self.wall_mask, self.diago)}
+
+    @get_dt
+    def set_hierarchy(self) -> None:
+        """ Builds the HPA* abstract graph for the current walls and weights, unless the one already built still
+        matches them. Needs the wall mask from set_neighbors.
+
+        :return: None
+        """
+        if self.hierarchy is None or not self.hierarchy.matches(self.grid.all_nodes, self.wall_mask, self.diago):
+            self.hierarchy = Hierarchy(self.grid.all_nodes, self.wall_mask, self.diago)
+
+    @get_dt
+    def set_store(self) -> None:
+        """ Fills the flat grid store with the walls and weights, unless it was filled for the grid version (it is
+        updated by handle_edits when cells are edited). Needs the wall mask from set_neighbors.
+
+        :return: None
+        """
+        if self.store is None or not self.store.matches(self.grid.version):
+            weights = [[node.weight for node in column] for column in self.grid.all_nodes]
+            self.store = GridStore(self.wall_mask, weights, self.grid.version)
+
+    @get_dt
+    def set_landmark_tables(self) -> None:
+        """ Selects the ALT landmarks and computes their distance tables for the current walls and weights, unless the
+        tables already computed (or loaded with the grid) still match them. Needs the wall mask from set_neighbors.
+
+        :return: None
+        """
+        weights = [[node.weight for node in column] for column in self.grid.all_nodes]
+        tables = self.landmark_tables
+        if tables is None or not tables.matches(self.wall_mask, weights, self.diago, self.landmark_count):
+            self.landmark_tables = LandmarkTables(self.wall_mask, weights, self.diago, self.landmark_count,
+                                                  (self.grid.start.column, self.grid.start.row))
+
+    @get_dt
+    def set_flow_field(self, goal: Optional[Node] = None) -> None:
+        """ Gets the distance and flow fields to the goal for the current walls, weights and diagonal setting. They
+        are computed with one reverse Dijkstra and cached until the grid is edited (see flow.FieldCache), any start
+        then reads its path from them with get_field_path, without a search.
+
+        :param goal: Goal node, grid.end if None
+        :return: None
+        """
+        goal = goal if goal is not None else self.grid.end
+        self.flow_field = self.flow_fields.get(self.grid.version, self.grid.all_nodes,
+                                               lambda node: node.status & Node.WALL, self.diago, goal)
+
+    def get_field_path(self, start: Optional[Node] = None) -> List:
+        """ Return the path from start to the goal of the last set_flow_field, following the flow field
+
+        :param start: Starting node, grid.start if None
+        :return: Nodes from start to the goal, empty if there is no path
+        """
+        return self.flow_field.get_path(start if start is not None else self.grid.start)
+
+    def get_cost_ratio(self) -> float:
+        """ Return the cost of the path found over the cost of a cheapest path to the goals: 1 for the optimal
+        algorithms, at most 1 + epsilon for Weighted A*. The cheapest cost is read from one distance field seeded with
+        all the goals, cached for the grid version (see set_flow_field). Theta* paths are measured through the cells
+        they cross. It costs a reverse Dijkstra over the grid for each grid version, so run only stores it in
+        cost_ratio for Weighted A* and Greedy Best First Search, the algorithms whose paths may cost more.
+
+        :return: cost ratio, 0 if no path was found or the search was stopped early
+        """
+
+        if not self.shortest_path or self.stopped_early:
+            return 0
+
+        is_wall = lambda node: node.status & Node.WALL
+        optimal = self.flow_fields.get(self.grid.version, self.grid.all_nodes, is_wall, self.diago, self.goals) \
+            .get_distance(self.grid.start)
+        return get_path_cost(self.shortest_path) / optimal if optimal else 1
+
     def init_search(self) -> None:
         """ Initializes all search algorithms, by setting neighbors on the grid and setting starting point and applying
         Rectangular Symmetry Reduction if activated.
@@ -96,7 +382,15 @@ class PathFinder:
         algorithms = {
             "bfs": self.bfs,
             "astar": self.astar,
-            "dijkstra": self.dijkstra
+            "weighted_astar": self.weighted_astar,
+            "greedy": self.greedy,
+            "alt": self.alt,
+            "theta": self.theta,
+            "dijkstra": self.dijkstra,
+            "jps": self.jps,
+            "jps_plus": self.jps_plus,
+            "hpa": self.hpa,
+            "dstar": self.dstar
         }
         if isinstance(self.algo, str):
             self.algo = algorithms[self.algo]
@@ -105,14 +399,253 @@ class PathFinder:
             self.rsr_prep_dt = self.apply_RSR()
 
         self.neighbors_prep_dt = self.set_neighbors()
+        self.components_prep_dt = self.set_components()
+
+        if self.algo == self.jps_plus:
+            self.jump_tables_prep_dt = self.set_jump_tables()
+
+        if self.algo == self.hpa:
+            self.hierarchy_prep_dt = self.set_hierarchy()
+
+        if self.algo == self.alt:
+            self.landmarks_prep_dt = self.set_landmark_tables()
+
+        if self.grid_store and self.algo in (self.astar, self.dijkstra):
+            self.store_prep_dt = self.set_store()
 
         # Init all algorithms
+        self.stopped_early = False
+        self.cancel_event.clear()
         self.grid.start.status |= Node.VISITED
-        self.frontier.append(self.grid.start)
-        self.queue.append((self.grid.start, self.grid.start.priority))
+        self.frontier = [self.grid.start]
+        self.next_frontier = []
+        self.init_goals()
+        self.init_heap_search()
+        self.init_bidirectional_search()
+        self.init_replanner()
+
+        if self.goals_unreachable():
+            pg.event.post(pg.event.Event(cst.NO_PATH, announcement="No path found!"))
+            self.path_found = True
 
+        self.cost_ratio = 0
         self.search_is_init = True
 
+    def init_goals(self) -> None:
+        """ Sets the END nodes the search stops at. The one sided BFS, Dijkstra, A* and Theta* stop at the first of
+        grid.end and grid.extra_ends they reach, which is the nearest one (Weighted A* and Greedy Best First Search
+        stop at the first one too), the other algorithms only search for grid.end
+
+        :return: None
+        """
+
+        self.reached_goal = None
+        self.goals = {self.grid.end}
+
+        if self.algo in (self.bfs, self.dijkstra, self.astar, self.weighted_astar, self.greedy, self.theta) \
+                and not self.bidirectional:
+            self.goals.update(self.grid.extra_ends)
+
+    def goals_unreachable(self) -> bool:
+        """ Return True if no goal is in the connected component of the start node, there is then no path and no
+        need to search. Needs the component index from set_components.
+
+        :return: unreachable
+        """
+        return not any(self.components.connected(self.grid.start, goal) for goal in self.goals)
+
+    def get_rectangle_jumps(self, count_moves: bool = False) -> RectangleJumps:
+        """ Return the successor generator jumping across the RSR rectangles for the current start and goals
+
+        :param count_moves: Costs are numbers of moves (for BFS) instead of distances
+        :return: RectangleJumps object
+        """
+        return RectangleJumps(self.rectangles, self.grid.all_nodes, (self.grid.start, *self.goals), self.diago,
+                              count_moves, self.get_lazy_neighbors if self.lazy_neighbors else None)
+
+    def init_heap_search(self) -> None:
+        """ Creates the HeapSearch engine used by A*, Weighted A* (A* with the heuristic weighted by 1 + epsilon),
+        Greedy Best First Search (the heuristic alone), ALT (A* with the landmark heuristic), Theta* (any-angle A*),
+        Dijkstra (A* without heuristic), JPS/JPS+ (A* on jump points) and HPA* (A* on the abstract graph), the
+        BucketSearch engine used instead by A* and Dijkstra with self.bucket_queue (Dial's buckets, integer costs),
+        the StoreSearch engine used instead by A* and Dijkstra with self.grid_store (flat arrays, RSR is ignored) and
+        the LayeredSearch engine used by BFS with RSR
+
+        :return: None
+        """
+
+        successors = self.get_lazy_neighbors if self.lazy_neighbors else None
+        self.layered_engine = None
+        self.store_engine = None
+
+        if self.algo == self.dijkstra:
+            heuristic = lambda node: 0
+        elif self.algo == self.alt:
+            heuristic = self.landmark_tables.get_heuristic(self.grid.end, get_heuristic(self.grid.end, self.diago))
+        else:
+            heuristic = get_goals_heuristic(self.goals, self.diago)
+
+        if self.algo == self.weighted_astar:
+            goals_heuristic, weight = heuristic, 1 + self.epsilon
+            heuristic = lambda node: weight * goals_heuristic(node)
+
+        if self.algo == self.jps:
+            successors = JumpPointSearch(self.grid.all_nodes, self.wall_mask, self.grid.end, self.diago).successors
+        elif self.algo == self.jps_plus:
+            successors = JumpPointSearchPlus(self.grid.all_nodes, self.jump_tables[self.diago],
+                                             self.grid.end).successors
+        elif self.algo == self.hpa:
+            successors = HierarchicalQuery(self.hierarchy, self.grid.start, self.grid.end).successors
+        elif self.apply_rsr:
+            successors = self.get_rectangle_jumps().successors
+
+        if self.bucket_queue and self.algo in (self.astar, self.dijkstra):
+            if self.algo == self.astar:
+                heuristic = get_integer_heuristic(self.goals, self.diago, self.cost_scale)
+            self.search_engine = BucketSearch(self.grid.start, heuristic, successors, self.cost_scale, self.graph)
+        elif self.algo == self.theta:
+            goals = self.goals
+            self.line_of_sight = LineOfSight(self.wall_mask)
+            heuristic = lambda node: min(distance(node, goal) for goal in goals)
+            self.search_engine = ThetaStarSearch(self.grid.start, heuristic, self.line_of_sight, successors,
+                                                 self.graph)
+        elif self.algo == self.greedy:
+            self.search_engine = GreedySearch(self.grid.start, heuristic, successors, self.graph)
+        else:
+            self.search_engine = HeapSearch(self.grid.start, heuristic, successors, self.graph)
+        self.queue = self.search_engine.queue
+
+        if self.algo == self.bfs and self.apply_rsr:
+            self.layered_engine = LayeredSearch(self.grid.start, self.get_rectangle_jumps(True).successors)
+
+        if self.grid_store and self.algo in (self.astar, self.dijkstra):
+            self.store_engine = StoreSearch(self.store, self.grid.start, self.goals, self.diago,
+                                            self.algo == self.astar)
+
+    def init_bidirectional_search(self) -> None:
+        """ Creates the bidirectional engine if the bidirectional variant of BFS, A* or Dijkstra is used (not with the
+        bucket queue or the grid store)
+
+        :return: None
+        """
+
+        self.bidirectional_engine = None
+
+        if not self.bidirectional:
+            return
+
+        start, end = self.grid.start, self.grid.end
+        if self.apply_rsr:
+            successors = self.get_rectangle_jumps().successors
+        else:
+            successors = self.get_lazy_neighbors if self.lazy_neighbors else None
+
+        # RSR jumps span several moves, BFS then uses the one sided LayeredSearch
+        if self.algo == self.bfs and not self.apply_rsr:
+            self.bidirectional_engine = BidirectionalBFS(start, end, successors, self.graph)
+        elif self.algo == self.dijkstra and not (self.bucket_queue or self.grid_store):
+            self.bidirectional_engine = BidirectionalHeapSearch(start, end, lambda node: 0, lambda node: 0,
+                                                                successors, self.graph)
+        elif self.algo == self.astar and not (self.bucket_queue or self.grid_store):
+            self.bidirectional_engine = BidirectionalHeapSearch(start, end, get_heuristic(end, self.diago),
+                                                                get_heuristic(start, self.diago), successors,
+                                                                self.graph)
+
+        if self.bidirectional_engine is not None:
+            end.status |= Node.VISITED_BACK
+
+    def init_replanner(self) -> None:
+        """ Creates the D* Lite search state if D* Lite is used, it needs the wall mask from set_neighbors
+
+        :return: None
+        """
+
+        self.replanner = None
+
+        if self.algo == self.dstar:
+            weights = [[node.weight for node in column] for column in self.grid.all_nodes]
+            self.replanner = DStarLite(self.grid.all_nodes, self.wall_mask, weights, self.diago, self.grid.start,
+                                       self.grid.end)
+
+    def bidirectional_step(self) -> None:
+        """ Does one step of the bidirectional engine, nodes visited from the start and from the end are drawn in
+        different colors. Builds the path (or posts no path found) once the engine is done.
+
+        :return: None
+        """
+
+        engine = self.bidirectional_engine
+
+        if not engine.done:
+            for node, forward in engine.step():
+                node.status |= Node.VISITED if forward else Node.VISITED_BACK
+                if self.display:
+                    cst.dirty_fills.append(node.get_fill())
+
+        if engine.done:
+            if engine.meeting is None:
+                pg.event.post(pg.event.Event(cst.NO_PATH, announcement="No path found!"))
+                self.path_found = True
+            else:
+                engine.link_path()
+                self.shortest_path = self.build_path()
+
+    def handle_edits(self, nodes: List[Node]) -> None:
+        """ Passes the cells edited on the grid (walls drawn or erased, weights changed) to the component index, the
+        grid store and to D* Lite, which repairs its path instead of searching again. The other algorithms need a reset
+        of the search for edits to be taken into account.
+
+        :param nodes: Edited nodes
+        :return: None
+        """
+        if self.components is not None:
+            for node in nodes:
+                self.components.update_cell(node.column, node.row, node.status & Node.WALL)
+
+        if self.store is not None:
+            # The edit moved the grid one version forward, a store that was already out of date (grid reset, loaded
+            # or resized) is dropped and rebuilt by set_store
+            if self.store.matches(self.grid.version - 1):
+                for node in nodes:
+                    self.store.update_cell(node.column, node.row, node.status & Node.WALL, node.weight)
+                self.store.version = self.grid.version
+            else:
+                self.store = None
+
+        if self.search_is_init and self.algo == self.dstar:
+            self.replan_dt = self.replan(nodes)
+
+    @get_dt
+    def replan(self, nodes: List[Node]) -> None:
+        """ Updates the D* Lite search state with edited cells and repairs the path if it was already found, only the
+        nodes whose cost to the end changed are expanded again. If the first search is still running, it goes on with
+        the new costs.
+
+        :param nodes: Edited nodes
+        :return: None
+        """
+
+        for node in self.shortest_path:
+            node.status &= ~Node.PATH
+            cst.dirty_fills.append(node.get_fill())
+        self.shortest_path = []
+
+        for node in nodes:
+            self.replanner.update_cell(node.column, node.row, bool(node.status & Node.WALL), node.weight)
+
+        if not self.path_found:
+            return
+
+        while not self.replanner.done:
+            node = self.replanner.step()
+            if node is not None:
+                node.status |= Node.VISITED
+                if self.display:
+                    cst.dirty_fills.append(node.get_fill())
+
+        if self.replanner.link_path():
+            self.shortest_path = self.build_path()
+
     def check_done(self) -> bool:
         """ Checks if the queue/frontier is empty, if it is, post a no path found event and terminate processing
         timer.
@@ -125,92 +658,254 @@ class PathFinder:
             self.path_found = True
         return self.path_found
 
-    def clean_frontier(self) -> None:
-        """ Remove processed nodes from the frontier
-        """
-        for node in self.to_be_removed:
-            if node in self.frontier:
-                self.frontier.remove(node)
-        self.to_be_removed.clear()
-
-    def expand_frontier(self, node: classes.Node, costs: bool = False) -> None:
-        """ Adds the available neighbors of the nodes to the frontier and marks the current node as visited
+    def expand_frontier(self, node: classes.Node) -> Optional[Node]:
+        """ Adds the available neighbors of the node to the next frontier layer and marks them as visited
 
         :param node: current node
-        :param costs: True if the algorithm needs to know the cost_so_far of each node (Dijkstra)
-        :return:
+        :return: The END node reached (it is not added to the next layer), None if no END node was reached
         """
 
-        for neighbor, cost in node.get_available_neighbors(self.grid.all_nodes):
-            if costs:
-                neighbor.cost_so_far = node.cost_so_far + cost
+        goals = self.goals
+
+        if self.graph is not None:
+            graph = self.graph
+            targets = graph.targets
+            index = node.column * graph.height + node.row
+            for edge in range(graph.offsets[index], graph.offsets[index + 1]):
+                neighbor = targets[edge]
+                if neighbor.status & (Node.WALL | Node.VISITED):
+                    continue
+                neighbor.status |= Node.VISITED
+                neighbor.came_from = node
+                if neighbor in goals:
+                    return neighbor
+                self.next_frontier.append(neighbor)
+
+            return None
+
+        if node.neighbors is None and self.lazy_neighbors:
+            node.get_neighbors(self.grid.all_nodes, self.diago)
+            self.lazy_count += 1
+
+        for neighbor, cost in node.get_available_neighbors():
             neighbor.status |= Node.VISITED
-            self.frontier.append(neighbor)
             neighbor.came_from = node
+            if neighbor in goals:
+                return neighbor
+            self.next_frontier.append(neighbor)
+
+        return None
+
+    def layered_bfs(self) -> None:
+        """ Does one layer of the BFS on a grid reduced by RSR (see LayeredSearch), the path is built once an END
+        node is expanded
+
+        :return: None
+        """
+
+        engine = self.layered_engine
+
+        if not engine.layers:
+            pg.event.post(pg.event.Event(cst.NO_PATH, announcement="No path found!"))
+            self.path_found = True
+            return
+
+        goal = None
+
+        for node in engine.step():
+            node.status |= Node.VISITED
+            if self.display:
+                cst.dirty_fills.append(node.get_fill())
+            if node in self.goals:
+                goal = node
+
+        if goal is not None:
+            self.shortest_path = self.build_path(goal)
 
     @get_dt
     def bfs(self) -> None:
-        """ Does a breadth first search (flood fill) on self.grid
-         Not compatible with RSR (path will not be optimal)
+        """ Does a level synchronous breadth first search (flood fill) on self.grid, one layer is expanded per call.
+         The next layer is built in a second list and the two are swapped, so processed nodes never need to be removed
+         from the frontier. Stops as soon as the end node is generated. Cell weights are ignored.
+         With self.bidirectional, BidirectionalBFS expands a layer from the start or from the end per call instead.
+         With RSR, jumps across rectangles span several layers so LayeredSearch is used instead (see layered_bfs)
 
         :return: None
         """
 
+        if self.bidirectional_engine:
+            return self.bidirectional_step()
+
+        if self.layered_engine:
+            return self.layered_bfs()
+
         if self.check_done():
             return
 
-        self.clean_frontier()
+        for node in self.frontier:
+            if self.display:
+                cst.dirty_fills.append(node.get_fill())
 
-        for node_no in range(len(self.frontier)):
-            node = self.frontier[node_no]
-            if node is self.grid.end:   # Could change this to use node.status
-                self.shortest_path = self.build_path()
+            goal = self.expand_frontier(node)
+            if goal is not None:
+                self.shortest_path = self.build_path(goal)
+                return
 
-            self.to_be_removed.append(node)
+        self.frontier, self.next_frontier = self.next_frontier, self.frontier
+        self.next_frontier.clear()
 
-            if self.display:
-                cst.dirty_fills.append(node.get_fill())
+    def link_store_path(self, positions: List[Tuple[int, int]]) -> Node:
+        """ Writes node.came_from along a path of (column, row) positions found on the grid store, so it can be
+        walked like the paths of the other engines (see trace_path)
+
+        :param positions: Positions from start to the last node
+        :return: The last node
+        """
+
+        all_nodes = self.grid.all_nodes
+        previous = None
+        for column, row in positions:
+            node = all_nodes[column][row]
+            node.came_from = previous
+            previous = node
+        return previous
+
+    def store_step(self) -> None:
+        """ Expands one cell of A* or Dijkstra on the flat grid store (see store.StoreSearch), the path is built once
+        a goal is reached. Nodes are only used to draw the expanded cells and the path
+
+        :return: None
+        """
+
+        engine = self.store_engine
+
+        if engine.done:
+            pg.event.post(pg.event.Event(cst.NO_PATH, announcement="No path found!"))
+            self.path_found = True
+            return
+
+        index = engine.step()
+        if index is None:
+            return
+
+        column, row = self.store.position(index)
+        node = self.grid.all_nodes[column][row]
+        node.status |= Node.VISITED
+        if self.display:
+            cst.dirty_fills.append(node.get_fill())
 
-            self.expand_frontier(node)
+        if engine.goal is not None:
+            self.shortest_path = self.build_path(self.link_store_path(engine.get_path()))
 
     @get_dt
     def dijkstra(self) -> None:
-        """ Dijkstra's Algorithm (weighted flood fill). This one could work with weighed graphs and is compatible
-        with RSR
+        """ Dijkstra's Algorithm (weighted flood fill), one node is expanded per call (see HeapSearch).
+        Each node is popped once in order of cost, so it works with weighted cells (Node.weight) and is compatible
+        with RSR. With self.bidirectional, BidirectionalHeapSearch expands a node from either end per call
 
         :return: None
         """
 
-        if self.diago:
-            self.dijkstra_cost_so_far += 1.41422
-        else:
-            self.dijkstra_cost_so_far += 1
+        if self.store_engine:
+            return self.store_step()
+
+        if self.bidirectional_engine:
+            return self.bidirectional_step()
 
         if self.check_done():
             return
 
-        self.clean_frontier()
+        node = self.search_engine.step()
+        if node is None:  # Only stale entries were left in the queue
+            return
 
-        for node_no in range(len(self.frontier)):
-            node = self.frontier[node_no]
+        node.status |= Node.VISITED
+        if self.display:
+            cst.dirty_fills.append(node.get_fill())
 
-            if not node.cost_so_far <= self.dijkstra_cost_so_far:
-                continue
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
 
-            if node is self.grid.end:
-                self.shortest_path = self.build_path()
+    @get_dt
+    def astar(self) -> None:
+        """ Does A* algorithm on self.grid, one node is expanded per call (see HeapSearch)
+        Compatible with RSR and weighted cells. With self.bidirectional, BidirectionalHeapSearch expands a node from
+        either end per call
 
-            if self.display:
-                cst.dirty_fills.append(node.get_fill())
+        :return: None
+        """
+
+        if self.store_engine:
+            return self.store_step()
+
+        if self.bidirectional_engine:
+            return self.bidirectional_step()
 
-            self.to_be_removed.append(node)
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+        if node is None:  # Only stale entries were left in the queue
+            return
+
+        node.status |= Node.VISITED
+        if self.display:
+            cst.dirty_fills.append(node.get_fill())
 
-            self.expand_frontier(node, True)
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
 
     @get_dt
-    def astar(self) -> None:
-        """ Does A* algorithm on self.grid
-        Compatible with RSR
+    def weighted_astar(self) -> None:
+        """ Does Weighted A* on self.grid, one node is expanded per call (see HeapSearch). The heuristic of A* is
+        weighted by 1 + self.epsilon, so the search heads to the end sooner and expands less nodes, the path found costs
+        at most 1 + epsilon times the cheapest one. Compatible with RSR and weighted cells
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+        if node is None:  # Only stale entries were left in the queue
+            return
+
+        node.status |= Node.VISITED
+        if self.display:
+            cst.dirty_fills.append(node.get_fill())
+
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
+
+    @get_dt
+    def greedy(self) -> None:
+        """ Does Greedy Best First Search on self.grid, one node is expanded per call (see GreedySearch). Nodes are
+        expanded in order of the A* heuristic alone, it is the fastest to reach the end but the path has no cost bound.
+        Compatible with RSR and weighted cells
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+        if node is None:  # Only stale entries were left in the queue
+            return
+
+        node.status |= Node.VISITED
+        if self.display:
+            cst.dirty_fills.append(node.get_fill())
+
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
+
+    @get_dt
+    def alt(self) -> None:
+        """ Does A* on self.grid with the landmark heuristic of alt.LandmarkTables, one node is expanded per call (see
+        HeapSearch). The triangle inequality bounds see the walls between a node and the end, so far less nodes are
+        expanded than with the octile distance on maze-like maps. Compatible with RSR and weighted cells
 
         :return: None
         """
@@ -218,49 +913,146 @@ class PathFinder:
         if self.check_done():
             return
 
-        node = self.queue.popleft()[0]
+        node = self.search_engine.step()
+        if node is None:  # Only stale entries were left in the queue
+            return
 
+        node.status |= Node.VISITED
         if self.display:
             cst.dirty_fills.append(node.get_fill())
 
         if node is self.grid.end:
             self.shortest_path = self.build_path()
 
-        for neighbor, cost in node.get_available_neighbors(self.grid.all_nodes):
-            neighbor.status |= Node.VISITED
-            neighbor.came_from = node
-            neighbor.cost_so_far = node.cost_so_far + cost
+    @get_dt
+    def theta(self) -> None:
+        """ Does Theta* on self.grid, one node is expanded per call (see ThetaStarSearch). Nodes are linked to any
+        node they see in a straight line, so the path is made of any-angle segments, drawn with the nodes they cross.
+        Compatible with RSR, cell weights are ignored (costs are straight line distances)
 
-            if self.diago:
-                # Octile distance (45 degrees diagonals only)
-                dx = abs(neighbor.column - self.grid.end.column)
-                dy = abs(neighbor.row - self.grid.end.row)
-                neighbor.heuristic = dx + dy + (1.41421 - 2) * min(dx, dy)
+        :return: None
+        """
 
-            else:
-                neighbor.heuristic = abs(self.grid.end.row - neighbor.row) + \
-                                     abs(self.grid.end.column - neighbor.column)
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+        if node is None:  # Only stale entries were left in the queue
+            return
+
+        node.status |= Node.VISITED
+        if self.display:
+            cst.dirty_fills.append(node.get_fill())
+
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
+
+    @get_dt
+    def jps(self) -> None:
+        """ Does Jump Point Search on self.grid, one jump point is expanded per call (see jps.JumpPointSearch).
+        Only for uniform cost grids: RSR and cell weights are ignored. The path is filled between jump points so it
+        has the same length as the A* one
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+        if node is None:  # Only stale entries were left in the queue
+            return
+
+        node.status |= Node.VISITED
+        if self.display:
+            cst.dirty_fills.append(node.get_fill())
+
+        if node is self.grid.end:
+            self.shortest_path = self.build_path()
+
+    @get_dt
+    def jps_plus(self) -> None:
+        """ Does JPS+ on self.grid: Jump Point Search reading its jumps from the precomputed jps.JumpTables instead of
+        scanning the grid. One jump point is expanded per call, RSR and cell weights are ignored.
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+        if node is None:  # Only stale entries were left in the queue
+            return
+
+        node.status |= Node.VISITED
+        if self.display:
+            cst.dirty_fills.append(node.get_fill())
+
+        if node is self.grid.end:
+            self.shortest_path = self.build_path()
+
+    @get_dt
+    def hpa(self) -> None:
+        """ Does HPA* on self.grid: A* on the abstract graph of hpa.Hierarchy, one abstract node (cluster entrance) is
+        expanded per call. The abstract path is refined inside each cluster once the end is reached, it can be a bit
+        longer than the A* one. RSR is ignored, cell weights are supported
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+        if node is None:  # Only stale entries were left in the queue
+            return
+
+        node.status |= Node.VISITED
+        if self.display:
+            cst.dirty_fills.append(node.get_fill())
 
-            # This is to reduce comparison between ints and floats while keeping some precision
-            neighbor.priority = neighbor.cost_so_far + neighbor.heuristic
+        if node is self.grid.end:
+            self.shortest_path = self.build_path()
+
+    @get_dt
+    def dstar(self) -> None:
+        """ Does D* Lite on self.grid (see dstar.DStarLite), one node is expanded per call, from the end towards the
+        start. Its search state is kept once the path is found, so walls and weights edited afterwards only make it
+        repair the path (see replan). RSR is ignored, cell weights are supported
 
-            index = bisect_left(self.queue, neighbor.priority, key=lambda x: x[1])
-            self.queue.insert(index, (neighbor, neighbor.priority))
+        :return: None
+        """
+
+        if not self.replanner.done:
+            node = self.replanner.step()
+            if node is not None:
+                node.status |= Node.VISITED
+                if self.display:
+                    cst.dirty_fills.append(node.get_fill())
+            return
+
+        if self.replanner.link_path():
+            self.shortest_path = self.build_path()
+        else:
+            pg.event.post(pg.event.Event(cst.NO_PATH, announcement="No path found!"))
+            self.path_found = True
 
-    def symmetry_rectangle(self, start: classes.Node, size: int) -> None:
-        """Simulates an object creation by defining the nodes inside the square as borders or sym_rect if they are
-        contained in the borders. This allows to skip neighbors when we are running our pathfinding algorithm.
-        This applies on nodes in cst.all_nodes.
+    def symmetry_rectangle(self, left: int, top: int, right: int, bottom: int) -> None:
+        """Marks the nodes of a rectangle as borders, or sym_rect if they are contained in the borders. Sym_rect nodes
+        get no neighbors, the searches jump over them (see rsr.RectangleJumps).
 
-        :param start: Top-left node of the square
-        :param size: Length of a side of the square
+        :param left: First column of the rectangle
+        :param top: First row of the rectangle
+        :param right: Last column of the rectangle
+        :param bottom: Last row of the rectangle
         :return: None"""
 
-        for column in range(size):
-            for row in range(size):
-                node = self.grid.all_nodes[start.column + column][start.row + row]
+        for column in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                node = self.grid.all_nodes[column][row]
 
-                if row == 0 or row == size - 1 or column == 0 or column == size - 1:
+                if row in (top, bottom) or column in (left, right):
                     node.status |= Node.BORDER
                 else:
                     node.status |= Node.SYM_RECT
@@ -270,52 +1062,25 @@ class PathFinder:
 
     @get_dt
     def apply_RSR(self) -> None:
-        """Applies Rectangular symmetry reduction to self.grid, regrouping any square of free nodes (not walls)
-        together, square sides must be atleast 4, or it will be skipped.
+        """Applies Rectangular symmetry reduction to self.grid: free nodes are decomposed into maximal empty rectangles
+        (see rsr.SymmetryRectangles), sides must be atleast rsr.MIN_SIZE. The start and end nodes can be inside of a
+        rectangle, the searches then link them to its borders.
         :return: None"""
 
-        # It would be nice to be able to prevent it from trying to apply RSR to nodes that have already been RSR'd...
-        # But using a flat copy of cst.all_nodes takes too much time to process.
-        # Also, it is slow even while the algorithms are running...
+        # Weighted cells are left out, jumping through a rectangle assumes every node inside costs the same
+        free_mask = get_free_mask(self.grid.all_nodes, lambda node: not node.status & Node.WALL and node.weight == 1)
+        self.rectangles = SymmetryRectangles(free_mask)
 
-        check_free = lambda x: x.status & (Node.WALL | Node.BORDER |
-                                       Node.SYM_RECT | Node.START | Node.END)
-
-        for column in self.grid.all_nodes:
-            for start in column:
-                if not check_free(start):
-                    start_col, start_row = start.column, start.row
-                    size = 1
-                    hit_wall = False
-
-                    while not hit_wall:
-                        size += 1
-
-                        # Look at new border (lower and right)
-                        try:
-                            for add in range(size):
-                                node = self.grid.all_nodes[start_col + size - 1][start_row + add]
-                                if check_free(node):
-                                    hit_wall = True
-                                    break
-
-                                node = self.grid.all_nodes[start_col + add][start_row + size - 1]
-                                if check_free(node):
-                                    hit_wall = True
-                                    break
-                        except IndexError:
-                            break
-
-                    size -= 1
-                    if size >= 4:
-                        self.symmetry_rectangle(start, size)
+        for rectangle in self.rectangles.rectangles:
+            self.symmetry_rectangle(*rectangle)
 
     def run(self, run_time: int = 0, wait_time: int = 0) -> None:
         """
         Procedure to run the algorithm chosen in init_search.
         Note: running display steps as True with run_interval = -1 will loop chosen algorithm until a path
         is found (or no path) and show visited nodes, whereas setting display steps to False will loop until a
-        path is found (or no path) but won't show visited nodes.
+        path is found (or no path) but won't show visited nodes. Both loops stop early at self.time_limit or
+        self.expansion_limit (see search).
 
         :param run_time: Define how much time the algorithm will spend searching before going to the next frame
         :param wait_time: Define time(ms) the algorithm will wait after searching before going to the next frame
@@ -325,9 +1090,7 @@ class PathFinder:
         if not self.path_found:
 
             if not self.display or run_time == -1:
-
-                while not self.path_found:
-                    self.algo_dt += self.algo()
+                self.search(self.time_limit, self.expansion_limit)
 
             elif run_time == 0 and wait_time == 0:
                 self.algo_dt += self.algo()
@@ -352,6 +1115,9 @@ class PathFinder:
                 while pg.time.get_ticks() < self.run_timer and not self.path_found:
                     self.algo_dt += self.algo()
 
+            if self.path_found and self.algo in (self.weighted_astar, self.greedy):
+                self.cost_ratio = self.get_cost_ratio()
+
 
 def init_pathfinder(grid: classes.Grid) -> PathFinder:
     """ Initialises the Singleton pathfinder object, needs an associated grid object to apply algorithms on
@@ -361,34 +1127,684 @@ def init_pathfinder(grid: classes.Grid) -> PathFinder:
     return PathFinder(grid)
 
 
-# from bisect! did not want to update to python 3.10 just for that... (Since only version 3.10 has key kwarg)
-def bisect_left(a, x, lo=0, hi=None, *, key=None):
-    """Return the index where to insert item x in list a, assuming a is sorted.
-    The return value i is such that all e in a[:i] have e < x, and all e in
-    a[i:] have e >= x.  So if x already appears in the list, a.insert(i, x) will
-    insert just before the leftmost x already there.
-    Optional args lo (default 0) and hi (default len(a)) bound the
-    slice of a to be searched.
+def get_heuristic(end, diago: bool) -> Callable[[Any], float]:
+    """ Return the distance estimate to end used by A*, works on any node with column and row attributes
+
+    :param end: Goal node
+    :param diago: True for octile distance (45 degrees diagonals only), False for manhattan distance
+    :return: heuristic function taking a node
+    """
+
+    end_col, end_row = end.column, end.row
+
+    if diago:
+        def octile(node) -> float:
+            dx = abs(node.column - end_col)
+            dy = abs(node.row - end_row)
+            return dx + dy + (1.41421 - 2) * min(dx, dy)
+        return octile
+
+    def manhattan(node) -> float:
+        return abs(node.column - end_col) + abs(node.row - end_row)
+    return manhattan
+
+
+def get_goals_heuristic(goals: Collection, diago: bool) -> Callable[[Any], float]:
+    """ Return the distance estimate to the nearest of several goals used by A*: the smallest of the estimates to
+    each goal, which is still consistent. With a single goal it is the get_heuristic one
+
+    :param goals: Goal nodes
+    :param diago: True for octile distance (45 degrees diagonals only), False for manhattan distance
+    :return: heuristic function taking a node
+    """
+
+    if len(goals) == 1:
+        return get_heuristic(next(iter(goals)), diago)
+
+    positions = [(goal.column, goal.row) for goal in goals]
+
+    if diago:
+        def nearest_octile(node) -> float:
+            column, row = node.column, node.row
+            best = float("inf")
+            for goal_col, goal_row in positions:
+                dx = abs(column - goal_col)
+                dy = abs(row - goal_row)
+                estimate = dx + dy + (1.41421 - 2) * min(dx, dy)
+                if estimate < best:
+                    best = estimate
+            return best
+        return nearest_octile
+
+    def nearest_manhattan(node) -> float:
+        column, row = node.column, node.row
+        return min(abs(column - goal_col) + abs(row - goal_row) for goal_col, goal_row in positions)
+    return nearest_manhattan
+
+
+def get_integer_heuristic(goals: Collection, diago: bool, scale: int = COST_SCALE) -> Callable[[Any], int]:
+    """ Return the get_goals_heuristic estimate in the integer costs of BucketSearch: straight moves cost scale and
+    diagonal ones 1.41421 * scale rounded, like the moves of weight 1. It stays consistent with the rounded costs,
+    which scaling and rounding the float estimate would not be.
+
+    :param goals: Goal nodes
+    :param diago: True for octile distance (45 degrees diagonals only), False for manhattan distance
+    :param scale: Cost of a straight move
+    :return: heuristic function taking a node
+    """
+
+    positions = [(goal.column, goal.row) for goal in goals]
+    diagonal_saving = 2 * scale - round(1.41421 * scale) if diago else 0
+
+    def nearest_integer(node) -> int:
+        column, row = node.column, node.row
+        best = None
+        for goal_col, goal_row in positions:
+            dx = abs(column - goal_col)
+            dy = abs(row - goal_row)
+            estimate = scale * (dx + dy) - diagonal_saving * min(dx, dy)
+            if best is None or estimate < best:
+                best = estimate
+        return best
+    return nearest_integer
+
+
+class HeapSearch:
+    """ Best first search engine on a binary heap, shared by the A*, Weighted A*, Dijkstra, JPS and JPS+ methods of
+    PathFinder and of the terminal_testing SimplePathFinder. It only relies on node.get_passable_neighbors() (or the
+    given successors function, or the given graph.CompiledGraph) and node.came_from.
+
+    Pushing is O(log n). Decrease-key is done lazily: an improved node is pushed again and its older, now stale
+    entries are skipped when popped since the node is already closed by then.
     """
 
-    if lo < 0:
-        raise ValueError('lo must be non-negative')
-    if hi is None:
-        hi = len(a)
-    # Note, the comparison uses "<" to match the
-    # __lt__() logic in list.sort() and in heapq.
-    if key is None:
-        while lo < hi:
-            mid = (lo + hi) // 2
-            if a[mid] < x:
-                lo = mid + 1
+    def __init__(self, start, heuristic: Callable[[Any], float],
+                 successors: Optional[Callable[[Any], List[Tuple[Any, float]]]] = None,
+                 graph: Optional[CompiledGraph] = None) -> None:
+        """ Create the engine and push the start node
+
+        :param start: Starting node
+        :param heuristic: Distance estimate to the goal, must be consistent for the paths to be optimal
+        :param successors: Function returning the (node, cost) successors of a node, defaults to its passable
+            neighbors
+        :param graph: Compiled neighbors, walked instead of the passable neighbors if no successors are given
+        """
+        self.heuristic = heuristic
+        self.successors = successors if successors else lambda node: node.get_passable_neighbors()
+        self.graph = graph if successors is None else None
+        self.queue = []
+        self.cost_so_far = {start: 0}
+        self.closed = set()
+        self.tie_breaker = count()  # Nodes are not comparable, the counter keeps heap entries unique
+
+        start.came_from = None
+        self.push(start, 0)
+
+    def push(self, node, cost_so_far: float) -> None:
+        """ Add a node to the open list with priority cost_so_far + heuristic, ties go to the node closest to the
+        goal
+
+        :param node: Node to push
+        :param cost_so_far: Cost from the start to node
+        :return: None
+        """
+        heuristic = self.heuristic(node)
+        heappush(self.queue, (cost_so_far + heuristic, heuristic, next(self.tie_breaker), node))
+
+    def pop(self):
+        """ Pop the best open node and close it, skipping stale entries
+
+        :return: The popped node, None if the queue only held stale entries
+        """
+
+        queue = self.queue
+        closed = self.closed
+
+        while queue:
+            node = heappop(queue)[-1]
+            if node not in closed:
+                closed.add(node)
+                return node
+
+        return None
+
+    def step(self):
+        """ Pop the best open node, close it and relax its neighbors
+
+        :return: The expanded node, None if the queue only held stale entries
+        """
+
+        node = self.pop()
+        if node is None:
+            return None
+
+        closed = self.closed
+        cost_so_far = self.cost_so_far
+        node_cost = cost_so_far[node]
+
+        if self.graph is not None:
+            # Edges of the node in the CSR arrays, walls are skipped like get_passable_neighbors does
+            graph = self.graph
+            targets, costs, wall = graph.targets, graph.costs, Node.WALL
+            index = node.column * graph.height + node.row
+            for edge in range(graph.offsets[index], graph.offsets[index + 1]):
+                neighbor = targets[edge]
+                if neighbor.status & wall or neighbor in closed:
+                    continue
+                new_cost = node_cost + costs[edge]
+                if new_cost < cost_so_far.get(neighbor, float("inf")):
+                    cost_so_far[neighbor] = new_cost
+                    neighbor.came_from = node
+                    self.push(neighbor, new_cost)
+
+            return node
+
+        for neighbor, cost in self.successors(node):
+            if neighbor in closed:
+                continue
+            new_cost = node_cost + cost
+            if new_cost < cost_so_far.get(neighbor, float("inf")):
+                cost_so_far[neighbor] = new_cost
+                neighbor.came_from = node
+                self.push(neighbor, new_cost)
+
+        return node
+
+
+class GreedySearch(HeapSearch):
+    """ HeapSearch for Greedy Best First Search: the priority of a node is its heuristic alone, the cost so far is
+    only kept to link nodes to their cheapest known parent.
+    """
+
+    def push(self, node, cost_so_far: float) -> None:
+        """ Add a node to the open list with priority heuristic
+
+        :param node: Node to push
+        :param cost_so_far: Cost from the start to node (unused)
+        :return: None
+        """
+        heappush(self.queue, (self.heuristic(node), next(self.tie_breaker), node))
+
+
+class BucketQueue:
+    """ Priority queue for integer priorities (Dial's buckets): buckets[priority] lists the items pushed with that
+    priority and pops scan the priorities up from the last popped one, newest items of a bucket first. Push and pop
+    are O(1) amortized as long as pushed priorities are not below the last popped one, like the costs of Dijkstra
+    and the f values of A* with a consistent heuristic (a lower push moves the scan back). Iterating gives
+    (priority, item) entries.
+    """
+
+    def __init__(self) -> None:
+        self.buckets = {}  # priority -> items, empty buckets are removed
+        self.minimum = 0  # no item has a lower priority
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Tuple[int, Any]]:
+        return ((priority, item) for priority, bucket in self.buckets.items() for item in bucket)
+
+    def clear(self) -> None:
+        self.buckets.clear()
+        self.minimum = 0
+        self.size = 0
+
+    def push(self, priority: int, item: Any) -> None:
+        """ Add an item to the bucket of its priority
+
+        :param priority: Integer priority, lowest first
+        :param item: Item to push
+        :return: None
+        """
+        bucket = self.buckets.get(priority)
+        if bucket is None:
+            self.buckets[priority] = [item]
+        else:
+            bucket.append(item)
+
+        if not self.size or priority < self.minimum:
+            self.minimum = priority
+        self.size += 1
+
+    def pop(self) -> Any:
+        """ Remove and return an item of the lowest priority, the queue must not be empty"""
+        buckets = self.buckets
+        while self.minimum not in buckets:
+            self.minimum += 1
+
+        bucket = buckets[self.minimum]
+        item = bucket.pop()
+        if not bucket:
+            del buckets[self.minimum]
+        self.size -= 1
+        return item
+
+
+class BucketSearch(HeapSearch):
+    """ HeapSearch on a BucketQueue (Dial's algorithm) for Dijkstra and A* with integer costs: move costs are scaled
+    by scale and rounded, straight and diagonal moves cost 10 and 14 with the default COST_SCALE. The heuristic must
+    be in the same integer units (see get_integer_heuristic). Push and pop are O(1) amortized instead of O(log n), the
+    paths are the cheapest ones for the rounded costs. Ties go to the last pushed node.
+    step is HeapSearch.step with the costs rounded and the pushes written inline, they are most of the time spent.
+    """
+
+    def __init__(self, start, heuristic: Callable[[Any], int],
+                 successors: Optional[Callable[[Any], List[Tuple[Any, float]]]] = None,
+                 scale: int = COST_SCALE, graph: Optional[CompiledGraph] = None) -> None:
+        """ Create the engine and push the start node
+
+        :param start: Starting node
+        :param heuristic: Integer distance estimate to the goal, must be consistent for the paths to be optimal
+        :param successors: Function returning the (node, cost) successors of a node, defaults to its passable
+            neighbors
+        :param scale: Cost of a straight move of weight 1, costs are rounded after scaling
+        :param graph: Compiled neighbors, walked instead of the passable neighbors if no successors are given
+        """
+        self.heuristic = heuristic
+        self.successors = successors if successors else lambda node: node.get_passable_neighbors()
+        self.graph = graph if successors is None else None
+        self.scale = scale
+        self.queue = BucketQueue()
+        self.cost_so_far = {start: 0}
+        self.closed = set()
+
+        start.came_from = None
+        self.push(start, 0)
+
+    def push(self, node, cost_so_far: int) -> None:
+        """ Add a node to the bucket of cost_so_far + heuristic
+
+        :param node: Node to push
+        :param cost_so_far: Integer cost from the start to node
+        :return: None
+        """
+        self.queue.push(cost_so_far + self.heuristic(node), node)
+
+    def pop(self):
+        """ Pop a node of the lowest bucket and close it, skipping stale entries
+
+        :return: The popped node, None if the queue only held stale entries
+        """
+
+        queue = self.queue
+        closed = self.closed
+
+        while queue:
+            node = queue.pop()
+            if node not in closed:
+                closed.add(node)
+                return node
+
+        return None
+
+    def step(self):
+        """ Pop a node of the lowest bucket, close it and relax its neighbors
+
+        :return: The expanded node, None if the queue only held stale entries
+        """
+
+        node = self.pop()
+        if node is None:
+            return None
+
+        closed = self.closed
+        cost_so_far = self.cost_so_far
+        node_cost = cost_so_far[node]
+        heuristic = self.heuristic
+        scale = self.scale
+        queue = self.queue
+        buckets = queue.buckets
+
+        if self.graph is not None:
+            # Edges of the node in the CSR arrays, walls are skipped below like get_passable_neighbors does
+            graph = self.graph
+            index = node.column * graph.height + node.row
+            first, last = graph.offsets[index], graph.offsets[index + 1]
+            edges = zip(graph.targets[first: last], graph.costs[first: last])
+        else:
+            edges = self.successors(node)
+        wall = Node.WALL
+
+        for neighbor, cost in edges:
+            if neighbor in closed or neighbor.status & wall:
+                continue
+            new_cost = node_cost + int(cost * scale + 0.5)
+            if new_cost < cost_so_far.get(neighbor, new_cost + 1):
+                cost_so_far[neighbor] = new_cost
+                neighbor.came_from = node
+
+                priority = new_cost + heuristic(neighbor)
+                bucket = buckets.get(priority)
+                if bucket is None:
+                    buckets[priority] = [neighbor]
+                else:
+                    bucket.append(neighbor)
+                if not queue.size or priority < queue.minimum:
+                    queue.minimum = priority
+                queue.size += 1
+
+        return node
+
+
+class ThetaStarSearch(HeapSearch):
+    """ HeapSearch for Theta*: when a neighbor of the expanded node can see the node's parent (theta.LineOfSight),
+    it is linked to that parent directly, with the straight line distance as cost. Otherwise it is linked to the
+    node like in A*. Costs are distances between node centers, cell weights are ignored.
+    """
+
+    def __init__(self, start, heuristic: Callable[[Any], float], line_of_sight: LineOfSight,
+                 successors: Optional[Callable[[Any], List[Tuple[Any, float]]]] = None,
+                 graph: Optional[CompiledGraph] = None) -> None:
+        """ Create the engine and push the start node
+
+        :param start: Starting node
+        :param heuristic: Straight line distance to the goal (octile distances overestimate any-angle paths)
+        :param line_of_sight: Visibility checks and their cache for this search
+        :param successors: Function returning the (node, cost) successors of a node, defaults to its passable
+            neighbors. Only the nodes are used
+        :param graph: Compiled neighbors, walked instead of the passable neighbors if no successors are given
+        """
+        super().__init__(start, heuristic, successors, graph)
+        self.line_of_sight = line_of_sight
+
+    def step(self):
+        """ Pop the best open node, close it and relax its neighbors from the node's parent if they see it
+
+        :return: The expanded node, None if the queue only held stale entries
+        """
+
+        node = self.pop()
+        if node is None:
+            return None
+
+        closed = self.closed
+        cost_so_far = self.cost_so_far
+        parent = node.came_from
+
+        if self.graph is not None:
+            # Targets of the node in the CSR arrays, walls are skipped below like get_passable_neighbors does
+            graph = self.graph
+            index = node.column * graph.height + node.row
+            neighbors = graph.targets[graph.offsets[index]: graph.offsets[index + 1]]
+        else:
+            neighbors = [neighbor for neighbor, cost in self.successors(node)]
+        wall = Node.WALL
+
+        for neighbor in neighbors:
+            if neighbor in closed or neighbor.status & wall:
+                continue
+
+            if parent is not None and self.line_of_sight.is_visible(parent, neighbor):
+                source = parent
             else:
-                hi = mid
-    else:
-        while lo < hi:
-            mid = (lo + hi) // 2
-            if key(a[mid]) < x:
-                lo = mid + 1
+                source = node
+
+            new_cost = cost_so_far[source] + distance(source, neighbor)
+            if new_cost < cost_so_far.get(neighbor, float("inf")):
+                cost_so_far[neighbor] = new_cost
+                neighbor.came_from = source
+                self.push(neighbor, new_cost)
+
+        return node
+
+
+class BidirectionalSearch:
+    """ Base of the bidirectional engines: one search grows from the start and one from the end until they meet.
+    Parents are kept in dicts instead of node.came_from so the two searches do not overwrite each other, the
+    came_from chain from end to start is only written once they met (see link_path).
+
+    step() expands one node or layer from the side with the smallest open list and returns the expanded
+    (node, forward) pairs. done is set when the search is over, meeting is None if there is no path.
+    """
+
+    def __init__(self, start, end) -> None:
+        """
+        :param start: Starting node
+        :param end: Goal node
+        """
+        self.start = start
+        self.end = end
+        self.parents = ({start: None}, {end: None})  # forward, backward
+        self.meeting = start if start is end else None
+        self.done = start is end
+
+    def link_path(self) -> None:
+        """ Writes node.came_from along the path found so the usual end to start walk can rebuild it: forward
+        parents are copied and the backward chain from the meeting node to end is reversed
+
+        :return: None
+        """
+
+        forward, backward = self.parents
+
+        node = self.meeting
+        while node is not None:
+            node.came_from = forward[node]
+            node = forward[node]
+
+        node = self.meeting
+        while node is not self.end:
+            parent = backward[node]
+            parent.came_from = node
+            node = parent
+
+
+class BidirectionalBFS(BidirectionalSearch):
+    """ Bidirectional level synchronous BFS, a whole layer of the smallest frontier is expanded per step. The first
+    node generated by both sides gives the shortest path in moves. If one side runs out of nodes there is no path,
+    so only the smallest of the two reachable regions is flooded.
+    """
+
+    def __init__(self, start, end, successors: Optional[Callable[[Any], List[Tuple[Any, float]]]] = None,
+                 graph: Optional[CompiledGraph] = None) -> None:
+        """
+        :param start: Starting node
+        :param end: Goal node
+        :param successors: Function returning the (node, cost) successors of a node, defaults to its passable
+        neighbors (moves are symmetric, the backward side uses it too)
+        :param graph: Compiled neighbors, walked instead of the passable neighbors if no successors are given
+        """
+        super().__init__(start, end)
+        self.frontiers = [[start], [end]]
+        self.successors = successors if successors else lambda node: node.get_passable_neighbors()
+        self.graph = graph if successors is None else None
+
+    def step(self) -> List[Tuple[Any, bool]]:
+        """ Expands the smallest frontier by one layer
+
+        :return: The expanded (node, forward) pairs
+        """
+
+        side = 0 if len(self.frontiers[0]) <= len(self.frontiers[1]) else 1
+        forward = side == 0
+        parents = self.parents[side]
+        other_parents = self.parents[1 - side]
+        frontier = self.frontiers[side]
+        next_frontier = []
+        graph = self.graph
+        wall = Node.WALL
+
+        for node in frontier:
+            if graph is not None:
+                # Targets of the node in the CSR arrays, walls are skipped below like get_passable_neighbors does
+                index = node.column * graph.height + node.row
+                neighbors = graph.targets[graph.offsets[index]: graph.offsets[index + 1]]
             else:
-                hi = mid
-    return lo
+                neighbors = [neighbor for neighbor, cost in self.successors(node)]
+
+            for neighbor in neighbors:
+                if neighbor in parents or neighbor.status & wall:
+                    continue
+                parents[neighbor] = node
+                if neighbor in other_parents:
+                    self.meeting = neighbor
+                    self.done = True
+                    return [(node, forward) for node in frontier]
+                next_frontier.append(neighbor)
+
+        self.frontiers[side] = next_frontier
+        if not next_frontier:
+            self.done = True
+
+        return [(node, forward) for node in frontier]
+
+
+class LayeredSearch:
+    """ Breadth first search for successors spanning several moves (RSR jumps): a node reached by a k moves jump
+    waits in the k-th next layer. One layer is expanded per step and a node can still move to an earlier layer until
+    it is expanded, like a Dijkstra on a bucket queue with one bucket per number of moves. Costs must be integers >= 1.
+    """
+
+    def __init__(self, start, successors: Callable[[Any], List[Tuple[Any, int]]]) -> None:
+        """ Create the engine, the start node is the first layer
+
+        :param start: Starting node
+        :param successors: Function returning the (node, number of moves) successors of a node
+        """
+        self.successors = successors
+        self.layers = deque([[start]])  # layers[0] is the current layer
+        self.depth = 0
+        self.moves = {start: 0}
+        self.closed = set()
+
+        start.came_from = None
+
+    def step(self) -> List:
+        """ Expands the current layer
+
+        :return: The expanded nodes, nodes moved to an earlier layer are skipped
+        """
+
+        layer = self.layers.popleft()
+        depth = self.depth
+        self.depth += 1
+
+        layers = self.layers
+        moves = self.moves
+        closed = self.closed
+        expanded = []
+
+        for node in layer:
+            if node in closed or moves[node] != depth:
+                continue
+            closed.add(node)
+            expanded.append(node)
+
+            for neighbor, cost in self.successors(node):
+                if neighbor in closed:
+                    continue
+                new_moves = depth + cost
+                if new_moves < moves.get(neighbor, new_moves + 1):
+                    moves[neighbor] = new_moves
+                    neighbor.came_from = node
+                    while len(layers) < cost:
+                        layers.append([])
+                    layers[cost - 1].append(neighbor)
+
+        return expanded
+
+
+class BidirectionalHeapSearch(BidirectionalSearch):
+    """ Bidirectional A* (or Dijkstra with zero heuristics) on two HeapSearch engines. Every relaxation reaching a
+    node already reached by the other side is a candidate path, the best one is kept as best_cost. The search stops
+    once it can not be improved anymore:
+     - Dijkstra: the two smallest costs in the queues add up to at least best_cost
+     - A*: the smallest f in either queue is at least best_cost (the heuristics must be consistent)
+    Cell weights are supported, the backward search pays the weight of the cell it leaves.
+    """
+
+    def __init__(self, start, end, forward_heuristic: Callable[[Any], float],
+                 backward_heuristic: Callable[[Any], float],
+                 successors: Optional[Callable[[Any], List[Tuple[Any, float]]]] = None,
+                 graph: Optional[CompiledGraph] = None) -> None:
+        """
+        :param start: Starting node
+        :param end: Goal node
+        :param forward_heuristic: Distance estimate to end
+        :param backward_heuristic: Distance estimate to start
+        :param successors: Function returning the (node, cost) successors of a node, defaults to its passable
+            neighbors. Moves must be reversible (like RSR jumps), only the cost may differ with cell weights
+        :param graph: Compiled neighbors, read instead of the passable neighbors if no successors are given
+        """
+        super().__init__(start, end)
+        self.forward_successors = successors if successors else lambda node: node.get_passable_neighbors()
+        self.graph = graph if successors is None else None
+        self.searches = (HeapSearch(start, forward_heuristic, self.forward_successors),
+                         HeapSearch(end, backward_heuristic, self.predecessors))
+        self.sum_criterion = forward_heuristic(start) == 0 and backward_heuristic(end) == 0
+        self.best_cost = 0 if self.done else float("inf")
+
+    def predecessors(self, node) -> List[Tuple[Any, float]]:
+        """ Successors of node with the cost of the move from them to node (entering node costs its weight)
+
+        :param node: Node expanded by the backward search
+        :return: (neighbor, cost) list
+        """
+        return [(neighbor, cost * node.weight / neighbor.weight) for neighbor, cost in self.forward_successors(node)]
+
+    def step(self) -> List[Tuple[Any, bool]]:
+        """ Expands one node from the side with the smallest queue and updates best_cost
+
+        :return: The expanded (node, forward) pair in a list, empty if only stale entries were popped
+        """
+
+        side = 0 if len(self.searches[0].queue) <= len(self.searches[1].queue) else 1
+        search, other = self.searches[side], self.searches[1 - side]
+        parents = self.parents[side]
+
+        node = search.pop()
+        expanded = []
+
+        if node is not None:
+            closed = search.closed
+            cost_so_far = search.cost_so_far
+            other_cost = other.cost_so_far
+            node_cost = cost_so_far[node]
+            graph = self.graph
+            wall = Node.WALL
+
+            if graph is None:
+                edges = search.successors(node)
+            else:
+                # Edges of the node in the CSR arrays, walls are skipped below like get_passable_neighbors does. The
+                # backward search pays the weight of the node instead of the one of the neighbor
+                index = node.column * graph.height + node.row
+                first, last = graph.offsets[index], graph.offsets[index + 1]
+                edges = zip(graph.targets[first: last], graph.costs[first: last])
+                if side == 1:
+                    weight = node.weight
+                    edges = [(neighbor, cost * weight / neighbor.weight) for neighbor, cost in edges]
+
+            for neighbor, cost in edges:
+                if neighbor in closed or neighbor.status & wall:
+                    continue
+                new_cost = node_cost + cost
+                if new_cost < cost_so_far.get(neighbor, float("inf")):
+                    cost_so_far[neighbor] = new_cost
+                    parents[neighbor] = node
+                    search.push(neighbor, new_cost)
+
+                    if neighbor in other_cost and new_cost + other_cost[neighbor] < self.best_cost:
+                        self.best_cost = new_cost + other_cost[neighbor]
+                        self.meeting = neighbor
+
+            expanded.append((node, side == 0))
+
+        self.check_done()
+        return expanded
+
+    def check_done(self) -> None:
+        """ Sets done if a queue is empty or if the stopping criterion is met
+
+        :return: None
+        """
+
+        forward_queue, backward_queue = self.searches[0].queue, self.searches[1].queue
+
+        if not forward_queue or not backward_queue:
+            self.done = True
+        elif self.sum_criterion:
+            self.done = forward_queue[0][0] + backward_queue[0][0] >= self.best_cost
+        else:
+            self.done = max(forward_queue[0][0], backward_queue[0][0]) >= self.best_cost
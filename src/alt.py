@@ -0,0 +1,183 @@
+""" The ALT module holds the landmark heuristic for A* (A*, Landmarks and Triangle inequality). A few landmarks are
+picked by farthest-point selection and a Dijkstra from each of them fills a table of path costs to every cell: this
+preprocess (LandmarkTables) only depends on the walls, the cell weights and the diagonal setting, so it is pickled with
+the grid. At query time the triangle inequality gives a lower bound of the cost to the end node which, unlike the
+octile distance, accounts for the walls in the way (see LandmarkTables.get_heuristic).
+It follows the movement rules of Node.get_neighbors with walls read from a wall mask (wall_mask[column][row] -> bool),
+so it works with the nodes of both pathfinders (only column and row are used by the heuristic).
+"""
+
+from array import array
+from heapq import heappush, heappop
+from typing import *
+
+LANDMARK_COUNT = 4
+INF = float("inf")
+
+
+class LandmarkTables:
+    """ Path costs from (and to, on weighted grids) every landmark, in flat arrays of single precision floats (4 bytes
+    per cell and table) over a wall-padded grid: index = (column + 1) * stride + row + 1, unreachable cells hold INF.
+    Moves cost the weight of the cell they enter, so costs are only symmetric when every free cell has the same
+    weight. Otherwise a second Dijkstra per landmark computes the costs to it, for the reverse bound.
+    The Dijkstras run in doubles, rounding to floats moves a bound by at most slack, which is taken off the bounds so
+    they stay admissible.
+    """
+
+    slack = 0  # tables pickled before the float tables hold exact doubles
+
+    def __init__(self, wall_mask: List[List[bool]], weights: List[List[float]], diago: bool,
+                 count: int = LANDMARK_COUNT, seed: Optional[Tuple[int, int]] = None) -> None:
+        """ Select the landmarks and compute their tables
+
+        :param wall_mask: wall_mask[column][row] is True for walls
+        :param weights: weights[column][row] is the cost multiplier of entering the cell
+        :param diago: Allows diagonal moves (no corner-cutting)
+        :param count: Number of landmarks
+        :param seed: (column, row) of a free cell in the area the landmarks should cover (the start node), the first
+            free cell if None
+        """
+        self.wall_mask = [column[:] for column in wall_mask]
+        self.weights = [column[:] for column in weights]
+        self.diago = diago
+        self.count = count
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        self.stride = self.height + 2
+        self.free = bytearray((self.width + 2) * self.stride)
+        self.cell_weights = array("d", [0]) * len(self.free)
+        for column in range(self.width):
+            offset = self.index(column, 0)
+            self.free[offset: offset + self.height] = bytes(not wall for wall in wall_mask[column])
+            self.cell_weights[offset: offset + self.height] = array("d", weights[column])
+
+        # (step, cost, horizontal part, vertical part): the cells beside a diagonal move must be free
+        self.moves = [(self.stride, 1, 0, 0), (-self.stride, 1, 0, 0), (1, 1, 0, 0), (-1, 1, 0, 0)]
+        if diago:
+            self.moves += [(dx * self.stride + dy, 1.41421, dx * self.stride, dy) for dx in (1, -1) for dy in (1, -1)]
+
+        free_weights = {self.cell_weights[index] for index, free in enumerate(self.free) if free}
+        self.symmetric = len(free_weights) <= 1
+
+        self.landmarks = []  # (column, row) of each landmark
+        self.from_landmarks = []  # from_landmarks[i][index] -> cost from landmark i to the cell
+        self.to_landmarks = []  # to_landmarks[i][index] -> cost from the cell to landmark i, same tables if symmetric
+        self.slack = 0  # 2 float roundings of the largest cost: a bound is at most this much above the exact one
+
+        self.select_landmarks(seed)
+
+    def matches(self, wall_mask: List[List[bool]], weights: List[List[float]], diago: bool, count: int) -> bool:
+        """ Return True if the tables were computed for these walls, weights, diagonal setting and landmark count"""
+        return self.diago == diago and self.count == count and self.wall_mask == wall_mask and \
+            self.weights == weights
+
+    @property
+    def memory(self) -> int:
+        """ Size of the distance tables in bytes"""
+        tables = self.from_landmarks if self.symmetric else self.from_landmarks + self.to_landmarks
+        return sum(table.itemsize * len(table) for table in tables)
+
+    def index(self, column: int, row: int) -> int:
+        """ Return the flat index of a position"""
+        return (column + 1) * self.stride + row + 1
+
+    def dijkstra(self, source: int, reverse: bool = False) -> array:
+        """ Compute the path costs from the source cell to every cell (or from every cell to it if reverse)
+
+        :param source: Flat index of the source cell
+        :param reverse: Computes the costs to the source, a move then costs the weight of the cell it leaves
+        :return: Table of costs
+        """
+
+        free = self.free
+        weights = self.cell_weights
+        costs = array("d", [INF]) * len(free)
+        costs[source] = 0
+        queue = [(0, source)]
+
+        while queue:
+            cost, index = heappop(queue)
+            if cost > costs[index]:  # Stale entry
+                continue
+
+            for step, move_cost, horizontal, vertical in self.moves:
+                neighbor = index + step
+                if not free[neighbor] or horizontal and not (free[index + horizontal] and free[index + vertical]):
+                    continue
+
+                new_cost = cost + move_cost * (weights[index] if reverse else weights[neighbor])
+                if new_cost < costs[neighbor]:
+                    costs[neighbor] = new_cost
+                    heappush(queue, (new_cost, neighbor))
+
+        return costs
+
+    def select_landmarks(self, seed: Optional[Tuple[int, int]]) -> None:
+        """ Farthest-point selection: the first landmark is the free cell farthest from the seed, each next one is
+        the cell farthest from the seed and all the landmarks already picked. Only cells connected to the seed are
+        considered.
+
+        :param seed: (column, row) of the seed cell, the first free cell if None
+        :return: None
+        """
+
+        if seed is not None and self.free[self.index(*seed)]:
+            source = self.index(*seed)
+        else:
+            source = self.free.find(1)
+            if source == -1:  # Walls only
+                return
+
+        # Costs from the seed, then from the closest landmark picked so far
+        closest = self.dijkstra(source)
+
+        for _ in range(self.count):
+            farthest = max((cost, index) for index, cost in enumerate(closest) if cost != INF)
+            if farthest[0] == 0:  # Every connected cell is a landmark already
+                break
+            landmark = farthest[1]
+
+            self.landmarks.append(divmod(landmark - self.stride - 1, self.stride))
+            table = self.dijkstra(landmark)
+            reverse_table = table if self.symmetric else self.dijkstra(landmark, reverse=True)
+            self.from_landmarks.append(array("f", table))
+            self.to_landmarks.append(self.from_landmarks[-1] if self.symmetric else array("f", reverse_table))
+
+            # Relative rounding error of a float is at most 2 ** -24, a bound subtracts 2 costs
+            largest = max(max(cost for cost in costs if cost != INF) for costs in (table, reverse_table))
+            self.slack = max(self.slack, largest * 2 ** -23)
+
+            closest = array("d", map(min, closest, table))
+
+    def get_heuristic(self, end: Any, base: Callable[[Any], float]) -> Callable[[Any], float]:
+        """ Return the A* heuristic to the end node: the best of the base heuristic and of the landmark bounds.
+        For a landmark L, d(L, end) <= d(L, node) + d(node, end) and d(node, L) <= d(node, end) + d(end, L).
+
+        :param end: Goal node
+        :param base: Admissible heuristic to combine with (octile or manhattan distance)
+        :return: heuristic function taking a node
+        """
+
+        target = self.index(end.column, end.row)
+        stride = self.stride
+
+        # Landmarks that can not reach the end (or be reached from it) give no bound. The slack is folded in the end
+        # costs so that the float rounding never makes a bound overestimate
+        slack = self.slack
+        forward = [(table, table[target] - slack) for table in self.from_landmarks if table[target] != INF]
+        backward = [(table, table[target] + slack) for table in self.to_landmarks if table[target] != INF]
+
+        def landmarks(node) -> float:
+            index = (node.column + 1) * stride + node.row + 1
+            best = base(node)
+            for table, end_cost in forward:
+                bound = end_cost - table[index]
+                if bound > best:
+                    best = bound
+            for table, end_cost in backward:
+                bound = table[index] - end_cost
+                if bound > best and bound != INF:
+                    best = bound
+            return best
+        return landmarks
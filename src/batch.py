@@ -0,0 +1,108 @@
+""" The BATCH module holds the results of batch queries: many (start, end) pairs searched on one preprocessed grid
+(see SimplePathFinder.run_batch in terminal_testing). Results are kept in parallel arrays instead of one object per
+query, paths are only kept on demand.
+It works with the nodes of both pathfinders (column, row and weight are used).
+"""
+
+from array import array
+from random import Random
+from typing import *
+
+INF = float("inf")
+
+
+def get_path_cost(path: List[Any]) -> float:
+    """ Return the cost of a path of adjacent nodes: a move costs 1 (or 1.41421 if diagonal) times the weight of the
+    node it enters
+
+    :param path: Nodes from start to end
+    :return: cost, INF for an empty path
+    """
+
+    if not path:
+        return INF
+
+    cost = 0
+    for node, next_node in zip(path, path[1:]):
+        if node.column != next_node.column and node.row != next_node.row:
+            cost += 1.41421 * next_node.weight
+        else:
+            cost += next_node.weight
+    return cost
+
+
+def random_pairs(all_nodes: List[List[Any]], count: int, is_free: Callable[[Any], Any], seed: int = 0,
+                 end_count: int = 0) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """ Generate random (start, end) pairs of free positions, the same pairs for the same seed
+
+    :param all_nodes: Grid of nodes (all_nodes[column][row])
+    :param count: Number of pairs
+    :param is_free: Function returning a truthy value if a node can be a start or an end
+    :param seed: Seed of the random generator
+    :param end_count: The ends are picked among this many random positions (many queries to a few goals), 0 for any
+    :return: ((start column, start row), (end column, end row)) generator
+    """
+
+    positions = [(node.column, node.row) for column in all_nodes for node in column if is_free(node)]
+    if not positions:
+        return
+
+    random = Random(seed)
+    ends = random.sample(positions, min(end_count, len(positions))) if end_count else positions
+    for _ in range(count):
+        yield random.choice(positions), random.choice(ends)
+
+
+class BatchResults:
+    """ Results of a batch of queries, query i found a path of lengths[i] nodes (0 if there is no path) costing
+    costs[i] (INF if there is no path) in times[i] ms. paths[i] is its path as (column, row) positions if the paths are
+    kept, paths is None otherwise. prep_dt is the time of the preprocess shared by the queries (ms).
+    stopped counts the queries stopped by a time or expansion limit, they found no path.
+    """
+
+    def __init__(self, keep_paths: bool = False) -> None:
+        """
+        :param keep_paths: Keeps the path of every query
+        """
+        self.lengths = array("l")
+        self.costs = array("d")
+        self.times = array("d")
+        self.paths = [] if keep_paths else None
+        self.prep_dt = 0
+        self.stopped = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, path: List[Any], time: float, stopped: bool = False) -> None:
+        """ Add the result of a query
+
+        :param path: Nodes from start to end, empty if there is no path
+        :param time: Time of the query (ms)
+        :param stopped: The query was stopped early, path is a partial path and is not kept
+        :return: None
+        """
+        if stopped:
+            self.stopped += 1
+            path = []
+        self.lengths.append(len(path))
+        self.costs.append(get_path_cost(path))
+        self.times.append(time)
+        if self.paths is not None:
+            self.paths.append([(node.column, node.row) for node in path])
+
+    @property
+    def found(self) -> int:
+        """ Number of queries that found a path"""
+        return sum(1 for length in self.lengths if length)
+
+    @property
+    def total_time(self) -> float:
+        """ Time of all the queries, preprocess excluded (ms)"""
+        return sum(self.times)
+
+    @property
+    def throughput(self) -> float:
+        """ Queries per second, preprocess excluded"""
+        total_time = self.total_time
+        return len(self) / total_time * 1000 if total_time else 0
@@ -0,0 +1,155 @@
+""" The BITBOARD module holds a breadth first search on bitboards: the free cells of the grid are the bits of one Python
+int, so a whole BFS layer is expanded at once with shifts, ANDs and ORs instead of one node at a time.
+Paths are recovered by walking back through the layer bitboards. Cell weights are ignored (unit-cost moves), diagonal
+moves do not cut corners like Node.get_neighbors.
+It reads walls from a wall mask (wall_mask[column][row] -> bool), so it works with the nodes of both pathfinders (only
+column and row are used).
+"""
+
+from typing import *
+
+
+class BitboardGrid:
+    """ Free cells as bits of an int over a wall-padded grid: bit (column + 1) * stride + row + 1 is set if the cell
+    is free. The padding bits are never set so shifted bits can not wrap around to the next column.
+    """
+
+    def __init__(self, wall_mask: List[List[bool]]) -> None:
+        """ Build the bitboard of the free cells
+
+        :param wall_mask: wall_mask[column][row] is True for walls
+        """
+        self.wall_mask = [column[:] for column in wall_mask]
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        self.stride = self.height + 2
+        free = bytearray((self.width + 2) * self.stride)
+        for column in range(self.width):
+            offset = self.index(column, 0)
+            free[offset: offset + self.height] = bytes(not wall for wall in wall_mask[column])
+
+        # Bit i of the int is free[i]: the most significant digit comes first in the string
+        self.free = int(free[::-1].translate(bytes.maketrans(b"\x00\x01", b"01")), 2)
+
+    def index(self, column: int, row: int) -> int:
+        """ Return the bit index of a position"""
+        return (column + 1) * self.stride + row + 1
+
+    def position(self, index: int) -> Tuple[int, int]:
+        """ Return the (column, row) of a bit index"""
+        column, row = divmod(index, self.stride)
+        return column - 1, row - 1
+
+    def matches(self, wall_mask: List[List[bool]]) -> bool:
+        """ Return True if the bitboard was built for these walls"""
+        return self.wall_mask == wall_mask
+
+    def expand(self, bits: int, diago: bool) -> int:
+        """ Return the free cells one move away from the cells of bits. A diagonal move needs the two cells beside it
+        free: a cell shifted to the east then to the south must also be reached by a shift to the south then east.
+
+        :param bits: Bitboard of cells
+        :param diago: Allows diagonal moves
+        :return: Bitboard of their free neighbors (the cells of bits can be included)
+        """
+
+        free = self.free
+        stride = self.stride
+
+        east = (bits << stride) & free
+        west = (bits >> stride) & free
+        south = (bits << 1) & free
+        north = (bits >> 1) & free
+        neighbors = east | west | south | north
+
+        if diago:
+            neighbors |= (((east << 1) & (south << stride)) | ((east >> 1) & (north << stride)) |
+                          ((west << 1) & (south >> stride)) | ((west >> 1) & (north >> stride))) & free
+
+        return neighbors
+
+
+class BitboardBFS:
+    """ Breadth first search on a BitboardGrid, one layer is expanded per step. layers[k] is (offset, bits), the
+    bitboard of the cells k moves away from the start shifted down by its lowest bit index: bits << offset. A layer
+    then only takes the bits between its first and last cell instead of the bits of every cell before it, visited is
+    the union of the layers. done is set once a goal is reached or no cell is left to expand.
+    """
+
+    def __init__(self, board: BitboardGrid, start: Any, goals: Iterable[Any], diago: bool) -> None:
+        """ Create the search, the start cell is the first layer
+
+        :param board: Free cells
+        :param start: Starting node
+        :param goals: Nodes the search stops at, the nearest one is reached first
+        :param diago: Allows diagonal moves
+        """
+        self.board = board
+        self.diago = diago
+        self.layers = [(board.index(start.column, start.row), 1)]
+        self.visited = 1 << self.layers[0][0]
+        self.goals = 0
+        for goal in goals:
+            self.goals |= 1 << board.index(goal.column, goal.row)
+        self.done = False
+
+    @property
+    def expanded(self) -> int:
+        """ Number of cells reached"""
+        return bin(self.visited).count("1")
+
+    def step(self) -> Optional[Tuple[int, int]]:
+        """ Expand the last layer
+
+        :return: (column, row) of a goal in the new layer, None if no goal was reached
+        """
+
+        offset, bits = self.layers[-1]
+        layer = bits << offset
+        if len(self.layers) > 1 or not layer & self.goals:  # The start is not a goal
+            layer = self.board.expand(layer, self.diago) & ~self.visited
+            if not layer:
+                self.done = True
+                return None
+            offset = (layer & -layer).bit_length() - 1
+            self.layers.append((offset, layer >> offset))
+            self.visited |= layer
+
+        reached = layer & self.goals
+        if not reached:
+            return None
+
+        self.done = True
+        return self.board.position((reached & -reached).bit_length() - 1)
+
+    def get_last_layer(self) -> List[Tuple[int, int]]:
+        """ Return the (column, row) of the cells of the last layer"""
+        positions = []
+        offset, bits = self.layers[-1]
+        while bits:
+            low = bits & -bits
+            positions.append(self.board.position(offset + low.bit_length() - 1))
+            bits ^= low
+        return positions
+
+    def get_path(self, column: int, row: int) -> List[Tuple[int, int]]:
+        """ Walk back from a cell of the last layer: in each layer before it, take one of the neighbors of the current
+        cell, moves being symmetric it can move to the current cell.
+
+        :param column: Column of the last cell
+        :param row: Row of the last cell
+        :return: (column, row) positions from start to the cell
+        """
+
+        board = self.board
+        bit = 1 << board.index(column, row)
+        path = [(column, row)]
+
+        for offset, bits in reversed(self.layers[:-1]):
+            previous = (board.expand(bit, self.diago) >> offset) & bits
+            bit = (previous & -previous) << offset
+            path.append(board.position(bit.bit_length() - 1))
+
+        path.reverse()
+        return path
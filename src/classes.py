@@ -11,10 +11,9 @@ import constants as cst
 
 # TODO: Use bitwise flags instead
 class Node:
-    """Object for representing every tile (node on the grid)"""
-
-    # Those attributes will be used as instance attributes, but it was simpler to define them here since they
-    # always start with the same values
+    """Search record of every tile (node on the grid): its column and row, bitwise status flags, weight and search
+    links. The rendering data lives in the render layer (see NodeView), so the same records are searched by the
+    visualizer and by the terminal harness, and __slots__ keeps them small (no per-instance __dict__)."""
 
     # Node flags:
     PATH = 1
@@ -24,94 +23,75 @@ class Node:
     BORDER = 16
     START = 32
     END = 64
-    ALL_FLAGS = 127
+    VISITED_BACK = 128  # visited by the search growing from the end (bidirectional search)
+    ALL_FLAGS = 255
+    SAVED_FLAGS = WALL | START | END  # flags pickled with the grid, the other ones belong to a search
 
-    neighbors = None
-    came_from = None
+    __slots__ = ("column", "row", "status", "weight", "neighbors", "came_from")
 
-    cost_so_far = 0
-    heuristic = 0
-    priority = 0
-    color = cst.BLACK
+    view = None  # NodeView of the displayed grid (a class attribute, not a slot), set by Grid.generate
 
-    def __init__(self, column: int, row: int, position: Tuple[int, int], node_width: int, node_height: int) -> None:
+    def __init__(self, column: int, row: int) -> None:
         """ Create a Node object
 
         :param column: Column index of the node in the Grid.all_nodes
         :param row: Row index of the node in the Grid.all_nodes
-        :param position: Top left position in pixels on the screen
-        :param node_width: Width of the node's rect (to be filled when drawn)
-        :param node_height: Height of the node's rect (to be filled when drawn)
         """
 
-        self.position = position
         self.column = column
         self.row = row
 
         self.status = 0  # bitwise flags
+        self.weight = 1  # traversal cost multiplier for entering the node (weighted terrain), must be >= 1 for A*
 
-        self.width = node_width
-        self.height = node_height
-        self.rect = pg.rect.Rect(self.position, (node_width, node_height))
+        self.neighbors = None
+        self.came_from = None
 
-    def update_color(self) -> None:
-        """ Update the node's color according to its current status"""
+    def __getstate__(self) -> Dict[str, Any]:
+        """ Return the state pickled with the grid: position, weight and the SAVED_FLAGS"""
+        return {"column": self.column, "row": self.row, "status": self.status & Node.SAVED_FLAGS,
+                "weight": self.weight}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """ Restore a pickled node. Grids saved before the render layer was split also hold the rect, color and search
+        state of their nodes, only the position, weight and SAVED_FLAGS are kept."""
+        self.__init__(state["column"], state["row"])
+        self.status = state.get("status", 0) & Node.SAVED_FLAGS
+        self.weight = state.get("weight", 1)
+
+    def get_color(self) -> Tuple[int, int, int, Optional[int]]:
+        """ Return the node's color according to its current status"""
 
-        self.color = cst.BLACK
         if self.status & Node.START:
-            self.color = cst.BLUE
+            return cst.BLUE
         elif self.status & Node.END:
-            self.color = cst.GREEN
+            return cst.GREEN
         elif self.status & Node.PATH:
-            self.color = cst.PURPLE
+            return cst.PURPLE
         elif self.status & Node.WALL:
-            self.color = cst.WHITE
+            return cst.WHITE
         elif self.status & Node.VISITED:
-            self.color = cst.YELLOW
+            return cst.YELLOW
+        elif self.status & Node.VISITED_BACK:
+            return cst.LIGHT_GREEN
+        elif self.weight != 1:
+            return cst.TURQUOISE
         elif self.status & Node.BORDER:
-            self.color = cst.RED
+            return cst.RED
         elif self.status & Node.SYM_RECT:
-            self.color = cst.ORANGE
+            return cst.ORANGE
+        return cst.BLACK
 
     # TODO: Change to a display method
     def get_fill(self) -> [Tuple[int, int, int, Optional[int]], pg.Rect]:
         """ Return information needed for filling to screen, use to append to dirty_fills
 
-        :return: Color tuple and rect to be filled
+        :return: Color tuple and rect to be filled (see NodeView)
         """
 
-        self.update_color()
-
-        return self.color, self.rect
-
-    # TODO: Optimize this method
-    def update_sym_rect_neighbors(self, grid: List[List['Node']]) -> None:
-        """ For a Node in the border of a symmetry rectangle, change its neighbor in the symmetry rectangle for
-        the next one that is a border (jump through rectangle)"""
-
-        def cycle_node(direction: str, current: 'Node') -> Tuple['Node', int]:
-            """ Increment neighbor's position in given direction until the neighbor is a border
+        return self.get_color(), Node.view.get_rect(self)
 
-            :param direction: current's direction key from initial node
-            :param current: current neigbor of the initial node
-            :return: final neighbor and cost multiplier (number of nodes from initial to final)
-            """
-
-            cost_multiplier = 1
-
-            while current.status & Node.SYM_RECT:
-                cost_multiplier += 1
-                new_col, new_row = cst.CYCLE_MOVES[direction](current.column, current.row)
-                current = grid[new_col][new_row]
-
-            return current, cost_multiplier
-
-        for direction, (neighbor, cost) in self.neighbors.items():
-            if neighbor.status & Node.SYM_RECT:
-                current, cost_mult = cycle_node(direction, neighbor)
-                self.neighbors[direction] = current, cost * cost_mult
-
-    def get_available_neighbors(self, grid) -> List[Tuple['Node', int]]:
+    def get_available_neighbors(self) -> List[Tuple['Node', int]]:
         """ Return available (not walls and not visited) neighbors and their cost as a list.
 
         :return: List of adjacent node objects
@@ -126,16 +106,24 @@ class Node:
 
         return neighbors
 
+    def get_passable_neighbors(self) -> List[Tuple['Node', int]]:
+        """ Return neighbors that are not walls (visited or not) and their cost as a list. Used by the heap based
+        algorithms, which can still lower the cost of a node that was already reached.
+
+        :return: List of adjacent node objects
+        """
+
+        return [(node, cost) for node, cost in self.neighbors.values() if not node.status & Node.WALL]
+
     def get_neighbors(self, grid: List[List['Node']], diago_allowed: bool = False) -> None:
         """ Sets a dict of all adjacent neighbors in the form neighbors["direction"] = node, cost
+        The cost of a move is multiplied by the weight of the node it enters
 
         :param grid: Grid on which the node is located
         :param diago_allowed: Sets if diagonal neighbors should be included, does not allow corner-cutting
         :return: None
         """
 
-        # could definitely make this more compact, see update_sym_rect_neighbors()
-
         neighbors = {}
 
         try:
@@ -180,9 +168,36 @@ class Node:
             except KeyError:
                 pass
 
+        for direction, (neighbor, cost) in neighbors.items():
+            if neighbor.weight != 1:
+                neighbors[direction] = neighbor, cost * neighbor.weight
+
         self.neighbors = neighbors
-        if self.status & Node.BORDER:
-            self.update_sym_rect_neighbors(grid)
+
+
+class NodeView:
+    """Render layer of the grid: the pixel geometry of its nodes, kept out of the search records (see Node). All the
+    nodes have the same size, so the rect of a node is computed from its column and row when it is drawn."""
+
+    def __init__(self, position: Tuple[float, float], node_width: float, node_height: float) -> None:
+        """ Create a NodeView object
+
+        :param position: Top left position in pixels of the grid on the screen
+        :param node_width: Width of the nodes' rects (to be filled when drawn)
+        :param node_height: Height of the nodes' rects (to be filled when drawn)
+        """
+
+        self.position = position
+        self.width = node_width
+        self.height = node_height
+
+    def get_position(self, node: Node) -> Tuple[float, float]:
+        """ Return the top left position in pixels of a node on the screen"""
+        return self.position[0] + self.width * node.column, self.position[1] + self.height * node.row
+
+    def get_rect(self, node: Node) -> pg.Rect:
+        """ Return the rect of a node on the screen"""
+        return pg.rect.Rect(self.get_position(node), (self.width, self.height))
 
 
 class Background:
@@ -882,6 +897,9 @@ class Grid:
         self.width = width
         self.height = height
         self.disabled = 0
+        self.edited = []  # nodes whose wall or weight changed since the last frame, for D* Lite and the component index
+        self.extra_ends = []  # END nodes placed in addition to end, searches can stop at the nearest one
+        self.version = 0  # changes when walls or weights are edited, cached results are kept for one version
 
         self.generate(n_wide, n_high)
 
@@ -895,7 +913,7 @@ class Grid:
 
         # ideally all nodes would get blitted here and the grid would be blitted to the window once per frame
         cst.late_fills.append(
-            (cst.DARK_GREY, pg.rect.Rect(self.all_nodes[0][0].position, (cfg.grid_width, cfg.grid_height))))
+            (cst.DARK_GREY, pg.rect.Rect(Node.view.position, (cfg.grid_width, cfg.grid_height))))
 
         cst.dirty_fills.append((cst.LIGHT_GREY, pg.Rect(cfg.button_background_rect.width, 0, cfg.window.get_width()
                                                         - cfg.button_background_rect.width, 25)))
@@ -927,15 +945,16 @@ class Grid:
         position_y = start_height
         position_x = cfg.button_background_rect.width
 
-        self.all_nodes = [[Node(x_wide, y_high, (position_x + nodes_width * x_wide,
-                                                 position_y + nodes_height * y_high), nodes_width, nodes_height)
-                           for y_high in range(n_high)] for x_wide in range(n_wide)]
+        Node.view = NodeView((position_x, position_y), nodes_width, nodes_height)
+        self.all_nodes = [[Node(x_wide, y_high) for y_high in range(n_high)] for x_wide in range(n_wide)]
+        self.version += 1
 
         self.display()
 
     # TODO: split up into smaller functions.
     def handle_grid(self, gui):
-        """ Handles the placement of end and start node and the drawing/erasing of walls.
+        """ Handles the placement of end and start nodes (and of extra end nodes) and the drawing/erasing of walls and
+        weighted cells.
 
         :param gui: Gui containing the GridButton
         :return: None
@@ -946,20 +965,24 @@ class Grid:
 
             if (gui.start_node_button.is_activated and not gui.start_node_button.is_disabled) or \
                     (gui.end_node_button.is_activated and not gui.end_node_button.is_disabled) or \
+                    (gui.extra_end_button.is_activated and not gui.extra_end_button.is_disabled) or \
                     (gui.draw_walls_button.is_activated and not gui.draw_walls_button.is_disabled) or \
-                    (gui.erase_walls_button.is_activated and not gui.erase_walls_button.is_disabled):
+                    (gui.erase_walls_button.is_activated and not gui.erase_walls_button.is_disabled) or \
+                    (gui.weights_button.is_activated and not gui.weights_button.is_disabled):
 
                 if pg.mouse.get_pressed()[0] and not gui.brush_size_button.is_activated:
                     click = pg.rect.Rect(pg.mouse.get_pos(), (1, 1))
                     brush_size = gui.brush_size_button.dict["value"]
-                    if gui.draw_walls_button.is_activated or gui.erase_walls_button.is_activated:
+                    if gui.draw_walls_button.is_activated or gui.erase_walls_button.is_activated \
+                            or gui.weights_button.is_activated:
                         click = pg.rect.Rect(pg.mouse.get_pos(), (brush_size, brush_size))
 
+                    view = Node.view
                     for column in self.all_nodes:
-                        if click.center[0] - brush_size - column[0].width <= column[0].rect.center[0] \
-                                <= click.center[0] + brush_size + column[0].width:
+                        if click.center[0] - brush_size - view.width <= view.get_rect(column[0]).center[0] \
+                                <= click.center[0] + brush_size + view.width:
                             for node in column:
-                                if pg.rect.Rect.colliderect(click, node):
+                                if click.colliderect(view.get_rect(node)):
                                     if gui.start_node_button.is_activated and not node.status & Node.WALL:
                                         if self.start:
                                             temp = self.start
@@ -976,16 +999,39 @@ class Grid:
                                             temp.status &= ~Node.END
                                             self.end = None
                                             cst.dirty_fills.append(temp.get_fill())
+                                        if node in self.extra_ends:
+                                            self.extra_ends.remove(node)
                                         self.end = node
                                         self.end.status |= Node.END
                                         cst.dirty_fills.append(node.get_fill())
 
+                                    elif gui.extra_end_button.is_activated \
+                                            and not node.status & (Node.WALL | Node.START | Node.END):
+                                        if self.end:
+                                            self.extra_ends.append(node)
+                                        else:
+                                            self.end = node
+                                        node.status |= Node.END
+                                        cst.dirty_fills.append(node.get_fill())
+
                                     elif gui.draw_walls_button.is_activated \
-                                            and node is not self.start and node is not self.end:
+                                            and not node.status & (Node.START | Node.END):
+                                        if not node.status & Node.WALL:
+                                            self.edited.append(node)
                                         node.status |= Node.WALL
                                         cst.dirty_fills.append(node.get_fill())
 
                                     elif gui.erase_walls_button.is_activated \
-                                            and node is not self.start and node is not self.end:
+                                            and not node.status & (Node.START | Node.END):
+                                        if node.status & Node.WALL or node.weight != 1:
+                                            self.edited.append(node)
                                         node.status &= ~Node.WALL
+                                        node.weight = 1
+                                        cst.dirty_fills.append(node.get_fill())
+
+                                    elif gui.weights_button.is_activated \
+                                            and not node.status & (Node.WALL | Node.START | Node.END):
+                                        if node.weight != gui.weight_button.dict["value"]:
+                                            self.edited.append(node)
+                                        node.weight = gui.weight_button.dict["value"]
                                         cst.dirty_fills.append(node.get_fill())
@@ -0,0 +1,194 @@
+""" The COMPONENTS module holds the connected component index of the free cells: a path exists between two nodes
+if and only if they have the same component, which is answered in O(1) before any search.
+Diagonal moves are only allowed when both cells beside them are free (no corner-cutting), so they never join two
+4-connected components: the labelling is the same for 4-connected and 8-connected moves and one index serves both.
+It is kept up to date when walls are edited (see ComponentIndex.update_cell) instead of labelling the grid again.
+Walls are read from a wall mask (wall_mask[column][row] -> bool), so it works with the nodes of both pathfinders (only
+column and row are used).
+"""
+
+from array import array
+from collections import deque
+from typing import *
+
+
+class ComponentIndex:
+    """ Component labels over a wall-padded flat grid: index = (column + 1) * stride + row + 1, walls are labelled 0.
+    Labels are merged with a union-find (parents), the component of a cell is the root of its label.
+    Erasing a wall merges the components around it. Drawing one may split its component: searches grow from the
+    free cells around it in turns, the ones that meet belong to the same part and a part whose searches run out of
+    cells is cut off and gets a new label. The biggest part is never visited entirely, it keeps the old label.
+    """
+
+    def __init__(self, wall_mask: List[List[bool]]) -> None:
+        """ Label the components
+
+        :param wall_mask: wall_mask[column][row] is True for walls
+        """
+        self.wall_mask = [column[:] for column in wall_mask]
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        self.stride = self.height + 2
+        self.free = bytearray((self.width + 2) * self.stride)
+        for column in range(self.width):
+            offset = self.index(column, 0)
+            self.free[offset: offset + self.height] = bytes(not wall for wall in wall_mask[column])
+
+        self.steps = (self.stride, -self.stride, 1, -1)
+        self.labels = array("l", [0]) * len(self.free)
+        self.parents = array("l", [0])  # parents[label] -> parent label, label 0 is for walls
+
+        self.label_all()
+
+    def index(self, column: int, row: int) -> int:
+        """ Return the flat index of a position"""
+        return (column + 1) * self.stride + row + 1
+
+    def matches(self, wall_mask: List[List[bool]]) -> bool:
+        """ Return True if the labels were computed (or updated) for these walls"""
+        return self.wall_mask == wall_mask
+
+    def new_label(self) -> int:
+        """ Return an unused label, root of its own set"""
+        self.parents.append(len(self.parents))
+        return len(self.parents) - 1
+
+    def find(self, label: int) -> int:
+        """ Return the root of a label, with path halving"""
+        parents = self.parents
+        while parents[label] != label:
+            parents[label] = parents[parents[label]]
+            label = parents[label]
+        return label
+
+    def label_all(self) -> None:
+        """ Flood fill every component with its own label
+
+        :return: None
+        """
+
+        free = self.free
+        labels = self.labels
+        steps = self.steps
+
+        for index in range(len(free)):
+            if not free[index] or labels[index]:
+                continue
+
+            label = self.new_label()
+            labels[index] = label
+            queue = [index]
+            for cell in queue:
+                for step in steps:
+                    neighbor = cell + step
+                    if free[neighbor] and not labels[neighbor]:
+                        labels[neighbor] = label
+                        queue.append(neighbor)
+
+    @property
+    def count(self) -> int:
+        """ Number of components"""
+        return len({self.find(label) for label in set(self.labels)} - {0})
+
+    def connected(self, node: Any, other: Any) -> bool:
+        """ Return True if a path exists between two nodes, False if one of them is a wall"""
+        label = self.labels[(node.column + 1) * self.stride + node.row + 1]
+        other_label = self.labels[(other.column + 1) * self.stride + other.row + 1]
+        return label != 0 and other_label != 0 and self.find(label) == self.find(other_label)
+
+    def update_cell(self, column: int, row: int, is_wall: bool) -> None:
+        """ Take a drawn or erased wall into account
+
+        :param column: Column of the cell
+        :param row: Row of the cell
+        :param is_wall: The cell is a wall
+        :return: None
+        """
+
+        index = self.index(column, row)
+        if bool(is_wall) != bool(self.free[index]):  # Unchanged
+            return
+
+        self.wall_mask[column][row] = bool(is_wall)
+        free = self.free
+        labels = self.labels
+
+        if is_wall:
+            free[index] = 0
+            labels[index] = 0
+            self.split(index)
+            return
+
+        free[index] = 1
+        roots = {self.find(labels[index + step]) for step in self.steps if free[index + step]}
+        if not roots:
+            labels[index] = self.new_label()
+            return
+
+        root = roots.pop()
+        labels[index] = root
+        for other in roots:
+            self.parents[other] = root
+
+    def split(self, index: int) -> None:
+        """ Relabel the parts of a component cut off by a new wall
+
+        :param index: Flat index of the new wall
+        :return: None
+        """
+
+        free = self.free
+        labels = self.labels
+        steps = self.steps
+
+        starts = [index + step for step in steps if free[index + step]]
+        if len(starts) < 2:
+            return
+
+        searches = range(len(starts))
+        owners = {cell: search for search, cell in enumerate(starts)}  # cell -> search that reached it
+        queues = [deque([cell]) for cell in starts]
+        visited = [[cell] for cell in starts]
+        groups = list(searches)  # Union-find over the searches that met
+
+        def group(search: int) -> int:
+            while groups[search] != search:
+                search = groups[search]
+            return search
+
+        live = len(starts)  # Groups of searches that could still be the same part as another one
+        done = set()
+
+        while live > 1:
+            for search in searches:
+                queue = queues[search]
+                if not queue:
+                    continue
+
+                cell = queue.popleft()
+                for step in steps:
+                    neighbor = cell + step
+                    if not free[neighbor]:
+                        continue
+                    owner = owners.get(neighbor)
+                    if owner is None:
+                        owners[neighbor] = search
+                        visited[search].append(neighbor)
+                        queue.append(neighbor)
+                    else:
+                        first, second = group(search), group(owner)
+                        if first != second:
+                            groups[second] = first
+                            live -= 1
+
+            # A group with no cell left to expand is cut off from the others
+            for root in {group(search) for search in searches} - done:
+                if live > 1 and not any(queues[search] for search in searches if group(search) == root):
+                    done.add(root)
+                    live -= 1
+                    label = self.new_label()
+                    for search in searches:
+                        if group(search) == root:
+                            for cell in visited[search]:
+                                labels[cell] = label
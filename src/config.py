@@ -18,8 +18,8 @@ else:
 
 button_background_rect = pg.Rect(0, 0, 205, window.get_height())
 
-stats_background_rect = pg.Rect(button_background_rect.width, window.get_height() - 125,
-                                window.get_width() - button_background_rect.width, 125)
+stats_background_rect = pg.Rect(button_background_rect.width, window.get_height() - 145,
+                                window.get_width() - button_background_rect.width, 145)
 
 grid_width = window.get_width() - button_background_rect.width - 25  # border
 grid_height = window.get_height() - stats_background_rect.height - 25  # border
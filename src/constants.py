@@ -22,6 +22,7 @@ MEDIUM_GREY = (125, 125, 125)
 DARK_GREY = (50, 50, 50)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
+LIGHT_GREEN = (150, 255, 150)
 BLUE = (0, 0, 255)
 PURPLE = (175, 0, 255)
 YELLOW = (255, 255, 0)
@@ -38,14 +39,3 @@ early_blits = []
 late_fills = []
 late_blits = []
 to_display = [early_fills, early_blits, dirty_fills, dirty_blits, late_fills, late_blits]
-
-# for updating neighbors when using RSR:
-CYCLE_MOVES = {"right": lambda col, row: (col + 1, row),
-               "left": lambda col, row: (col - 1, row),
-               "down": lambda col, row: (col, row + 1),
-               "up": lambda col, row: (col, row - 1),
-               "topright": lambda col, row: (col + 1, row - 1),
-               "topleft": lambda col, row: (col - 1, row - 1),
-               "downright": lambda col, row: (col + 1, row + 1),
-               "downleft": lambda col, row: (col - 1, row + 1)
-               }
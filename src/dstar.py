@@ -0,0 +1,218 @@
+""" The DSTAR module holds D* Lite, an incremental A* for grids whose walls and weights are edited during or after a
+search. It searches from the end node towards the start (g values are costs to the end) and keeps its search state
+between searches: once cells are edited, only the nodes whose cost to the end changed are expanded again, instead of
+resetting the grid and searching from scratch. The start and end nodes stay in place, so the key modifier of the
+original algorithm (for a moving start) is not needed and this is the same as Lifelong Planning A* run backwards.
+It follows the movement rules of Node.get_neighbors but reads walls and weights from its own flat copy, updated with
+update_cell, so it works with the nodes of both pathfinders (only column, row and came_from are used).
+"""
+
+from array import array
+from heapq import heappush, heappop
+from typing import *
+
+INF = float("inf")
+
+
+class DStarLite:
+    """ D* Lite search state over a wall-padded flat grid: index = (column + 1) * stride + row + 1.
+    A node is consistent when its g value (cost to the end) equals its rhs value (one step lookahead from its
+    successors' g values), the inconsistent ones are in the queue. step() expands one of them, in A* order towards
+    the start, until the start node is consistent and no queued node can lower its cost.
+    """
+
+    def __init__(self, all_nodes: List[List[Any]], wall_mask: List[List[bool]], weights: List[List[float]],
+                 diago: bool, start: Any, end: Any) -> None:
+        """ Create the search state, the first search is done by calling step until done is True
+
+        :param all_nodes: Grid of nodes (all_nodes[column][row])
+        :param wall_mask: wall_mask[column][row] is True for walls
+        :param weights: weights[column][row] is the cost multiplier of entering the cell
+        :param diago: Allows diagonal moves (no corner-cutting)
+        :param start: Starting node
+        :param end: Goal node
+        """
+        self.all_nodes = all_nodes
+        self.diago = diago
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        self.stride = self.height + 2
+        self.free = bytearray((self.width + 2) * self.stride)
+        self.weights = array("d", [1]) * len(self.free)
+        for column in range(self.width):
+            offset = self.index(column, 0)
+            self.free[offset: offset + self.height] = bytes(not wall for wall in wall_mask[column])
+            self.weights[offset: offset + self.height] = array("d", weights[column])
+
+        # (step, cost, horizontal part, vertical part): the cells beside a diagonal move must be free
+        self.moves = [(self.stride, 1, 0, 0), (-self.stride, 1, 0, 0), (1, 1, 0, 0), (-1, 1, 0, 0)]
+        if diago:
+            self.moves += [(dx * self.stride + dy, 1.41421, dx * self.stride, dy) for dx in (1, -1) for dy in (1, -1)]
+
+        self.g = array("d", [INF]) * len(self.free)
+        self.rhs = array("d", [INF]) * len(self.free)
+        self.queue = []
+        self.keys = {}  # index -> key of its current queue entry, the other entries are stale
+
+        self.start = self.index(start.column, start.row)
+        self.end = self.index(end.column, end.row)
+        self.start_column, self.start_row = start.column, start.row
+
+        self.rhs[self.end] = 0
+        self.push(self.end)
+
+    def index(self, column: int, row: int) -> int:
+        """ Return the flat index of a position"""
+        return (column + 1) * self.stride + row + 1
+
+    def get_node(self, index: int) -> Any:
+        """ Return the node at a flat index"""
+        column, row = divmod(index - self.stride - 1, self.stride)
+        return self.all_nodes[column][row]
+
+    def heuristic(self, index: int) -> float:
+        """ Octile (or manhattan) distance from the start node, weights are >= 1 so it never overestimates"""
+        column, row = divmod(index - self.stride - 1, self.stride)
+        dx = abs(column - self.start_column)
+        dy = abs(row - self.start_row)
+        if self.diago:
+            return dx + dy + (1.41421 - 2) * min(dx, dy)
+        return dx + dy
+
+    def get_key(self, index: int) -> Tuple[float, float]:
+        """ Return the queue priority of a node: A* priority on its best known cost, then that cost to break ties.
+        The priority is rounded, costs summed in another order must not stop the search early on a tie with start"""
+        cost = min(self.g[index], self.rhs[index])
+        return round(cost + self.heuristic(index), 9), cost
+
+    def push(self, index: int) -> None:
+        """ Queue a node with its current key, replacing its previous entry"""
+        key = self.get_key(index)
+        self.keys[index] = key
+        heappush(self.queue, (key, index))
+
+    def neighbors(self, index: int) -> List[Tuple[int, float]]:
+        """ Return the (index, move cost) of the free neighbors of a node, moves are symmetric without corner-cutting
+        so they are both its successors and its predecessors. The cost must still be multiplied by the weight of the
+        cell entered."""
+
+        free = self.free
+        neighbors = []
+        for step, move_cost, horizontal, vertical in self.moves:
+            if free[index + step] and (not horizontal or free[index + horizontal] and free[index + vertical]):
+                neighbors.append((index + step, move_cost))
+        return neighbors
+
+    def update_node(self, index: int) -> None:
+        """ Recompute the rhs value of a node from its successors and queue it if it is inconsistent
+
+        :param index: Flat index of the node
+        :return: None
+        """
+
+        if index != self.end:
+            if self.free[index]:
+                g, weights = self.g, self.weights
+                self.rhs[index] = min((move_cost * weights[neighbor] + g[neighbor]
+                                       for neighbor, move_cost in self.neighbors(index)), default=INF)
+            else:
+                self.rhs[index] = INF
+
+        if self.g[index] != self.rhs[index]:
+            self.push(index)
+        else:
+            self.keys.pop(index, None)
+
+    def get_top(self) -> Optional[Tuple[Tuple[float, float], int]]:
+        """ Return the (key, index) entry of the queue with the smallest key, None if it is empty"""
+        queue = self.queue
+        while queue:
+            key, index = queue[0]
+            if self.keys.get(index) == key:
+                return queue[0]
+            heappop(queue)  # Stale entry
+        return None
+
+    @property
+    def done(self) -> bool:
+        """ True once the cost of the start node is known (or known to be infinite if there is no path)"""
+        top = self.get_top()
+        return self.rhs[self.start] == self.g[self.start] and (top is None or top[0] >= self.get_key(self.start))
+
+    def step(self) -> Optional[Any]:
+        """ Expand the inconsistent node with the smallest key
+
+        :return: The expanded node, None if the queue is empty or the node was only queued again with a new key
+        """
+
+        top = self.get_top()
+        if top is None:
+            return None
+
+        key, index = top
+        new_key = self.get_key(index)
+        if key < new_key:  # The heuristic it was queued with was lower
+            self.push(index)
+            return None
+
+        heappop(self.queue)
+        del self.keys[index]
+        g, rhs, weights = self.g, self.rhs, self.weights
+
+        if g[index] > rhs[index]:
+            # Overconsistent: its cost went down, the new value is final
+            g[index] = rhs[index]
+            for neighbor, move_cost in self.neighbors(index):
+                if neighbor != self.end and move_cost * weights[index] + g[index] < rhs[neighbor]:
+                    rhs[neighbor] = move_cost * weights[index] + g[index]
+                    self.push(neighbor)
+        else:
+            # Underconsistent: its cost went up, it and the nodes that went through it are recomputed
+            g[index] = INF
+            self.update_node(index)
+            for neighbor, move_cost in self.neighbors(index):
+                self.update_node(neighbor)
+
+        return self.get_node(index)
+
+    def update_cell(self, column: int, row: int, is_wall: bool, weight: float) -> None:
+        """ Take an edited cell into account, the next steps repair the costs that changed. Every move changed by the
+        edit (entering or leaving the cell, or a diagonal move next to it) starts from a node of the 3x3 block
+        around the cell, so they are the only ones whose rhs value has to be recomputed
+
+        :param column: Column of the cell
+        :param row: Row of the cell
+        :param is_wall: The cell is a wall
+        :param weight: Weight of the cell
+        :return: None
+        """
+
+        index = self.index(column, row)
+        self.free[index] = not is_wall
+        self.weights[index] = weight
+
+        for dx in (-self.stride, 0, self.stride):
+            for dy in (-1, 0, 1):
+                self.update_node(index + dx + dy)
+
+    def link_path(self) -> bool:
+        """ Follow the cheapest moves from the start to the end and write came_from along the path, so it can be
+        built from the end like for the other searches
+
+        :return: False if there is no path
+        """
+
+        if self.g[self.start] == INF:
+            return False
+
+        g, weights = self.g, self.weights
+        index = self.start
+        node = self.get_node(index)
+
+        while index != self.end:
+            index = min(self.neighbors(index), key=lambda move: move[1] * weights[move[0]] + g[move[0]])[0]
+            self.get_node(index).came_from = node
+            node = self.get_node(index)
+
+        return True
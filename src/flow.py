@@ -0,0 +1,202 @@
+""" The FLOW module holds goal rooted fields: a single reverse Dijkstra from a goal gives the cost from every cell to
+the goal (distance field) and the first move of a cheapest path from every cell (flow field), seeded with several goals
+the fields lead to the nearest one. Any number of agents heading to the same goal can then read their path in
+O(path length) by following the flow, without a search.
+FieldCache keeps the fields of the current grid version (Grid.version changes whenever the grid is edited) for a few
+goals, so they are only computed once.
+It follows the movement rules of Node.get_neighbors with walls read from a wall mask (wall_mask[column][row] -> bool),
+so it works with the nodes of both pathfinders (only column and row are used).
+"""
+
+from array import array
+from heapq import heappush, heappop
+from typing import *
+
+from jps import get_wall_mask
+
+INF = float("inf")
+NO_MOVE = 255  # flow value of the goal and of the cells that can not reach it
+FIELD_CACHE_SIZE = 8
+
+
+class FlowField:
+    """ Distance and flow fields to one goal (or the nearest of several goals), in flat arrays over a wall-padded grid:
+    index = (column + 1) * stride + row + 1. flow[index] is the number of the move (in self.moves) leading to the next
+    cell of a cheapest path. Moves cost the weight of the cell they enter, like for the searches.
+    """
+
+    def __init__(self, all_nodes: List[List[Any]], wall_mask: List[List[bool]], weights: List[List[float]],
+                 diago: bool, goal: Union[Any, Iterable[Any]]) -> None:
+        """ Compute the fields
+
+        :param all_nodes: Grid of nodes (all_nodes[column][row])
+        :param wall_mask: wall_mask[column][row] is True for walls
+        :param weights: weights[column][row] is the cost multiplier of entering the cell
+        :param diago: Allows diagonal moves (no corner-cutting)
+        :param goal: Goal node, or nodes
+        """
+        self.all_nodes = all_nodes
+        self.diago = diago
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        self.stride = self.height + 2
+        self.free = bytearray((self.width + 2) * self.stride)
+        self.weights = array("d", [1]) * len(self.free)
+        for column in range(self.width):
+            offset = self.index(column, 0)
+            self.free[offset: offset + self.height] = bytes(not wall for wall in wall_mask[column])
+            self.weights[offset: offset + self.height] = array("d", weights[column])
+
+        # (step, cost, horizontal part, vertical part): the cells beside a diagonal move must be free
+        self.moves = [(self.stride, 1, 0, 0), (-self.stride, 1, 0, 0), (1, 1, 0, 0), (-1, 1, 0, 0)]
+        if diago:
+            self.moves += [(dx * self.stride + dy, 1.41421, dx * self.stride, dy) for dx in (1, -1) for dy in (1, -1)]
+
+        goals = [goal] if hasattr(goal, "column") else goal
+        self.goals = sorted({self.index(goal.column, goal.row) for goal in goals})  # Sorted, so already a heap
+        self.goals = [index for index in self.goals if self.free[index]]
+        self.distances = array("d", [INF]) * len(self.free)
+        self.flow = bytearray([NO_MOVE]) * len(self.free)
+        self.max_distance = 0
+
+        if self.goals:
+            self.compute()
+
+    def index(self, column: int, row: int) -> int:
+        """ Return the flat index of a position"""
+        return (column + 1) * self.stride + row + 1
+
+    @property
+    def memory(self) -> int:
+        """ Size of the fields in bytes"""
+        return self.distances.itemsize * len(self.distances) + len(self.flow)
+
+    def compute(self) -> None:
+        """ Reverse Dijkstra from the goals: moves are symmetric, so the cells next to a settled cell are the ones that
+        can move to it, paying its weight. The last improvement of a cell sets its flow towards the settled cell.
+
+        :return: None
+        """
+
+        free = self.free
+        weights = self.weights
+        distances = self.distances
+        flow = self.flow
+
+        # Move number of the opposite of each move, the flow goes back along the moves of the search
+        steps = [move[0] for move in self.moves]
+        backwards = [steps.index(-step) for step in steps]
+        moves = [(step, move_cost, horizontal, vertical, backward)
+                 for (step, move_cost, horizontal, vertical), backward in zip(self.moves, backwards)]
+
+        queue = [(0, goal) for goal in self.goals]
+        for goal in self.goals:
+            distances[goal] = 0
+
+        while queue:
+            distance, index = heappop(queue)
+            if distance > distances[index]:  # Stale entry
+                continue
+            self.max_distance = distance
+
+            weight = weights[index]
+            for step, move_cost, horizontal, vertical, backward in moves:
+                neighbor = index + step
+                if not free[neighbor] or horizontal and not (free[index + horizontal] and free[index + vertical]):
+                    continue
+
+                new_distance = distance + move_cost * weight
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    flow[neighbor] = backward
+                    heappush(queue, (new_distance, neighbor))
+
+    def get_distance(self, node: Any) -> float:
+        """ Return the cost of a cheapest path from the node to the (nearest) goal, INF if it can not reach one"""
+        return self.distances[(node.column + 1) * self.stride + node.row + 1]
+
+    def get_direction(self, node: Any) -> Optional[Tuple[int, int]]:
+        """ Return the (column, row) offset of the first move from the node towards the goal, None at the goal or if
+        it can not be reached"""
+        move = self.flow[(node.column + 1) * self.stride + node.row + 1]
+        if move == NO_MOVE:
+            return None
+        column, row = divmod(self.moves[move][0] + self.stride + 1, self.stride)
+        return column - 1, row - 1
+
+    def get_path(self, start: Any) -> List[Any]:
+        """ Follow the flow from the start node to the (nearest) goal
+
+        :param start: Starting node
+        :return: Nodes from start to goal, empty if no goal can be reached
+        """
+
+        index = (start.column + 1) * self.stride + start.row + 1
+        if self.distances[index] == INF:
+            return []
+
+        all_nodes = self.all_nodes
+        stride = self.stride
+        flow = self.flow
+        steps = [move[0] for move in self.moves]
+
+        path = [start]
+        while flow[index] != NO_MOVE:  # Only the goals have no move
+            index += steps[flow[index]]
+            column, row = divmod(index - stride - 1, stride)
+            path.append(all_nodes[column][row])
+
+        return path
+
+
+class FieldCache:
+    """ Fields by (grid version, goal positions, diagonal setting). Fields of an older grid version are dropped, and
+    only the size most recently used goals are kept. hits and misses count the lookups.
+    field_type builds the fields, FlowField or any class taking the same arguments (like wavefront.DistanceMap).
+    """
+
+    def __init__(self, size: int = FIELD_CACHE_SIZE, field_type: Callable[..., Any] = FlowField) -> None:
+        """
+        :param size: Maximum number of fields kept
+        :param field_type: Class (or function) building the fields of a goal
+        """
+        self.size = size
+        self.field_type = field_type
+        self.version = None
+        self.fields = {}  # (((column, row), ...), diago) -> FlowField, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: int, all_nodes: List[List[Any]], is_wall: Callable[[Any], Any], diago: bool,
+            goal: Union[Any, Iterable[Any]]) -> FlowField:
+        """ Return the fields to the goal (or the nearest of several goals), computed only if they are not cached for
+        this grid version
+
+        :param version: Version of the grid, changes when walls or weights are edited
+        :param all_nodes: Grid of nodes (all_nodes[column][row])
+        :param is_wall: Function returning a truthy value if the node is a wall
+        :param diago: Allows diagonal moves (no corner-cutting)
+        :param goal: Goal node, or nodes
+        :return: fields built by field_type
+        """
+
+        if version != self.version:
+            self.fields.clear()
+            self.version = version
+
+        goals = [goal] if hasattr(goal, "column") else list(goal)
+        key = tuple(sorted((node.column, node.row) for node in goals)), diago
+        field = self.fields.pop(key, None)
+
+        if field is None:
+            self.misses += 1
+            weights = [[node.weight for node in column] for column in all_nodes]
+            field = self.field_type(all_nodes, get_wall_mask(all_nodes, is_wall), weights, diago, goals)
+            if len(self.fields) >= self.size:
+                del self.fields[next(iter(self.fields))]
+        else:
+            self.hits += 1
+
+        self.fields[key] = field
+        return field
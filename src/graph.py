@@ -0,0 +1,57 @@
+""" The GRAPH module holds the compiled form of the grid graph: the neighbors set on the nodes by
+Node.get_neighbors (a dict of direction -> (node, cost) per node) compiled into compressed sparse row (CSR) arrays.
+The edges of every node are a slice of one targets list, with the costs in a parallel list, so a search can walk
+the edges of a node with a range of integers instead of allocating a list of (node, cost) pairs per expansion.
+The targets are the neighbor nodes themselves and the costs the floats of the dicts: indexing a list returns the
+object it holds, where indexing an array would box a new int or float at every edge.
+The edges are compiled in the order of the neighbor dicts, so the searches expand nodes in the same order as with
+node.get_passable_neighbors(). Walls are left in the targets (the dicts hold them too), the searches skip them.
+It works with the nodes of both pathfinders (column, row and neighbors are used).
+"""
+
+import sys
+from array import array
+from typing import *
+
+
+class CompiledGraph:
+    """ Neighbors of every node in CSR form: the node of index i = column * height + row is nodes[i], its edges are
+    targets[offsets[i]: offsets[i + 1]] (the neighbor nodes) and costs[offsets[i]: offsets[i + 1]] (costs of the
+    moves, weights included). Nodes without neighbors (walls, nodes inside RSR rectangles) have no edges.
+    """
+
+    def __init__(self, all_nodes: List[List[Any]]) -> None:
+        """ Compile the neighbors of the nodes
+
+        :param all_nodes: Grid of nodes (all_nodes[column][row]) with their neighbors set
+        """
+        self.width = len(all_nodes)
+        self.height = len(all_nodes[0])
+        self.nodes = [node for column in all_nodes for node in column]
+
+        offsets = [0]
+        self.targets = []
+        self.costs = []
+        for node in self.nodes:
+            if node.neighbors:
+                for neighbor, cost in node.neighbors.values():
+                    self.targets.append(neighbor)
+                    self.costs.append(cost)
+            offsets.append(len(self.targets))
+
+        self.offsets = array("l", offsets)
+
+    def __len__(self) -> int:
+        """ Number of edges"""
+        return len(self.targets)
+
+    def index(self, node: Any) -> int:
+        """ Return the index of a node"""
+        return node.column * self.height + node.row
+
+    @property
+    def memory(self) -> int:
+        """ Size of the offsets and of the node, targets and costs lists in bytes (the nodes and costs are shared with
+        the grid and the neighbor dicts)"""
+        return len(self.offsets) * self.offsets.itemsize + sys.getsizeof(self.nodes) + sys.getsizeof(self.targets) + \
+            sys.getsizeof(self.costs)
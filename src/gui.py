@@ -17,6 +17,9 @@ import pygame as pg
 import config as cfg
 import constants as cst
 from classes import *
+from jps import get_wall_mask
+from alt import LANDMARK_COUNT
+from algo import EPSILON
 
 folder_path = getcwd()
 
@@ -230,8 +233,9 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
         for column in grid_obj.all_nodes:
             for node in column:
                 if randrange(11) == 0:
-                    if node is not grid_obj.start and node is not grid_obj.end:
+                    if not node.status & (Node.WALL | Node.START | Node.END):
                         node.status |= Node.WALL
+                        grid_obj.edited.append(node)
                         cst.dirty_fills.append(node.get_fill())
 
     def disp_moves_func(arg: bool) -> None:
@@ -270,6 +274,22 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
         """
         pathfinder_obj.apply_rsr = arg
 
+    def bidirectional_func(arg: bool) -> None:
+        """ Function for the bidirectional Checkbox. Switches the bool of pathfinder.bidirectional attribute.
+
+        :param arg: bidirectional_button.is_activated, For Checkboxes this parameter is always injected in is_clicked
+        :return: None
+        """
+        pathfinder_obj.bidirectional = arg
+
+    def grid_store_func(arg: bool) -> None:
+        """ Function for the grid_store Checkbox. Switches the bool of pathfinder.grid_store attribute.
+
+        :param arg: grid_store_button.is_activated, For Checkboxes this parameter is always injected in is_clicked
+        :return: None
+        """
+        pathfinder_obj.grid_store = arg
+
     def set_algo(self: AlgoButton) -> None:
         """ Set the pathfinder.algo attribute to the algorithm associated with the AlgoButton
 
@@ -280,6 +300,29 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
         main_gui_handler.dropdown_algo.is_activated = False
         remove_from_root(root=main_gui_handler, child=algo_gui)
 
+    def set_landmarks() -> None:
+        """ Sets the number of ALT landmarks of the pathfinder from the landmarks TextInputButton's value
+
+        :return: None
+        """
+        pathfinder_obj.landmark_count = main_gui_handler.landmarks_button.dict["value"]
+
+    def set_epsilon() -> None:
+        """ Sets the Weighted A* epsilon of the pathfinder from the suboptimality TextInputButton's value (percents)
+
+        :return: None
+        """
+        pathfinder_obj.epsilon = main_gui_handler.epsilon_button.dict["value"] / 100
+
+    def set_limits() -> None:
+        """ Sets the time and expansion limits of the searches run without display from the TextInputButtons' values
+        (0 for no limit)
+
+        :return: None
+        """
+        pathfinder_obj.time_limit = main_gui_handler.time_limit_button.dict["value"]
+        pathfinder_obj.expansion_limit = main_gui_handler.expansion_limit_button.dict["value"]
+
     def generate() -> None:
         """ Calls the generate method of the grid object, and injects the n_wide and n_high dependencies from
         the main_gui's grid_n_wide and grid_n_high TextInputButtons' values
@@ -299,12 +342,20 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
         """
 
         def disable_buttons() -> None:
-            """ Disable Buttons that cannot be used during pathfinding
+            """ Disable Buttons that cannot be used during pathfinding, D* Lite repairs its path when walls and
+            weights are edited so those buttons are left on
 
             :return: None
             """
+            edit_buttons = ()
+            if pathfinder_obj.algo in ("dstar", pathfinder_obj.dstar):
+                edit_buttons = (main_gui_handler.draw_walls_button, main_gui_handler.erase_walls_button,
+                                main_gui_handler.random_walls_button, main_gui_handler.weights_button,
+                                main_gui_handler.brush_size_button, main_gui_handler.weight_button)
+
             for obj in main_gui_handler.objects:
-                if obj.__class__ is not StateButton and obj is not main_gui_handler.exit_button:
+                if obj.__class__ is not StateButton and obj is not main_gui_handler.exit_button \
+                        and obj not in edit_buttons:
                     try:
                         obj.is_disabled = True
                     except AttributeError:
@@ -354,28 +405,38 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
             if grid_obj.start is not None:
                 temp = grid_obj.start
                 grid_obj.start = None
-                temp.is_start = False
                 cst.dirty_fills.append(temp.get_fill())
             if grid_obj.end is not None:
                 temp = grid_obj.end
                 grid_obj.end = None
-                temp.is_end = False
                 cst.dirty_fills.append(temp.get_fill())
+            grid_obj.extra_ends = []
+            grid_obj.version += 1
 
         pathfinder_obj.search_is_init = False
-        pathfinder_obj.dijkstra_cost_so_far = 0
         pathfinder_obj.running = False
         pathfinder_obj.path_found = False
         pathfinder_obj.frontier = []
         pathfinder_obj.queue.clear()
-        pathfinder_obj.to_be_removed = []
+        pathfinder_obj.next_frontier = []
         pathfinder_obj.shortest_path = []
         pathfinder_obj.run_timer = 0
         pathfinder_obj.start_time = 0
         pathfinder_obj.end_time = 0
         pathfinder_obj.neighbors_prep_dt = 0
         pathfinder_obj.rsr_prep_dt = 0
+        pathfinder_obj.jump_tables_prep_dt = 0
+        pathfinder_obj.hierarchy_prep_dt = 0
+        pathfinder_obj.landmarks_prep_dt = 0
+        pathfinder_obj.replan_dt = 0
+        pathfinder_obj.flow_prep_dt = 0
+        pathfinder_obj.components_prep_dt = 0
+        pathfinder_obj.store_prep_dt = 0
+        pathfinder_obj.line_of_sight = None
+        pathfinder_obj.reached_goal = None
+        pathfinder_obj.stopped_early = False
         pathfinder_obj.algo_dt = 0
+        pathfinder_obj.cost_ratio = 0
 
         for column in grid_obj.all_nodes:
             for node in column:
@@ -383,13 +444,14 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
                 node.neighbors = None
                 node.came_from = None
 
-                if node.update_color() is not cst.BLACK:
+                if node.get_color() is not cst.BLACK:
 
                     if not partial:
                         node.status &= ~(Node.WALL | Node.END | Node.START)
+                        node.weight = 1
 
                     node.status &= ~(Node.SYM_RECT | Node.BORDER |
-                                     Node.VISITED | Node.PATH)
+                                     Node.VISITED | Node.VISITED_BACK | Node.PATH)
 
                     cst.dirty_fills.append(node.get_fill())
 
@@ -407,7 +469,8 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
 
     # TODO: try resetting the focus to pygame
     def save() -> None:
-        """ Save the Grid object as a Pickle file in the Grids folder (or other)
+        """ Save the Grid object as a Pickle file in the Grids folder (or other) with its extra end nodes, JPS+ jump
+        tables and ALT landmark tables that still match the walls (and weights) are saved with it
 
         :return: None
         """
@@ -415,7 +478,18 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
 
         direct = filedialog.asksaveasfilename(initialdir=grid_path, defaultextension=".pickle")
         if direct:
-            save_object = {"start": grid_obj.start, "end": grid_obj.end, "grid": grid_obj.all_nodes}
+            wall_mask = get_wall_mask(grid_obj.all_nodes, lambda node: node.status & Node.WALL)
+            jump_tables = {diago: tables for diago, tables in pathfinder_obj.jump_tables.items()
+                           if tables.matches(wall_mask, diago)}
+
+            weights = [[node.weight for node in column] for column in grid_obj.all_nodes]
+            landmark_tables = pathfinder_obj.landmark_tables
+            if landmark_tables is not None and \
+                    not landmark_tables.matches(wall_mask, weights, landmark_tables.diago, landmark_tables.count):
+                landmark_tables = None
+
+            save_object = {"start": grid_obj.start, "end": grid_obj.end, "extra_ends": grid_obj.extra_ends,
+                           "grid": grid_obj.all_nodes, "jump_tables": jump_tables, "landmark_tables": landmark_tables}
 
             with open(direct, "wb") as file:
                 dump(save_object, file)
@@ -438,21 +512,7 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
 
             start_height = 25
 
-            # Substracting the first because it will be incremented during the loop
-            position_y = start_height - nodes_height
-            position_x = cfg.button_background_rect.width - nodes_width
-
-            for column in grid_obj.all_nodes:
-                position_x += nodes_width
-
-                for node in column:
-                    position_y += nodes_height
-                    node.height = nodes_height
-                    node.width = nodes_width
-                    node.position = (position_x, position_y)
-                    node.rect = pg.rect.Rect(node.position, (node.width, node.height))
-
-                position_y = start_height - nodes_height
+            Node.view = NodeView((cfg.button_background_rect.width, start_height), nodes_width, nodes_height)
 
             grid_obj.display()
 
@@ -467,6 +527,14 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
             grid_obj.all_nodes = save_object["grid"]
             grid_obj.start = save_object["start"]
             grid_obj.end = save_object["end"]
+            grid_obj.extra_ends = save_object.get("extra_ends", [])
+            grid_obj.version += 1
+            pathfinder_obj.jump_tables = save_object.get("jump_tables", {})
+            pathfinder_obj.landmark_tables = save_object.get("landmark_tables")
+            if pathfinder_obj.landmark_tables is not None:
+                pathfinder_obj.landmark_count = pathfinder_obj.landmark_tables.count
+                main_gui_handler.landmarks_button.dict["value"] = pathfinder_obj.landmark_tables.count
+                main_gui_handler.landmarks_button.display()
 
             main_gui_handler.grid_n_wide_button.dict["value"] = len(grid_obj.all_nodes)
             main_gui_handler.grid_n_high_button.dict["value"] = len(grid_obj.all_nodes[0])
@@ -484,6 +552,29 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
 
                 scale_and_draw()
 
+    def show_field() -> None:
+        """ Draws the distance field to the end node as a heatmap, from red next to the end to blue for the farthest
+        nodes. Walls, start and end nodes and the nodes that can not reach the end keep their color. The fields are
+        only computed once per grid version and end node (see pathfinder.set_flow_field), resetting the search
+        clears the heatmap
+
+        :return: None
+        """
+        if not grid_obj.end:
+            pg.event.post(pg.event.Event(cst.NO_END, announcement="No end Node!"))
+            return
+
+        pathfinder_obj.flow_prep_dt = pathfinder_obj.set_flow_field()
+        field = pathfinder_obj.flow_field
+
+        for column in grid_obj.all_nodes:
+            for node in column:
+                distance = field.get_distance(node)
+                if node.status & (Node.WALL | Node.START | Node.END) or distance == float("inf"):
+                    continue
+                ratio = distance / field.max_distance
+                cst.dirty_fills.append(((round(255 * (1 - ratio)), 0, round(255 * ratio)), Node.view.get_rect(node)))
+
     def exit_func() -> None:
         """ Exit program.
         :return: None
@@ -514,14 +605,28 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
     main_gui["random_walls_button"] = GridButton((15, main_gui["draw_walls_button"].rect.bottom + 10),
                                                  "Random walls", func=random_walls)
 
+    main_gui["weights_button"] = GridButton((main_gui["random_walls_button"].rect.right + 5,
+                                             main_gui["random_walls_button"].rect.top), "Weights")
+
+    main_gui["extra_end_button"] = GridButton((15, main_gui["random_walls_button"].rect.bottom + 10), "Add Ends")
+
     # algo buttons
     algo_buttons = [AlgoButton((0, 0), "Flood Fill", "bfs", active_color=cst.BLACK, rounded=False, func=set_algo),
                     AlgoButton((0, 0), "A*", "astar", active_color=cst.BLACK, rounded=False, func=set_algo),
-                    AlgoButton((0, 0), "Dijkstra", "dijkstra", active_color=cst.BLACK, rounded=False, func=set_algo)]
+                    AlgoButton((0, 0), "Weighted A*", "weighted_astar", active_color=cst.BLACK, rounded=False,
+                               func=set_algo),
+                    AlgoButton((0, 0), "Greedy", "greedy", active_color=cst.BLACK, rounded=False, func=set_algo),
+                    AlgoButton((0, 0), "ALT", "alt", active_color=cst.BLACK, rounded=False, func=set_algo),
+                    AlgoButton((0, 0), "Theta*", "theta", active_color=cst.BLACK, rounded=False, func=set_algo),
+                    AlgoButton((0, 0), "Dijkstra", "dijkstra", active_color=cst.BLACK, rounded=False, func=set_algo),
+                    AlgoButton((0, 0), "JPS", "jps", active_color=cst.BLACK, rounded=False, func=set_algo),
+                    AlgoButton((0, 0), "JPS+", "jps_plus", active_color=cst.BLACK, rounded=False, func=set_algo),
+                    AlgoButton((0, 0), "HPA*", "hpa", active_color=cst.BLACK, rounded=False, func=set_algo),
+                    AlgoButton((0, 0), "D* Lite", "dstar", active_color=cst.BLACK, rounded=False, func=set_algo)]
     algo_buttons[0].is_activated = True
     algo_gui = Gui({f"{button.algo}": button for button in algo_buttons}, external=True, ext_close=True)
 
-    main_gui["dropdown_algo"] = DropDownButton((15, main_gui["random_walls_button"].rect.bottom + 30), "Algo: ",
+    main_gui["dropdown_algo"] = DropDownButton((15, main_gui["extra_end_button"].rect.bottom + 30), "Algo: ",
                                                algo_buttons, child_gui=algo_gui)
 
     main_gui["diago_button"] = Checkbox("Diagonal moves", (15, main_gui["dropdown_algo"].rect.bottom + 10),
@@ -530,7 +635,15 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
     main_gui["apply_rsr_button"] = Checkbox("Apply RSR", (15, main_gui["diago_button"].rect.bottom + 10),
                                             False, apply_rsr_func)
 
-    main_gui["display_moves_button"] = Checkbox("Display moves", (15, main_gui["apply_rsr_button"].rect.bottom + 10),
+    main_gui["grid_store_button"] = Checkbox("Flat store", (main_gui["apply_rsr_button"].rect.right + 10,
+                                                            main_gui["apply_rsr_button"].rect.top),
+                                             False, grid_store_func)
+
+    main_gui["bidirectional_button"] = Checkbox("Bidirectional", (15, main_gui["apply_rsr_button"].rect.bottom + 10),
+                                                False, bidirectional_func)
+
+    main_gui["display_moves_button"] = Checkbox("Display moves",
+                                                (15, main_gui["bidirectional_button"].rect.bottom + 10),
                                                 True, disp_moves_func)
 
     main_gui["run_interval_button"] = TextInputButton({"min": -1, "max": 9999, "default": 0, "value": 0},
@@ -550,12 +663,15 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
     main_gui["play_pause_button"] = StateButton((15, main_gui["reset_search_button"].rect.bottom + 10),
                                                 "Play/Pause", play_pause)
 
+    main_gui["heatmap_button"] = SystemButton((main_gui["play_pause_button"].rect.right + 5,
+                                               main_gui["play_pause_button"].rect.top), "Heatmap", show_field)
+
     main_gui["grid_n_wide_button"] = TextInputButton({"min": 3, "max": cfg.window.get_width() - 205 - 25,
                                                       "default": 100, "value": 100},
                                                      (15, main_gui["play_pause_button"].rect.bottom + 30), 50,
                                                      "Nodes in width: ", func=generate)
 
-    main_gui["grid_n_high_button"] = TextInputButton({"min": 3, "max": cfg.window.get_height() - 125 - 25,
+    main_gui["grid_n_high_button"] = TextInputButton({"min": 3, "max": cfg.window.get_height() - 145 - 25,
                                                       "default": 100, "value": 100},
                                                      (15, main_gui["grid_n_wide_button"].rect.bottom + 10), 40,
                                                      "Nodes in height: ", func=generate)
@@ -564,7 +680,29 @@ def init_gui(pathfinder_obj: Any, grid_obj: Grid) -> Gui:
                                                     (15, main_gui["grid_n_high_button"].rect.bottom + 10), 30,
                                                     "Brush size: ")
 
-    main_gui["save_grid_button"] = SystemButton((15, main_gui["brush_size_button"].rect.bottom + 30),
+    main_gui["weight_button"] = TextInputButton({"min": 1, "max": 99, "default": 5, "value": 5},
+                                                (15, main_gui["brush_size_button"].rect.bottom + 10), 30,
+                                                "Cell weight: ")
+
+    main_gui["landmarks_button"] = TextInputButton({"min": 1, "max": 32, "default": LANDMARK_COUNT,
+                                                    "value": LANDMARK_COUNT},
+                                                   (15, main_gui["weight_button"].rect.bottom + 10), 30,
+                                                   "ALT landmarks: ", func=set_landmarks)
+
+    main_gui["epsilon_button"] = TextInputButton({"min": 0, "max": 500, "default": round(EPSILON * 100),
+                                                  "value": round(EPSILON * 100)},
+                                                 (15, main_gui["landmarks_button"].rect.bottom + 10), 40,
+                                                 "Weighted A* +%: ", func=set_epsilon)
+
+    main_gui["time_limit_button"] = TextInputButton({"min": 0, "max": 600000, "default": 0, "value": 0},
+                                                    (15, main_gui["epsilon_button"].rect.bottom + 10), 60,
+                                                    "Time limit (ms): ", func=set_limits)
+
+    main_gui["expansion_limit_button"] = TextInputButton({"min": 0, "max": 9999999, "default": 0, "value": 0},
+                                                         (15, main_gui["time_limit_button"].rect.bottom + 10), 70,
+                                                         "Step limit: ", func=set_limits)
+
+    main_gui["save_grid_button"] = SystemButton((15, main_gui["expansion_limit_button"].rect.bottom + 30),
                                                 "Save Grid", save)
 
     main_gui["load_grid_button"] = SystemButton((main_gui["save_grid_button"].rect.right + 5,
@@ -700,6 +838,80 @@ def init_stats(pathfinder: Any) -> StatsHandler:
         """ Get the time taken for preprocessing Rectangular Symmetry Reduction from the pathfinder"""
         return round(pathfinder.rsr_prep_dt, 2)
 
+    def get_jump_tables_dt() -> float:
+        """ Get the time taken for preprocessing the JPS+ jump tables from the pathfinder"""
+        return round(pathfinder.jump_tables_prep_dt, 2)
+
+    def get_components_dt() -> float:
+        """ Get the time taken for labelling the connected components (only a check when they are up to date) from
+        the pathfinder"""
+        return round(pathfinder.components_prep_dt, 2)
+
+    def get_store_dt() -> float:
+        """ Get the time taken for filling the flat grid store (only a check when it is up to date) from the
+        pathfinder"""
+        return round(pathfinder.store_prep_dt, 2)
+
+    def get_hierarchy_dt() -> float:
+        """ Get the time taken for building the HPA* abstract graph from the pathfinder"""
+        return round(pathfinder.hierarchy_prep_dt, 2)
+
+    def get_landmarks_dt() -> float:
+        """ Get the time taken for computing the ALT landmark tables from the pathfinder"""
+        return round(pathfinder.landmarks_prep_dt, 2)
+
+    def get_landmarks_size() -> float:
+        """ Get the size in KB of the ALT landmark tables from the pathfinder"""
+        if pathfinder.landmark_tables is None:
+            return 0
+        return round(pathfinder.landmark_tables.memory / 1024, 1)
+
+    def get_replan_dt() -> float:
+        """ Get the time taken by D* Lite to repair its path after the last wall edit from the pathfinder"""
+        return round(pathfinder.replan_dt, 2)
+
+    def get_los_checks() -> int:
+        """ Get the number of line of sight checks traced by the last Theta* search from the pathfinder"""
+        if pathfinder.line_of_sight is None:
+            return 0
+        return pathfinder.line_of_sight.checks
+
+    def get_los_dt() -> float:
+        """ Get the time spent in line of sight checks (cached ones included) by the last Theta* search"""
+        if pathfinder.line_of_sight is None:
+            return 0
+        return round(pathfinder.line_of_sight.dt, 2)
+
+    def get_reached_goal() -> str:
+        """ Get the position of the end node the last path found leads to from the pathfinder"""
+        goal = pathfinder.reached_goal
+        if goal is None:
+            return "-"
+        return f"({goal.column}, {goal.row})"
+
+    def get_flow_dt() -> float:
+        """ Get the time taken for getting the distance and flow fields (only a lookup when cached) from the
+        pathfinder"""
+        return round(pathfinder.flow_prep_dt, 2)
+
+    def get_expansions() -> Union[int, str]:
+        """ Get the number of nodes expanded by the A* family search engine (HeapSearch and its variants, or
+        StoreSearch on the grid store) of the pathfinder, '-' for BFS, the bidirectional engines and D* Lite which do
+        not count their expansions"""
+        if pathfinder.store_engine is not None:
+            return pathfinder.store_engine.expanded
+        if pathfinder.search_engine is None or pathfinder.bidirectional_engine is not None or \
+                pathfinder.algo in (pathfinder.bfs, pathfinder.dstar):
+            return "-"
+        return len(pathfinder.search_engine.closed)
+
+    def get_cost_ratio() -> Union[float, str]:
+        """ Get the cost of the path found over the cost of the cheapest path, stored by the pathfinder for Weighted A*
+        and Greedy Best First Search, '-' for the other algorithms"""
+        if not pathfinder.cost_ratio:
+            return "-"
+        return round(pathfinder.cost_ratio, 3)
+
     def get_path_len() -> float:
         """ Get the lenght of the shortest path found by the pathfinder"""
         return len(pathfinder.shortest_path)
@@ -720,10 +932,54 @@ def init_stats(pathfinder: Any) -> StatsHandler:
         rsr_prep_time=Stat("RSR Preprocess (ms): ", cst.BLACK,
                            (cfg.stats_background_rect.x + 15, cfg.stats_background_rect.y + 55), get_rsr_dt),
 
+        jump_tables_prep_time=Stat("JPS+ Preprocess (ms): ", cst.BLACK,
+                                   (cfg.stats_background_rect.x + 15, cfg.stats_background_rect.y + 75),
+                                   get_jump_tables_dt),
+
+        components_prep_time=Stat("Components (ms): ", cst.BLACK,
+                                  (cfg.stats_background_rect.x + 15, cfg.stats_background_rect.y + 95),
+                                  get_components_dt),
+
+        expansions=Stat("Expanded nodes: ", cst.BLACK,
+                        (cfg.stats_background_rect.x + 15, cfg.stats_background_rect.y + 115), get_expansions),
+
+        cost_ratio=Stat("Cost / cheapest: ", cst.BLACK,
+                        (cfg.stats_background_rect.x + 300, cfg.stats_background_rect.y + 115), get_cost_ratio),
+
         fps_stat=Stat("FPS: ", cst.BLACK,
                       (cfg.stats_background_rect.x + 300, cfg.stats_background_rect.y + 15), get_fps),
 
         path_length=Stat("Path length: ", cst.BLACK,
-                         (cfg.stats_background_rect.x + 300, cfg.stats_background_rect.y + 35), get_path_len))
+                         (cfg.stats_background_rect.x + 300, cfg.stats_background_rect.y + 35), get_path_len),
+
+        hierarchy_prep_time=Stat("HPA* Preprocess (ms): ", cst.BLACK,
+                                 (cfg.stats_background_rect.x + 300, cfg.stats_background_rect.y + 55),
+                                 get_hierarchy_dt),
+
+        landmarks_prep_time=Stat("ALT Preprocess (ms): ", cst.BLACK,
+                                 (cfg.stats_background_rect.x + 300, cfg.stats_background_rect.y + 75),
+                                 get_landmarks_dt),
+
+        landmarks_size=Stat("ALT Tables (KB): ", cst.BLACK,
+                            (cfg.stats_background_rect.x + 300, cfg.stats_background_rect.y + 95),
+                            get_landmarks_size),
+
+        replan_time=Stat("D* Lite Replan (ms): ", cst.BLACK,
+                         (cfg.stats_background_rect.x + 550, cfg.stats_background_rect.y + 15), get_replan_dt),
+
+        los_checks=Stat("LOS checks: ", cst.BLACK,
+                        (cfg.stats_background_rect.x + 550, cfg.stats_background_rect.y + 35), get_los_checks),
+
+        los_time=Stat("LOS time (ms): ", cst.BLACK,
+                      (cfg.stats_background_rect.x + 550, cfg.stats_background_rect.y + 55), get_los_dt),
+
+        reached_goal=Stat("End reached: ", cst.BLACK,
+                          (cfg.stats_background_rect.x + 550, cfg.stats_background_rect.y + 75), get_reached_goal),
+
+        flow_prep_time=Stat("Flow field (ms): ", cst.BLACK,
+                            (cfg.stats_background_rect.x + 550, cfg.stats_background_rect.y + 95), get_flow_dt),
+
+        store_prep_time=Stat("Flat store (ms): ", cst.BLACK,
+                             (cfg.stats_background_rect.x + 550, cfg.stats_background_rect.y + 115), get_store_dt))
 
     return stat_handler
@@ -0,0 +1,256 @@
+""" The HPA module holds Hierarchical Pathfinding A* (HPA*). The grid is split into square clusters, entrances are
+placed on the borders between neighbor clusters and the costs between the entrances of each cluster are precomputed:
+this abstract graph (Hierarchy) is built once per set of walls and cell weights. A query (HierarchicalQuery) inserts
+the start and end nodes in it and is searched with algo.HeapSearch, then the abstract path is refined cluster by
+cluster. Paths are optimal on the abstract graph, not on the grid: they must cross cluster borders at transitions,
+so they cost about 5% more than the A* ones on average (up to about 25% on long paths, 60x40 grids with 20% walls).
+Short queries across a border are the worst case, the detour through the nearest transition can cost several times
+the direct path (up to 3 times in the same tests, a path costing 9 for an optimal 3).
+It follows the movement rules of Node.get_neighbors with walls read from a wall mask (wall_mask[column][row] -> bool),
+so it works with the nodes of both pathfinders (only column, row, weight and came_from are used).
+"""
+
+from heapq import heappush, heappop
+from typing import *
+
+CLUSTER_SIZE = 10
+ENTRANCE_SPLIT = 6  # Entrances at least this long get a transition at both ends instead of one in the middle
+
+STRAIGHT_MOVES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIAGONAL_MOVES = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class Hierarchy:
+    """ Abstract graph of the grid: edges[node] lists the (node, cost) successors of an entrance node, to the
+    entrances of the same cluster (precomputed path costs) and to the facing entrance of the neighbor cluster.
+    """
+
+    def __init__(self, all_nodes: List[List[Any]], wall_mask: List[List[bool]], diago: bool,
+                 cluster_size: int = CLUSTER_SIZE) -> None:
+        """ Build the abstract graph
+
+        :param all_nodes: Grid of nodes (all_nodes[column][row])
+        :param wall_mask: wall_mask[column][row] is True for walls
+        :param diago: Allows diagonal moves (no corner-cutting)
+        :param cluster_size: Side of the clusters in nodes
+        """
+        self.all_nodes = all_nodes
+        self.wall_mask = [column[:] for column in wall_mask]
+        self.weights = [[node.weight for node in column] for column in all_nodes]
+        self.diago = diago
+        self.cluster_size = cluster_size
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        self.edges = {}
+        self.entrances = {}  # cluster -> list of entrance nodes
+
+        self.find_entrances()
+        self.connect_entrances()
+
+    def matches(self, all_nodes: List[List[Any]], wall_mask: List[List[bool]], diago: bool) -> bool:
+        """ Return True if the abstract graph was built for this grid, walls, weights and diagonal setting"""
+        return self.all_nodes is all_nodes and self.diago == diago and self.wall_mask == wall_mask and \
+            self.weights == [[node.weight for node in column] for column in all_nodes]
+
+    def cluster_of(self, node: Any) -> Tuple[int, int]:
+        """ Return the (column, row) coordinates of the cluster holding the node"""
+        return node.column // self.cluster_size, node.row // self.cluster_size
+
+    def get_bounds(self, cluster: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """ Return the (left, top, right, bottom) inclusive bounds of a cluster"""
+        left, top = cluster[0] * self.cluster_size, cluster[1] * self.cluster_size
+        return left, top, min(left + self.cluster_size, self.width) - 1, min(top + self.cluster_size, self.height) - 1
+
+    def add_transition(self, first: Tuple[int, int], second: Tuple[int, int]) -> None:
+        """ Link two facing cells of neighbor clusters, both become entrances of their cluster
+
+        :param first: (column, row) of the cell in the first cluster
+        :param second: (column, row) of the cell in the second cluster
+        :return: None
+        """
+
+        first_node = self.all_nodes[first[0]][first[1]]
+        second_node = self.all_nodes[second[0]][second[1]]
+
+        self.edges.setdefault(first_node, []).append((second_node, self.weights[second[0]][second[1]]))
+        self.edges.setdefault(second_node, []).append((first_node, self.weights[first[0]][first[1]]))
+        for node in first_node, second_node:
+            entrances = self.entrances.setdefault(self.cluster_of(node), [])
+            if node not in entrances:
+                entrances.append(node)
+
+    def find_entrances(self) -> None:
+        """ Split the borders between clusters in runs of facing free cells (entrances), each one gets one transition
+        in its middle, or one at each end if it is long
+
+        :return: None
+        """
+
+        wall_mask = self.wall_mask
+        size = self.cluster_size
+
+        def add_entrance(cells: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> None:
+            if len(cells) < ENTRANCE_SPLIT:
+                self.add_transition(*cells[len(cells) // 2])
+            else:
+                self.add_transition(*cells[0])
+                self.add_transition(*cells[-1])
+
+        # Vertical borders, between columns column and column + 1
+        for column in range(size - 1, self.width - 1, size):
+            for top in range(0, self.height, size):
+                cells = []
+                for row in range(top, min(top + size, self.height)):
+                    if wall_mask[column][row] or wall_mask[column + 1][row]:
+                        if cells:
+                            add_entrance(cells)
+                            cells = []
+                    else:
+                        cells.append(((column, row), (column + 1, row)))
+                if cells:
+                    add_entrance(cells)
+
+        # Horizontal borders, between rows row and row + 1
+        for row in range(size - 1, self.height - 1, size):
+            for left in range(0, self.width, size):
+                cells = []
+                for column in range(left, min(left + size, self.width)):
+                    if wall_mask[column][row] or wall_mask[column][row + 1]:
+                        if cells:
+                            add_entrance(cells)
+                            cells = []
+                    else:
+                        cells.append(((column, row), (column, row + 1)))
+                if cells:
+                    add_entrance(cells)
+
+    def connect_entrances(self) -> None:
+        """ Precompute the path costs between the entrances of each cluster
+
+        :return: None
+        """
+
+        for cluster, entrances in self.entrances.items():
+            bounds = self.get_bounds(cluster)
+            for entrance in entrances:
+                costs, parents = self.local_search(entrance, bounds)
+                for other in entrances:
+                    if other is not entrance and (other.column, other.row) in costs:
+                        self.edges[entrance].append((other, costs[other.column, other.row]))
+
+    def local_search(self, start: Any, bounds: Tuple[int, int, int, int], goal: Optional[Any] = None,
+                     reverse: bool = False) -> Tuple[Dict[Tuple[int, int], float], Dict[Tuple[int, int], Any]]:
+        """ Dijkstra's algorithm restricted to a cluster
+
+        :param start: Node to search from
+        :param bounds: (left, top, right, bottom) inclusive bounds of the cluster
+        :param goal: Node stopping the search once reached
+        :param reverse: Computes the costs from the cells to start instead (a move costs the weight of the cell it
+            enters, so it is not symmetric)
+        :return: costs and parents dicts indexed by (column, row)
+        """
+
+        left, top, right, bottom = bounds
+        wall_mask = self.wall_mask
+        weights = self.weights
+        moves = [(dx, dy, 1) for dx, dy in STRAIGHT_MOVES]
+        if self.diago:
+            moves += [(dx, dy, 1.41421) for dx, dy in DIAGONAL_MOVES]
+
+        start_cell = start.column, start.row
+        goal_cell = (goal.column, goal.row) if goal else None
+        costs = {start_cell: 0}
+        parents = {start_cell: None}
+        closed = set()
+        queue = [(0, start_cell)]
+
+        while queue:
+            cost, cell = heappop(queue)
+            if cell in closed:
+                continue
+            closed.add(cell)
+            if cell == goal_cell:
+                break
+
+            column, row = cell
+            for dx, dy, move_cost in moves:
+                new_column, new_row = column + dx, row + dy
+                if not (left <= new_column <= right and top <= new_row <= bottom) or wall_mask[new_column][new_row]:
+                    continue
+                # No corner-cutting, both cells are inside the cluster since the move is
+                if dx and dy and (wall_mask[new_column][row] or wall_mask[column][new_row]):
+                    continue
+
+                new_cost = cost + move_cost * (weights[column][row] if reverse else weights[new_column][new_row])
+                if new_cost < costs.get((new_column, new_row), float("inf")):
+                    costs[new_column, new_row] = new_cost
+                    parents[new_column, new_row] = cell
+                    heappush(queue, (new_cost, (new_column, new_row)))
+
+        return costs, parents
+
+    def refine(self, path: List[Any]) -> List[Any]:
+        """ Turn a path of abstract nodes into a path of grid nodes: transitions between clusters are single moves, the
+        others are searched again inside their cluster
+
+        :param path: Abstract path from start to end
+        :return: Path with every node from start to end
+        """
+
+        if not path:
+            return path
+
+        full_path = [path[0]]
+
+        for previous, node in zip(path, path[1:]):
+            cluster = self.cluster_of(previous)
+            if cluster != self.cluster_of(node):
+                full_path.append(node)
+                continue
+
+            costs, parents = self.local_search(previous, self.get_bounds(cluster), node)
+            segment = []
+            cell = node.column, node.row
+            while parents[cell] is not None:
+                segment.append(self.all_nodes[cell[0]][cell[1]])
+                cell = parents[cell]
+            segment.reverse()
+            full_path += segment
+
+        return full_path
+
+
+class HierarchicalQuery:
+    """ Successor generator for one HPA* search, use its successors method with algo.HeapSearch. The start node is
+    linked to the entrances of its cluster and those of the end's cluster to the end node, without changing the
+    Hierarchy.
+    """
+
+    def __init__(self, hierarchy: Hierarchy, start: Any, end: Any) -> None:
+        """ Insert start and end in the abstract graph
+
+        :param hierarchy: Abstract graph of the grid
+        :param start: Starting node
+        :param end: Goal node
+        """
+        self.hierarchy = hierarchy
+        self.extra_edges = {}
+
+        start_cluster, end_cluster = hierarchy.cluster_of(start), hierarchy.cluster_of(end)
+
+        costs, parents = hierarchy.local_search(start, hierarchy.get_bounds(start_cluster))
+        for entrance in hierarchy.entrances.get(start_cluster, ()):
+            if (entrance.column, entrance.row) in costs:
+                self.extra_edges.setdefault(start, []).append((entrance, costs[entrance.column, entrance.row]))
+        if start_cluster == end_cluster and (end.column, end.row) in costs:
+            self.extra_edges.setdefault(start, []).append((end, costs[end.column, end.row]))
+
+        costs, parents = hierarchy.local_search(end, hierarchy.get_bounds(end_cluster), reverse=True)
+        for entrance in hierarchy.entrances.get(end_cluster, ()):
+            if (entrance.column, entrance.row) in costs:
+                self.extra_edges.setdefault(entrance, []).append((end, costs[entrance.column, entrance.row]))
+
+    def successors(self, node: Any) -> List[Tuple[Any, float]]:
+        """ Return the (node, cost) successors of an abstract node"""
+        return self.hierarchy.edges.get(node, []) + self.extra_edges.get(node, [])
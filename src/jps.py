@@ -0,0 +1,420 @@
+""" The JPS module holds the Jump Point Search successor generator. It is plugged into the HeapSearch engine of the
+algo module, which then only opens jump points instead of every neighbor.
+It follows the same movement rules as Node.get_neighbors: 4-connected, or 8-connected without corner-cutting, on a
+uniform cost grid (cell weights are ignored). Walls are read from a wall mask: wall_mask[column][row] -> bool
+It also holds the JPS+ variant, which reads precomputed jump distances (JumpTables) instead of scanning the grid.
+"""
+
+from array import array
+from typing import *
+
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def sign(value: int) -> int:
+    """ Return -1, 0 or 1 according to the sign of value"""
+    return (value > 0) - (value < 0)
+
+
+def get_wall_mask(all_nodes: List[List[Any]], is_wall: Callable[[Any], Any]) -> List[List[bool]]:
+    """ Return a wall_mask[column][row] double list of booleans from a grid of nodes
+
+    :param all_nodes: Grid of nodes (all_nodes[column][row])
+    :param is_wall: Function returning a truthy value if the node is a wall
+    :return: wall mask
+    """
+    return [[bool(is_wall(node)) for node in column] for column in all_nodes]
+
+
+def fill_path(path: List[Any], all_nodes: List[List[Any]], diago: bool = True) -> List[Any]:
+    """ Add the nodes skipped between consecutive jump points. JPS jumps are straight or diagonal lines, RSR jumps
+    can be any move inside an empty rectangle: they are filled diagonally first, then straight.
+
+    :param path: Path of jump points from start to end
+    :param all_nodes: Grid of nodes (all_nodes[column][row])
+    :param diago: Allows diagonal moves, else columns are filled first, then rows
+    :return: Path with every node from start to end
+    """
+
+    if not path:
+        return path
+
+    full_path = [path[0]]
+
+    for previous, node in zip(path, path[1:]):
+        column, row = previous.column, previous.row
+
+        while column != node.column or row != node.row:
+            dx = sign(node.column - column)
+            dy = sign(node.row - row)
+            if dx and not diago:
+                dy = 0
+            column += dx
+            row += dy
+            full_path.append(all_nodes[column][row])
+
+    return full_path
+
+
+class JumpPointSearch:
+    """ Successor generator for Jump Point Search, use its successors method with algo.HeapSearch.
+    Jumps are done with loops (no recursion) so long corridors do not hit the recursion limit.
+    """
+
+    def __init__(self, all_nodes: List[List[Any]], wall_mask: List[List[bool]], end: Any, diago: bool) -> None:
+        """ Create the successor generator for one search
+
+        :param all_nodes: Grid of nodes (all_nodes[column][row]), nodes need column, row and came_from attributes
+        :param wall_mask: wall_mask[column][row] is True for walls
+        :param end: Goal node, it is always a jump point
+        :param diago: Allows diagonal moves (no corner-cutting)
+        """
+        self.all_nodes = all_nodes
+        self.wall_mask = wall_mask
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+        self.end_col = end.column
+        self.end_row = end.row
+        self.diago = diago
+
+    def free(self, column: int, row: int) -> bool:
+        """ Return True if the position is inside the grid and not a wall"""
+        return 0 <= column < self.width and 0 <= row < self.height and not self.wall_mask[column][row]
+
+    def get_directions(self, node: Any) -> List[Tuple[int, int]]:
+        """ Return the pruned directions to explore from node, according to the direction it was reached from
+
+        :param node: Node being expanded
+        :return: List of (dx, dy) directions
+        """
+
+        free = self.free
+        col, row = node.column, node.row
+        parent = node.came_from
+
+        if parent is None:
+            directions = [(dx, dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)) if free(col + dx, row + dy)]
+            if self.diago:
+                directions += [(dx, dy) for dx in (1, -1) for dy in (1, -1)
+                               if free(col + dx, row) and free(col, row + dy)]
+            return directions
+
+        dx = sign(col - parent.column)
+        dy = sign(row - parent.row)
+        directions = []
+
+        if dx and dy:
+            if free(col, row + dy):
+                directions.append((0, dy))
+            if free(col + dx, row):
+                directions.append((dx, 0))
+            if free(col, row + dy) and free(col + dx, row):
+                directions.append((dx, dy))
+
+        elif self.diago:
+            # Side moves are always kept, the diagonal ones need both their orthogonal nodes free
+            if dx:
+                next_free, side_a, side_b = free(col + dx, row), free(col, row + 1), free(col, row - 1)
+                if next_free:
+                    directions.append((dx, 0))
+                    if side_a:
+                        directions.append((dx, 1))
+                    if side_b:
+                        directions.append((dx, -1))
+                if side_a:
+                    directions.append((0, 1))
+                if side_b:
+                    directions.append((0, -1))
+            else:
+                next_free, side_a, side_b = free(col, row + dy), free(col + 1, row), free(col - 1, row)
+                if next_free:
+                    directions.append((0, dy))
+                    if side_a:
+                        directions.append((1, dy))
+                    if side_b:
+                        directions.append((-1, dy))
+                if side_a:
+                    directions.append((1, 0))
+                if side_b:
+                    directions.append((-1, 0))
+
+        else:
+            if dx:
+                candidates = (dx, 0), (0, 1), (0, -1)
+            else:
+                candidates = (0, dy), (1, 0), (-1, 0)
+            directions = [(x, y) for x, y in candidates if free(col + x, row + y)]
+
+        return directions
+
+    def jump_straight(self, col: int, row: int, dx: int, dy: int) -> Optional[Tuple[int, int]]:
+        """ Move horizontally or vertically from (col, row) until a jump point, a wall or the grid's edge
+
+        :return: Jump point position or None
+        """
+
+        free = self.free
+        end_col, end_row = self.end_col, self.end_row
+
+        while True:
+            if not free(col, row):
+                return None
+            if col == end_col and row == end_row:
+                return col, row
+
+            # forced neighbors: a side node is free while the one behind it is not
+            if dx:
+                if (free(col, row - 1) and not free(col - dx, row - 1)) or \
+                        (free(col, row + 1) and not free(col - dx, row + 1)):
+                    return col, row
+            else:
+                if (free(col - 1, row) and not free(col - 1, row - dy)) or \
+                        (free(col + 1, row) and not free(col + 1, row - dy)):
+                    return col, row
+
+                # Without diagonals, vertical moves must look for horizontal jump points
+                if not self.diago and \
+                        (self.jump_straight(col + 1, row, 1, 0) or self.jump_straight(col - 1, row, -1, 0)):
+                    return col, row
+
+            col += dx
+            row += dy
+
+    def jump_diagonal(self, col: int, row: int, dx: int, dy: int) -> Optional[Tuple[int, int]]:
+        """ Move diagonally from (col, row) until a jump point, a wall, the grid's edge or a corner that cannot be cut
+
+        :return: Jump point position or None
+        """
+
+        free = self.free
+        end_col, end_row = self.end_col, self.end_row
+
+        while True:
+            if not free(col, row):
+                return None
+            if col == end_col and row == end_row:
+                return col, row
+
+            if self.jump_straight(col + dx, row, dx, 0) or self.jump_straight(col, row + dy, 0, dy):
+                return col, row
+
+            if not (free(col + dx, row) and free(col, row + dy)):
+                return None
+
+            col += dx
+            row += dy
+
+    def successors(self, node: Any) -> List[Tuple[Any, float]]:
+        """ Return the jump points reachable from node and the cost to reach them
+
+        :param node: Node being expanded (its came_from gives the direction it was reached from)
+        :return: List of (jump point node, cost)
+        """
+
+        successors = []
+        col, row = node.column, node.row
+
+        for dx, dy in self.get_directions(node):
+            if dx and dy:
+                jump_point = self.jump_diagonal(col + dx, row + dy, dx, dy)
+            else:
+                jump_point = self.jump_straight(col + dx, row + dy, dx, dy)
+
+            if jump_point is not None:
+                jump_col, jump_row = jump_point
+                distance = max(abs(jump_col - col), abs(jump_row - row))
+                successors.append((self.all_nodes[jump_col][jump_row], distance * 1.41421 if dx and dy else distance))
+
+        return successors
+
+
+class JumpTables:
+    """ JPS+ preprocessing: for every node and direction, the distance to the next jump point (positive) or the
+    number of free nodes before a wall or the grid's edge (zero or negative). The goal is not known at this point,
+    JumpPointSearchPlus checks it at query time.
+    Tables only depend on the walls and the diagonal setting, they are pickled with the grid so they can be reused as
+    long as matches() is True.
+    """
+
+    def __init__(self, wall_mask: List[List[bool]], diago: bool) -> None:
+        """ Compute the jump distance tables
+
+        :param wall_mask: wall_mask[column][row] is True for walls
+        :param diago: Allows diagonal moves (no corner-cutting)
+        """
+        self.wall_mask = wall_mask
+        self.diago = diago
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        # The grid is flattened column by column with a border of walls so no bound checks are needed:
+        # index = (column + 1) * stride + row + 1
+        self.stride = self.height + 2
+        self.free = bytearray((self.width + 2) * self.stride)
+        for column in range(self.width):
+            offset = (column + 1) * self.stride + 1
+            self.free[offset: offset + self.height] = bytes(not wall for wall in wall_mask[column])
+
+        self.distances = {}
+        for direction in DIRECTIONS[:4]:
+            if direction[0]:
+                self.build_straight(direction)
+        for direction in DIRECTIONS[:4]:
+            if direction[1]:
+                self.build_straight(direction)
+        if diago:
+            for direction in DIRECTIONS[4:]:
+                self.build_diagonal(direction)
+
+    def matches(self, wall_mask: List[List[bool]], diago: bool) -> bool:
+        """ Return True if the tables were computed for these walls and diagonal setting"""
+        return self.diago == diago and self.wall_mask == wall_mask
+
+    def index(self, column: int, row: int) -> int:
+        """ Return the flat index of a position"""
+        return (column + 1) * self.stride + row + 1
+
+    def get_order(self, step: int) -> range:
+        """ Return the index order so that index + step is always computed before index"""
+        if step > 0:
+            return range(len(self.free) - 1, -1, -1)
+        return range(len(self.free))
+
+    def build_straight(self, direction: Tuple[int, int]) -> None:
+        """ Compute the table of a horizontal or vertical direction, horizontal ones must be built first since
+        vertical moves also stop on horizontal jump points when diagonals are not allowed"""
+
+        dx, dy = direction
+        free = self.free
+        stride = self.stride
+        step = dx * stride + dy
+        back = -step
+
+        # A side node is free while the one behind it is not (forced neighbor)
+        side = 1 if dx else stride
+        check_horizontal = dy and not self.diago
+        if check_horizontal:
+            right, left = self.distances[(1, 0)], self.distances[(-1, 0)]
+
+        table = self.distances[direction] = array("i", [0]) * len(free)
+
+        for index in self.get_order(step):
+            if not free[index]:
+                continue
+            target = index + step
+            if not free[target]:
+                continue
+            if (free[target - side] and not free[target - side + back]) or \
+                    (free[target + side] and not free[target + side + back]) or \
+                    (check_horizontal and (right[target] > 0 or left[target] > 0)):
+                table[index] = 1
+            else:
+                distance = table[target]
+                table[index] = distance + 1 if distance > 0 else distance - 1
+
+    def build_diagonal(self, direction: Tuple[int, int]) -> None:
+        """ Compute the table of a diagonal direction, the straight tables must be built first since a diagonal move
+        stops on nodes with a horizontal or vertical jump point"""
+
+        dx, dy = direction
+        free = self.free
+        stride = self.stride
+        step = dx * stride + dy
+        horizontal, vertical = self.distances[(dx, 0)], self.distances[(0, dy)]
+
+        table = self.distances[direction] = array("i", [0]) * len(free)
+
+        for index in self.get_order(step):
+            if not (free[index] and free[index + dx * stride] and free[index + dy]):
+                continue
+            target = index + step
+            if not free[target]:
+                continue
+            if horizontal[target] > 0 or vertical[target] > 0:
+                table[index] = 1
+            else:
+                distance = table[target]
+                table[index] = distance + 1 if distance > 0 else distance - 1
+
+
+class JumpPointSearchPlus(JumpPointSearch):
+    """ JPS+ successor generator: same successors as JumpPointSearch, but jumps are read from JumpTables in O(1)
+    instead of scanning node by node. The goal is caught when it lies on a ray within reach of the jump.
+    """
+
+    def __init__(self, all_nodes: List[List[Any]], tables: JumpTables, end: Any) -> None:
+        """ Create the successor generator for one search
+
+        :param all_nodes: Grid of nodes (all_nodes[column][row]), nodes need column, row and came_from attributes
+        :param tables: JumpTables matching the grid's walls
+        :param end: Goal node
+        """
+        super().__init__(all_nodes, tables.wall_mask, end, tables.diago)
+        self.tables = tables
+
+    def reaches_end(self, index: int, column: int, row: int, dx: int, dy: int) -> bool:
+        """ Return True if the end node is on the straight ray from (column, row) in (dx, dy) within reach"""
+
+        if dx:
+            distance = (self.end_col - column) * dx
+            return row == self.end_row and 0 < distance <= abs(self.tables.distances[(dx, 0)][index])
+        distance = (self.end_row - row) * dy
+        return column == self.end_col and 0 < distance <= abs(self.tables.distances[(0, dy)][index])
+
+    def jump_straight(self, col: int, row: int, dx: int, dy: int) -> Optional[Tuple[int, int]]:
+        """ Read the jump from the tables, (col, row) is the first node after the expanded one
+
+        :return: Jump point position or None
+        """
+
+        tables = self.tables
+        col -= dx
+        row -= dy
+        index = tables.index(col, row)
+        distance = tables.distances[(dx, dy)][index]
+        reach = abs(distance)
+
+        if dx or self.diago:
+            if self.reaches_end(index, col, row, dx, dy):
+                return self.end_col, self.end_row
+
+        else:
+            # Without diagonals, vertical moves also stop on nodes whose row holds the end node
+            steps = (self.end_row - row) * dy
+            if 0 < steps <= reach:
+                target = index + steps * dy
+                if self.end_col == col or self.reaches_end(target, col, self.end_row, 1, 0) or \
+                        self.reaches_end(target, col, self.end_row, -1, 0):
+                    if distance <= 0 or steps < distance:
+                        return col, self.end_row
+
+        if distance > 0:
+            return col + distance * dx, row + distance * dy
+        return None
+
+    def jump_diagonal(self, col: int, row: int, dx: int, dy: int) -> Optional[Tuple[int, int]]:
+        """ Read the jump from the tables, (col, row) is the first node after the expanded one. A diagonal move also
+        stops on the row or column of the end node if the end can be reached from there in a straight line
+
+        :return: Jump point position or None
+        """
+
+        tables = self.tables
+        col -= dx
+        row -= dy
+        index = tables.index(col, row)
+        distance = tables.distances[(dx, dy)][index]
+        reach = abs(distance)
+        step = dx * tables.stride + dy
+
+        steps = distance if distance > 0 else reach + 1
+        for end_steps, end_dx, end_dy in ((self.end_row - row) * dy, dx, 0), ((self.end_col - col) * dx, 0, dy):
+            if 0 < end_steps <= reach and end_steps < steps:
+                target_col, target_row = col + end_steps * dx, row + end_steps * dy
+                if (target_col == self.end_col and target_row == self.end_row) or \
+                        self.reaches_end(index + end_steps * step, target_col, target_row, end_dx, end_dy):
+                    steps = end_steps
+
+        if steps <= reach:
+            return col + steps * dx, row + steps * dy
+        return None
@@ -0,0 +1,295 @@
+""" The RSR module holds Rectangular Symmetry Reduction. Free space is decomposed into empty rectangles once (the
+preprocess), then searches skip their interior: RectangleJumps generates successors crossing a rectangle in one
+jump, computed from the rectangle's bounds. It works with every node type having column, row and
+get_passable_neighbors() (or a given neighbors function), so it is shared by algo.PathFinder and
+terminal_testing.SimplePathFinder.
+Rectangles only hold free cells of weight 1, jumps through them cost their length in moves.
+"""
+
+from array import array
+from operator import not_
+from typing import *
+
+MIN_SIZE = 3  # Smallest rectangle side, smaller rectangles have no interior to skip
+
+
+def get_free_mask(all_nodes: List[List[Any]], is_free: Callable[[Any], Any]) -> List[List[bool]]:
+    """ Return a free_mask[column][row] double list of booleans from a grid of nodes
+
+    :param all_nodes: Grid of nodes (all_nodes[column][row])
+    :param is_free: Function returning a truthy value if the node can be part of a rectangle
+    :return: free mask
+    """
+    return [[bool(is_free(node)) for node in column] for column in all_nodes]
+
+
+def find_rectangles(free_mask: List[List[bool]]) -> List[Tuple[int, int, int, int]]:
+    """ Decompose the free cells into non overlapping empty rectangles in a single pass over the columns. From every
+    free cell not yet covered (top-left corner), the largest square is found from the runs of free cells below it in
+    the next columns, then it is extended down and to the right as long as whole rows/columns are free, so rectangles
+    can not be grown further in those directions.
+    Cells are kept in a flat bytearray, column after column, so runs are measured with bytearray.find and rectangles
+    claimed with slice assignments: every cell is looked at by Python code a bounded number of times, O(N).
+
+    :param free_mask: free_mask[column][row] is True for cells that can be part of a rectangle
+    :return: List of (left, top, right, bottom) inclusive bounds, sides are at least MIN_SIZE
+    """
+
+    width, height = len(free_mask), len(free_mask[0])
+
+    # blocked[column * height + row] is 1 for cells that are not free or already in a rectangle
+    blocked = bytearray(width * height)
+    for column, column_mask in enumerate(free_mask):
+        blocked[column * height:(column + 1) * height] = bytes(map(not_, column_mask))
+
+    def run(column: int, row: int, limit: int) -> int:
+        """ Return the number of free cells from row down the column, at most limit"""
+        start = column * height + row
+        end = blocked.find(1, start, start + limit)
+        return limit if end == -1 else end - start
+
+    rectangles = []
+
+    for left in range(width - MIN_SIZE + 1):
+        base = left * height
+        top = blocked.find(0, base, base + height)
+
+        while top != -1:
+            top -= base
+            first_run = run(left, top, height - top)
+
+            if first_run < MIN_SIZE:  # No square can start anywhere in this run
+                top = blocked.find(0, base + top + first_run, base + height)
+                continue
+
+            # Largest square: the next columns must have as many free cells below top as the square is wide
+            size, limit = 1, first_run
+            while left + size < width:
+                limit = run(left + size, top, limit)
+                if limit <= size:
+                    break
+                size += 1
+
+            if size < MIN_SIZE:
+                # Column left + size is blocked at row top + limit, so are all the squares starting until that row
+                top = blocked.find(0, base + top + limit + 1, base + height)
+                continue
+
+            # Extend down as far as the square's columns are free, then right while whole columns are free. Both only
+            # need one find per column since columns are contiguous
+            depth = first_run
+            for column in range(left + 1, left + size):
+                depth = run(column, top, depth)
+
+            right = left + size - 1
+            while right + 1 < width and run(right + 1, top, depth) == depth:
+                right += 1
+            bottom = top + depth - 1
+
+            claimed = b"\x01" * (bottom - top + 1)
+            for column in range(left, right + 1):
+                blocked[column * height + top:column * height + bottom + 1] = claimed
+
+            rectangles.append((left, top, right, bottom))
+            top = blocked.find(0, base + bottom + 1, base + height)
+
+    return rectangles
+
+
+class SymmetryRectangles:
+    """ The empty rectangles of a grid and a flat index of the rectangle each cell belongs to, built once per set of
+    walls (it does not depend on the start, the end or diagonal moves).
+    """
+
+    def __init__(self, free_mask: List[List[bool]]) -> None:
+        """ Find the rectangles and index them
+
+        :param free_mask: free_mask[column][row] is True for cells that can be part of a rectangle
+        """
+        self.width = len(free_mask)
+        self.height = len(free_mask[0])
+        self.rectangles = find_rectangles(free_mask)
+
+        # index[column * height + row] -> rectangle number, -1 outside of every rectangle
+        self.index = array("i", [-1]) * (self.width * self.height)
+        for number, (left, top, right, bottom) in enumerate(self.rectangles):
+            rectangle_column = array("i", [number]) * (bottom - top + 1)
+            for column in range(left, right + 1):
+                start = column * self.height + top
+                self.index[start:start + bottom - top + 1] = rectangle_column
+
+    def get(self, column: int, row: int) -> Optional[Tuple[int, int, int, int]]:
+        """ Return the bounds of the rectangle holding the cell, None if there is none"""
+        number = self.index[column * self.height + row]
+        return self.rectangles[number] if number >= 0 else None
+
+    def is_interior(self, column: int, row: int) -> bool:
+        """ Return True if the cell is strictly inside a rectangle (skipped by the searches)"""
+        rectangle = self.get(column, row)
+        if rectangle is None:
+            return False
+        left, top, right, bottom = rectangle
+        return left < column < right and top < row < bottom
+
+
+class RectangleJumps:
+    """ Successor generator for searches on a grid reduced by SymmetryRectangles, use its successors method with
+    algo.HeapSearch (or algo.LayeredSearch with count_moves for BFS).
+
+    Nodes outside of the rectangles keep their neighbors. Perimeter nodes lose their neighbors inside the rectangle
+    and jump across it instead:
+     - straight to the opposite side
+     - diagonally until a side is hit (8-connected)
+     - to every node of the opposite side closer than a diagonal jump (8-connected), so crossing stays optimal
+    Endpoints (start and end) inside a rectangle are linked to the whole perimeter, and the perimeter to them.
+    Paths only hold the jump points, fill them with jps.fill_path.
+    """
+
+    def __init__(self, rectangles: SymmetryRectangles, all_nodes: List[List[Any]], endpoints: Iterable[Any],
+                 diago: bool, count_moves: bool = False,
+                 neighbors: Optional[Callable[[Any], List[Tuple[Any, float]]]] = None) -> None:
+        """ Create the successor generator for one search
+
+        :param rectangles: Rectangles of the grid
+        :param all_nodes: Grid of nodes (all_nodes[column][row])
+        :param endpoints: Start and end nodes, they can be inside a rectangle
+        :param diago: Allows diagonal moves (no corner-cutting)
+        :param count_moves: Costs are numbers of moves (for BFS) instead of distances
+        :param neighbors: Function returning the (node, cost) neighbors of a node, defaults to its passable neighbors
+        """
+        self.rectangles = rectangles
+        self.all_nodes = all_nodes
+        self.diago = diago
+        self.count_moves = count_moves
+        self.neighbors = neighbors if neighbors else lambda node: node.get_passable_neighbors()
+        self.inside_endpoints = {}  # rectangle bounds -> endpoints inside of it
+
+        for node in endpoints:
+            if rectangles.is_interior(node.column, node.row):
+                rectangle = rectangles.get(node.column, node.row)
+                self.inside_endpoints.setdefault(rectangle, set()).add(node)
+
+    def distance(self, dx: int, dy: int) -> float:
+        """ Cost of the shortest move sequence between two cells of the same rectangle
+
+        :param dx: Absolute column difference
+        :param dy: Absolute row difference
+        :return: Number of moves if count_moves, else octile (or manhattan) distance
+        """
+        if not self.diago:
+            return dx + dy
+        if self.count_moves:
+            return max(dx, dy)
+        return max(dx, dy) + 0.41421 * min(dx, dy)
+
+    def successors(self, node: Any) -> List[Tuple[Any, float]]:
+        """ Return the (node, cost) successors of a node
+
+        :param node: Expanded node
+        :return: successors list
+        """
+
+        column, row = node.column, node.row
+        rectangle = self.rectangles.get(column, row)
+
+        if rectangle is None:
+            if self.count_moves:
+                return [(neighbor, 1) for neighbor, cost in self.neighbors(node)]
+            return self.neighbors(node)
+
+        left, top, right, bottom = rectangle
+
+        if left < column < right and top < row < bottom:
+            return self.from_inside(node, rectangle)
+
+        successors = []
+        for neighbor, cost in self.neighbors(node):
+            if not (left < neighbor.column < right and top < neighbor.row < bottom):
+                successors.append((neighbor, 1 if self.count_moves else cost))
+
+        successors += self.jumps(column, row, rectangle)
+
+        for endpoint in self.inside_endpoints.get(rectangle, ()):
+            successors.append((endpoint, self.distance(abs(endpoint.column - column), abs(endpoint.row - row))))
+
+        return successors
+
+    def jumps(self, column: int, row: int, rectangle: Tuple[int, int, int, int]) -> List[Tuple[Any, float]]:
+        """ Jumps across the rectangle from one of its perimeter nodes, all targets are on the perimeter
+
+        :param column: Column of the perimeter node
+        :param row: Row of the perimeter node
+        :param rectangle: (left, top, right, bottom) bounds
+        :return: (node, cost) list
+        """
+
+        left, top, right, bottom = rectangle
+        all_nodes = self.all_nodes
+        jumps = []
+
+        # Inward direction of the side the node is on, corners have no straight jump
+        on_vertical_side = column in (left, right) and top < row < bottom
+        on_horizontal_side = row in (top, bottom) and left < column < right
+
+        if on_vertical_side:
+            dx = 1 if column == left else -1
+            length = right - left
+            target = right if dx == 1 else left
+
+            if self.diago:
+                # Opposite side nodes reachable with less moves than a diagonal jump (straight jump included)
+                for target_row in range(max(top, row - length + 1), min(bottom, row + length - 1) + 1):
+                    jumps.append((all_nodes[target][target_row], self.distance(length, abs(target_row - row))))
+            else:
+                jumps.append((all_nodes[target][row], length))
+
+        elif on_horizontal_side:
+            dy = 1 if row == top else -1
+            length = bottom - top
+            target = bottom if dy == 1 else top
+
+            if self.diago:
+                for target_column in range(max(left, column - length + 1), min(right, column + length - 1) + 1):
+                    jumps.append((all_nodes[target_column][target], self.distance(abs(target_column - column), length)))
+            else:
+                jumps.append((all_nodes[column][target], length))
+
+        if self.diago:
+            for dx in (1, -1):
+                for dy in (1, -1):
+                    # Number of diagonal moves until a side is hit
+                    steps = min(right - column if dx == 1 else column - left,
+                                bottom - row if dy == 1 else row - top)
+                    # Moves of 1 are regular neighbors, others go through the interior
+                    if steps > 1:
+                        jumps.append((all_nodes[column + dx * steps][row + dy * steps], self.distance(steps, steps)))
+
+        return jumps
+
+    def from_inside(self, node: Any, rectangle: Tuple[int, int, int, int]) -> List[Tuple[Any, float]]:
+        """ Successors of an endpoint inside a rectangle: every perimeter node and the other endpoint if it is in the
+        same rectangle
+
+        :param node: Start or end node inside the rectangle
+        :param rectangle: (left, top, right, bottom) bounds
+        :return: (node, cost) list
+        """
+
+        left, top, right, bottom = rectangle
+        column, row = node.column, node.row
+        all_nodes = self.all_nodes
+        distance = self.distance
+
+        successors = []
+        for target_column in range(left, right + 1):
+            successors.append((all_nodes[target_column][top], distance(abs(target_column - column), row - top)))
+            successors.append((all_nodes[target_column][bottom], distance(abs(target_column - column), bottom - row)))
+        for target_row in range(top + 1, bottom):
+            successors.append((all_nodes[left][target_row], distance(column - left, abs(target_row - row))))
+            successors.append((all_nodes[right][target_row], distance(right - column, abs(target_row - row))))
+
+        for endpoint in self.inside_endpoints[rectangle]:
+            if endpoint is not node:
+                successors.append((endpoint, distance(abs(endpoint.column - column), abs(endpoint.row - row))))
+
+        return successors
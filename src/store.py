@@ -0,0 +1,217 @@
+""" The STORE module holds the flat grid store: a search-side copy of the cells of a grid in parallel arrays. The nodes
+stay the storage of the grid, the store is an extra cache next to them (about 33 bytes per cell on top of the nodes),
+rebuilt when the grid version changes and kept up to date with the edits passed to the pathfinders.
+status holds the flags of each cell in a byte, weights its cost multiplier, and the search state lives in costs (cost
+so far), parents (flat index of the previous cell) and priorities (priority of the last push, older heap entries of a
+cell are stale). A search on the store (StoreSearch) touches no node: it returns (column, row) positions, and the
+pathfinders only get the nodes they draw or return.
+It follows the movement rules of Node.get_neighbors with walls read from a wall mask (wall_mask[column][row] -> bool),
+so it works with the nodes of both pathfinders (only column and row are used).
+"""
+
+from array import array
+from heapq import heappush, heappop
+from typing import *
+
+INF = float("inf")
+
+# Cell flags, the same bits as the Node flags
+WALL = 2
+CLOSED = 4  # Node.VISITED, expanded by the search
+
+
+class GridStore:
+    """ Cells of a wall-padded grid in flat arrays: index = (column + 1) * stride + row + 1, the padding cells are walls
+    so moves need no bounds check. parents[index] is -1 if the cell has no parent. version is the grid version the
+    cells were filled (or last updated) for.
+    """
+
+    def __init__(self, wall_mask: List[List[bool]], weights: List[List[float]], version: Optional[int] = None) -> None:
+        """ Fill the arrays
+
+        :param wall_mask: wall_mask[column][row] is True for walls
+        :param weights: weights[column][row] is the cost multiplier of entering the cell
+        :param version: Version of the grid (Grid.version), None if unknown
+        """
+        self.version = version
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        self.stride = self.height + 2
+        size = (self.width + 2) * self.stride
+        self.status = bytearray([WALL]) * size
+        self.weights = array("d", [1]) * size
+        for column in range(self.width):
+            offset = self.index(column, 0)
+            self.status[offset: offset + self.height] = bytes(WALL if wall else 0 for wall in wall_mask[column])
+            self.weights[offset: offset + self.height] = array("d", weights[column])
+
+        self.costs = array("d", [INF]) * size
+        self.parents = array("l", [-1]) * size
+        self.priorities = array("d", [INF]) * size
+
+    def index(self, column: int, row: int) -> int:
+        """ Return the flat index of a position"""
+        return (column + 1) * self.stride + row + 1
+
+    def position(self, index: int) -> Tuple[int, int]:
+        """ Return the (column, row) of a flat index"""
+        column, row = divmod(index, self.stride)
+        return column - 1, row - 1
+
+    def matches(self, version: int) -> bool:
+        """ Return True if the store was filled (or updated) for this grid version"""
+        return self.version is not None and self.version == version
+
+    @property
+    def memory(self) -> int:
+        """ Size of the arrays in bytes, on top of the nodes"""
+        return len(self.status) + sum(len(values) * values.itemsize
+                                      for values in (self.weights, self.costs, self.parents, self.priorities))
+
+    def update_cell(self, column: int, row: int, is_wall: bool, weight: float) -> None:
+        """ Take an edited cell (wall drawn or erased, weight changed) into account
+
+        :param column: Column of the cell
+        :param row: Row of the cell
+        :param is_wall: The cell is a wall
+        :param weight: Cost multiplier of entering the cell
+        :return: None
+        """
+        index = self.index(column, row)
+        self.status[index] = WALL if is_wall else 0
+        self.weights[index] = weight
+
+    def reset_search(self) -> None:
+        """ Clear the search state of every cell
+
+        :return: None
+        """
+        size = len(self.status)
+        self.costs[:] = array("d", [INF]) * size
+        self.parents[:] = array("l", [-1]) * size
+        self.priorities[:] = array("d", [INF]) * size
+        self.status[:] = self.status.translate(bytes(flags & ~CLOSED for flags in range(256)))
+
+
+class StoreSearch:
+    """ A* (Dijkstra without heuristic) on a GridStore, one cell is expanded per step. The heap holds (priority,
+    heuristic, index) entries, ties go to the cell closest to the goals. The search state is the one of the store, so
+    one search runs on a store at a time. done is set once a goal is expanded (goal is its index) or the heap is
+    empty (goal is None).
+    """
+
+    def __init__(self, store: GridStore, start: Any, goals: Iterable[Any], diago: bool, heuristic: bool = True) -> None:
+        """ Reset the store and push the start cell
+
+        :param store: Cells to search
+        :param start: Starting node
+        :param goals: Nodes the search stops at, the nearest one is reached first
+        :param diago: Allows diagonal moves (no corner-cutting)
+        :param heuristic: Uses the octile (manhattan without diagonals) distance to the nearest goal, Dijkstra if False
+        """
+        self.store = store
+        self.diago = diago
+        self.goals = {store.index(goal.column, goal.row) for goal in goals}
+        self.goal_positions = [(goal.column, goal.row) for goal in goals] if heuristic else []
+        self.goal = None
+        self.done = False
+
+        # (step, cost, horizontal part, vertical part): the cells beside a diagonal move must be free
+        stride = store.stride
+        self.moves = [(stride, 1, 0, 0), (-stride, 1, 0, 0), (1, 1, 0, 0), (-1, 1, 0, 0)]
+        if diago:
+            self.moves += [(dx * stride + dy, 1.41421, dx * stride, dy) for dx in (1, -1) for dy in (1, -1)]
+
+        store.reset_search()
+        index = store.index(start.column, start.row)
+        store.costs[index] = 0
+        heuristic = self.get_heuristic(index)
+        store.priorities[index] = heuristic
+        self.queue = [(heuristic, heuristic, index)]
+        self.expanded = 0
+
+    def get_heuristic(self, index: int) -> float:
+        """ Return the distance estimate from a cell to the nearest goal, 0 for Dijkstra"""
+        if not self.goal_positions:
+            return 0
+
+        column, row = divmod(index, self.store.stride)
+        column, row = column - 1, row - 1
+        best = INF
+        for goal_col, goal_row in self.goal_positions:
+            dx = abs(column - goal_col)
+            dy = abs(row - goal_row)
+            estimate = dx + dy + (1.41421 - 2) * min(dx, dy) if self.diago else dx + dy
+            if estimate < best:
+                best = estimate
+        return best
+
+    def step(self) -> Optional[int]:
+        """ Pop the best open cell, close it and relax its neighbors
+
+        :return: The expanded cell index, None if no cell was expanded (stale entries or empty heap)
+        """
+
+        store = self.store
+        status, weights = store.status, store.weights
+        costs, parents, priorities = store.costs, store.parents, store.priorities
+        queue = self.queue
+
+        while queue:
+            priority, heuristic, index = heappop(queue)
+            if not status[index] & CLOSED and priority == priorities[index]:
+                break
+        else:
+            self.done = True
+            return None
+
+        status[index] |= CLOSED
+        self.expanded += 1
+        if index in self.goals:
+            self.goal = index
+            self.done = True
+            return index
+
+        cost = costs[index]
+        for step, move_cost, horizontal, vertical in self.moves:
+            neighbor = index + step
+            if status[neighbor] or horizontal and \
+                    (status[index + horizontal] & WALL or status[index + vertical] & WALL):
+                continue
+
+            new_cost = cost + move_cost * weights[neighbor]
+            if new_cost < costs[neighbor]:
+                costs[neighbor] = new_cost
+                parents[neighbor] = index
+                heuristic = self.get_heuristic(neighbor)
+                priorities[neighbor] = new_cost + heuristic
+                heappush(queue, (new_cost + heuristic, heuristic, neighbor))
+
+        return index
+
+    def get_open(self) -> List[int]:
+        """ Return the indexes of the open cells"""
+        status, priorities = self.store.status, self.store.priorities
+        return [index for priority, heuristic, index in self.queue
+                if not status[index] & CLOSED and priority == priorities[index]]
+
+    def get_path(self, index: Optional[int] = None) -> List[Tuple[int, int]]:
+        """ Follow the parents from a cell back to the start
+
+        :param index: Last cell of the path, the goal reached if None
+        :return: (column, row) positions from start to the cell, empty if there is no such cell
+        """
+
+        index = self.goal if index is None else index
+        if index is None:
+            return []
+
+        parents = self.store.parents
+        path = []
+        while index != -1:
+            path.append(self.store.position(index))
+            index = parents[index]
+
+        path.reverse()
+        return path
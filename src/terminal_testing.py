@@ -1,27 +1,81 @@
-from collections import deque
 from time import perf_counter_ns
 from typing import *
 from sys import exit
+from itertools import product, chain
+from threading import Event
 import tkinter
 from tkinter import filedialog
 import os
+from random import Random
+from functools import partial
 from classes import Node
+from algo import HeapSearch, GreedySearch, BucketSearch, ThetaStarSearch, LayeredSearch, BidirectionalBFS, \
+    BidirectionalHeapSearch, get_heuristic, get_goals_heuristic, get_integer_heuristic, EPSILON, COST_SCALE
+from jps import JumpPointSearch, JumpPointSearchPlus, JumpTables, fill_path
+from rsr import SymmetryRectangles, RectangleJumps, get_free_mask
+from hpa import Hierarchy, HierarchicalQuery
+from alt import LandmarkTables, LANDMARK_COUNT
+from dstar import DStarLite
+from theta import LineOfSight, distance, fill_segments
+from flow import FlowField, FieldCache
+from wavefront import DistanceMap, WAVEFRONT, CHAMFER, AVAILABLE as NUMPY_AVAILABLE
+from batch import BatchResults, random_pairs, get_path_cost
+from components import ComponentIndex
+from store import GridStore, StoreSearch
+from graph import CompiledGraph
+from bitboard import BitboardGrid, BitboardBFS
 import pickle
 import csv
 
 
-def reduce_nodes(all_nodes):
-    if isinstance(all_nodes, list):
-        print("Converting grid to remove aberrant graphical data...")
-        for x in range(len(all_nodes)):
-            for y in range(len(all_nodes[x])):
-                all_nodes[x][y] = SimpleNode(all_nodes[x][y])
+# Batch test options reading paths from goal rooted fields instead of searching (see run_field_batch)
+FIELD_TYPES = {"flow": FlowField, "wavefront": partial(DistanceMap, method=WAVEFRONT),
+               "chamfer": partial(DistanceMap, method=CHAMFER)}
 
-        print("Converting ... 100%")
-        return all_nodes
-    else:
-        node = SimpleNode(all_nodes)
-        return node
+
+def set_algo(pathfinder, algo):
+    """ Sets the algorithm of the pathfinder, "bfs_bitboard" is BFS with the bitboard engine, "astar_buckets" and
+    "dijkstra_buckets" are A* and Dijkstra on the bucket queue, "astar_store" and "dijkstra_store" on the grid store"""
+    pathfinder.bfs_engine = "bitboard" if algo == "bfs_bitboard" else "nodes"
+    pathfinder.bucket_queue = algo in ("astar_buckets", "dijkstra_buckets")
+    pathfinder.grid_store = algo in ("astar_store", "dijkstra_store")
+    pathfinder.algo = {"bfs_bitboard": "bfs", "astar_buckets": "astar", "dijkstra_buckets": "dijkstra",
+                       "astar_store": "astar", "dijkstra_store": "dijkstra"}.get(algo, algo)
+
+
+def set_cost_scale(pathfinder):
+    while True:
+        inp = input(f"Integer cost of a straight move for the bucket queue, diagonal moves cost 1.41421 times it "
+                    f"rounded (10 -> 14, 1000 -> 1414)? (default {COST_SCALE})\n")
+        if not inp:
+            pathfinder.cost_scale = COST_SCALE
+            break
+        elif inp.isdigit() and int(inp) > 0:
+            pathfinder.cost_scale = int(inp)
+            break
+        print("Entry must be a positive integer")
+
+
+def set_limits(pathfinder):
+    while True:
+        inp = input("Time limit of a search in ms? (default none)\n")
+        if not inp:
+            pathfinder.time_limit = 0
+            break
+        elif inp.isdigit():
+            pathfinder.time_limit = int(inp)
+            break
+        print("Entry must be a positive integer")
+
+    while True:
+        inp = input("Step limit of a search (one node is expanded per step, one layer for BFS)? (default none)\n")
+        if not inp:
+            pathfinder.expansion_limit = 0
+            break
+        elif inp.isdigit():
+            pathfinder.expansion_limit = int(inp)
+            break
+        print("Entry must be a positive integer")
 
 
 def load_grid(grid_path):
@@ -70,6 +124,7 @@ class Console:
         self.test = None
         self.input = None
         self.n_cycles = 0
+        self.end_count = 0  # batch queries go to this many different ends, 0 for random ends
         self.algos = []
 
         self.grid = grid
@@ -94,9 +149,14 @@ class Console:
                     save_object, self.grid.name = load_grid(self.grid_path)
                 except TypeError: pass
                 if save_object is not None:
-                    self.grid.all_nodes = reduce_nodes(save_object["grid"])
+                    self.grid.all_nodes = save_object["grid"]
+                    self.grid.version += 1
                     self.grid.start = self.grid.all_nodes[save_object["start"].column][save_object["start"].row]
                     self.grid.end = self.grid.all_nodes[save_object["end"].column][save_object["end"].row]
+                    self.grid.extra_ends = [self.grid.all_nodes[node.column][node.row]
+                                            for node in save_object.get("extra_ends", [])]
+                    self.pathfinder.jump_tables = save_object.get("jump_tables", {})
+                    self.pathfinder.landmark_tables = save_object.get("landmark_tables")
                     break
                 else:
                     print("\nYou need to select a pickle file containing a valid grid/map made with the main module \n"
@@ -106,9 +166,29 @@ class Console:
                     if inp.lower() == "q":
                         exit()
 
+    def place_ends(self):
+        print(f"\nThe grid has {1 + len(self.grid.extra_ends)} end node(s), BFS, A*, Dijkstra and Theta* stop at the "
+              f"nearest one (not bidirectional)")
+        while True:
+            self.input = input("How many end nodes do you want to add at random positions? (default 0)\n")
+            if not self.input:
+                return
+            elif self.input.isdigit():
+                break
+            print("Entry must be a positive integer")
+
+        # Same positions on every run of a grid
+        free = [node for column in self.grid.all_nodes for node in column
+                if not node.status & (Node.WALL | Node.START | Node.END)]
+        for node in Random(0).sample(free, min(int(self.input), len(free))):
+            node.status |= Node.END
+            self.grid.extra_ends.append(node)
+
     def choose_test(self):
         while True:
-            self.input = input("Enter '0' to do specific testing or '1' to run every test variations\n")
+            self.input = input("Enter '0' to do specific testing, '1' to run every test variations, '2' to replay "
+                               "random wall edits (D* Lite against A* from scratch) or '3' to run a batch of random "
+                               "queries\n")
 
             if self.input == "0":
                 self.test = self.specific
@@ -116,6 +196,12 @@ class Console:
             elif self.input == "1":
                 self.test = self.all
                 return
+            elif self.input == "2":
+                self.test = self.replay
+                return
+            elif self.input == "3":
+                self.test = self.batch
+                return
 
     def all(self):
         def main():
@@ -127,7 +213,9 @@ class Console:
 
         def make_csv():
             csv_name = f"delete_me_{self.grid.name}.csv"
-            header = "algo", "diago", "rsr", "neighbors_t", "rsr_t", "algo_t", "path_len"
+            header = "algo", "diago", "rsr", "neighbors_t", "rsr_t", "algo_t", "path_len", "jump_tables_t", \
+                "bidirectional", "hierarchy_t", "landmarks_t", "landmarks_kb", "los_checks", "los_t", "end", \
+                "expansions", "cost_ratio", "graph_t", "graph_kb", "graph_edges"
 
             with open(csv_name, "w", newline="") as file:
                 file_writer = csv.writer(file)
@@ -146,7 +234,9 @@ class Console:
 
         diago_ = False, True
         apply_rsr_ = False, True
-        algos_ = "bfs", "astar", "dijkstra"
+        algos_ = "bfs", "astar", "weighted_astar", "greedy", "alt", "theta", "dijkstra", "jps", "jps_plus", "hpa", \
+            "dstar"
+        bidirectional_ = False, True
 
         def run_all(csv_name):
             for diago in diago_:
@@ -154,17 +244,23 @@ class Console:
                     self.pathfinder.apply_rsr = apply_rsr
                     self.pathfinder.diago = diago
                     self.pathfinder.init_search()
-                    for algo in algos_:
-                        if not (algo == "bfs" and apply_rsr is True):
+                    for algo, bidirectional in product(algos_, bidirectional_):
+                        # Weighted A*, Greedy, ALT, Theta*, JPS/JPS+, HPA* and D* Lite have no bidirectional variant
+                        if bidirectional and algo in ("weighted_astar", "greedy", "alt", "theta", "jps", "jps_plus",
+                                                      "hpa", "dstar"):
+                            continue
+                        # JPS/JPS+, HPA* and D* Lite ignore RSR
+                        if not (algo in ("jps", "jps_plus", "hpa", "dstar") and apply_rsr is True):
 
-                            self.pathfinder.algo = algo
+                            set_algo(self.pathfinder, algo)
+                            self.pathfinder.bidirectional = bidirectional
 
                             self.pathfinder.init_search(False)
 
                             for n in range(self.n_cycles):
 
-                                print(f"Running {algo.capitalize()}, diago: {diago}, RSR: {apply_rsr} "
-                                      f"({n + 1}/{self.n_cycles})...")
+                                print(f"Running {algo.capitalize()}, diago: {diago}, RSR: {apply_rsr}, "
+                                      f"bidirectional: {bidirectional} ({n + 1}/{self.n_cycles})...")
 
                                 self.pathfinder.run()
 
@@ -172,9 +268,18 @@ class Console:
                                 if n < self.n_cycles - 1:
                                     self.pathfinder.soft_reset()
 
+                            graph = self.pathfinder.graph
                             info = algo, diago, apply_rsr, self.pathfinder.neighbors_prep_dt, \
                                 self.pathfinder.rsr_prep_dt, \
-                                self.pathfinder.algo_dt / self.n_cycles, len(self.pathfinder.shortest_path)
+                                self.pathfinder.algo_dt / self.n_cycles, len(self.pathfinder.shortest_path), \
+                                self.pathfinder.jump_tables_prep_dt, bidirectional, self.pathfinder.hierarchy_prep_dt, \
+                                self.pathfinder.landmarks_prep_dt, \
+                                self.pathfinder.landmark_tables.memory / 1024 if algo == "alt" else 0, \
+                                self.pathfinder.line_of_sight.checks if algo == "theta" else 0, \
+                                self.pathfinder.line_of_sight.dt if algo == "theta" else 0, \
+                                get_position(self.pathfinder.reached_goal), \
+                                len(self.pathfinder.search_engine.closed), self.pathfinder.get_cost_ratio(), \
+                                self.pathfinder.graph_prep_dt, graph.memory / 1024 if graph else 0, len(graph or ())
 
                             with open(csv_name, "a", newline="") as f:
                                 file_writer = csv.writer(f)
@@ -198,14 +303,50 @@ class Console:
             for line in row_list:
                 if line[0] == "astar":
                     text += f"A* algorithm: \n"
+                elif line[0] == "weighted_astar":
+                    text += f"Weighted A* algorithm (epsilon {self.pathfinder.epsilon}): \n"
+                elif line[0] == "greedy":
+                    text += f"Greedy Best First Search algorithm: \n"
+                elif line[0] == "theta":
+                    text += f"Theta* algorithm (any-angle): \n"
+                elif line[0] == "alt":
+                    text += f"ALT algorithm (A* with {self.pathfinder.landmark_count} landmarks): \n"
                 elif line[0] == "bfs":
                     text += f"Breadth First Search algorithm: \n"
                 elif line[0] == "dijkstra":
                     text += f"Dijkstra's algorithm: \n"
+                elif line[0] == "jps":
+                    text += f"Jump Point Search algorithm: \n"
+                elif line[0] == "jps_plus":
+                    text += f"JPS+ algorithm: \n"
+                elif line[0] == "hpa":
+                    text += f"HPA* algorithm: \n"
+                elif line[0] == "dstar":
+                    text += f"D* Lite algorithm: \n"
 
                 text += (
-                    f"\tDiagonal movement: {line[1]}, Rectangular Symmetry Reduction (RSR): {line[2]}\n"
-                    f"\tSet neighbors in {round(float(line[3]), 2)} ms, Preprocessed RSR in {round(float(line[4]), 2)} ms\n"
+                    f"\tDiagonal movement: {line[1]}, Rectangular Symmetry Reduction (RSR): {line[2]}, "
+                    f"Bidirectional: {line[8]}\n"
+                    f"\tSet neighbors in {round(float(line[3]), 2)} ms, "
+                    f"Preprocessed RSR in {round(float(line[4]), 2)} ms\n"
+                )
+                if int(line[19]):
+                    text += (f"\tCompiled {line[19]} edges into CSR arrays ({round(float(line[18]), 1)} KB) in "
+                             f"{round(float(line[17]), 2)} ms (part of set neighbors)\n")
+                if line[0] == "jps_plus":
+                    text += f"\tPreprocessed JPS+ jump tables in {round(float(line[7]), 2)} ms\n"
+                if line[0] == "hpa":
+                    text += f"\tBuilt the HPA* abstract graph in {round(float(line[9]), 2)} ms\n"
+                if line[0] == "theta":
+                    text += f"\tRan {line[12]} line of sight checks in {round(float(line[13]), 2)} ms\n"
+                if self.grid.extra_ends:
+                    text += f"\tReached the end node at {line[14]}\n"
+                if line[0] in ("astar", "weighted_astar", "greedy") and line[8] == "False":
+                    text += f"\tExpanded {line[15]} nodes, path cost {round(float(line[16]), 3)} times the cheapest\n"
+                if line[0] == "alt":
+                    text += (f"\tComputed the ALT landmark tables ({round(float(line[11]), 1)} KB) in "
+                             f"{round(float(line[10]), 2)} ms\n")
+                text += (
                     f"\tFound a path of {line[6]} nodes in "
                     f"{round(float(line[5]), 2)} ms on average\n\n"
                 )
@@ -244,9 +385,28 @@ class Console:
             run()
             save()
 
-        stats = {"astar_time": 0, "astar_len": 0,
+        stats = {"astar_time": 0, "astar_len": 0, "astar_expansions": 0, "astar_ratio": 0,
+                 "weighted_astar_time": 0, "weighted_astar_len": 0, "weighted_astar_expansions": 0,
+                 "weighted_astar_ratio": 0,
+                 "greedy_time": 0, "greedy_len": 0, "greedy_expansions": 0, "greedy_ratio": 0,
+                 "alt_time": 0, "alt_len": 0,
+                 "theta_time": 0, "theta_len": 0, "theta_los_checks": 0, "theta_los_time": 0,
                  "bfs_time": 0, "bfs_len": 0,
-                 "dijkstra_time": 0, "dijkstra_len": 0}
+                 "bfs_bitboard_time": 0, "bfs_bitboard_len": 0,
+                 "astar_buckets_time": 0, "astar_buckets_len": 0, "astar_buckets_expansions": 0,
+                 "astar_buckets_ratio": 0,
+                 "dijkstra_buckets_time": 0, "dijkstra_buckets_len": 0, "dijkstra_buckets_expansions": 0,
+                 "dijkstra_buckets_ratio": 0,
+                 "astar_store_time": 0, "astar_store_len": 0, "astar_store_expansions": 0, "astar_store_ratio": 0,
+                 "dijkstra_store_time": 0, "dijkstra_store_len": 0, "dijkstra_store_expansions": 0,
+                 "dijkstra_store_ratio": 0,
+                 "dijkstra_time": 0, "dijkstra_len": 0,
+                 "jps_time": 0, "jps_len": 0,
+                 "jps_plus_time": 0, "jps_plus_len": 0,
+                 "hpa_time": 0, "hpa_len": 0,
+                 "dstar_time": 0, "dstar_len": 0}
+        reached = {}  # algo -> position of the end node reached
+        stopped = []  # algorithms stopped by the time or expansion limit
 
         def setup():
             while True:
@@ -265,18 +425,51 @@ class Console:
                 elif self.input.lower() == "n":
                     self.pathfinder.diago = False
                     break
+            while True:
+                self.input = input("Search from both start and end (bidirectional BFS, A* and Dijkstra)? y/n\n")
+                if self.input.lower() == "y":
+                    self.pathfinder.bidirectional = True
+                    break
+                elif self.input.lower() == "n":
+                    self.pathfinder.bidirectional = False
+                    break
+            while True:
+                self.input = input("Set the neighbors of a node when it is first expanded (lazy neighbors)? y/n\n")
+                if self.input.lower() == "y":
+                    self.pathfinder.lazy_neighbors = True
+                    break
+                elif self.input.lower() == "n":
+                    self.pathfinder.lazy_neighbors = False
+                    break
             self.pathfinder.init_search()
 
             while not self.algos:
                 self.input = input("Please select what algorithm(s) you want to test:\n"
                             "0 - all algorithms\n"
-                            "1 - Breadth first search algorithm (Not functionnal with RSR)\n"
+                            "1 - Breadth first search algorithm\n"
                             "2 - A* algorithm\n"
                             "3 - Dijkstra's algorithm\n"
+                            "4 - Jump Point Search algorithm (RSR is ignored)\n"
+                            "5 - JPS+ algorithm (RSR is ignored)\n"
+                            "6 - HPA* algorithm (RSR is ignored)\n"
+                            "7 - ALT algorithm (A* with landmarks)\n"
+                            "8 - D* Lite algorithm (RSR is ignored)\n"
+                            "9 - Theta* algorithm (any-angle)\n"
+                            "w - Weighted A* algorithm (bounded suboptimal)\n"
+                            "g - Greedy best first search algorithm\n"
+                            "b - Breadth first search on bitboards (RSR and bidirectional search are ignored)\n"
+                            "a - A* algorithm on a bucket queue (integer costs, bidirectional search is ignored)\n"
+                            "d - Dijkstra's algorithm on a bucket queue (integer costs, bidirectional search is "
+                            "ignored)\n"
+                            "s - A* algorithm on the flat grid store (RSR and bidirectional search are ignored)\n"
+                            "t - Dijkstra's algorithm on the flat grid store (RSR and bidirectional search are "
+                            "ignored)\n"
                             "('1-3' or '2, 3' or even '13' will run corresponding algorithms)\n")
 
                 if "0" in self.input:
-                    self.algos = ["bfs", "astar", "dijkstra"]
+                    self.algos = ["bfs", "astar", "dijkstra", "jps", "jps_plus", "hpa", "alt", "dstar", "theta",
+                                  "weighted_astar", "greedy", "bfs_bitboard", "astar_buckets", "dijkstra_buckets",
+                                  "astar_store", "dijkstra_store"]
                 else:
                     if "1" in self.input:
                         self.algos.append("bfs")
@@ -284,6 +477,56 @@ class Console:
                         self.algos.append("astar")
                     if "3" in self.input:
                         self.algos.append("dijkstra")
+                    if "4" in self.input:
+                        self.algos.append("jps")
+                    if "5" in self.input:
+                        self.algos.append("jps_plus")
+                    if "6" in self.input:
+                        self.algos.append("hpa")
+                    if "7" in self.input:
+                        self.algos.append("alt")
+                    if "8" in self.input:
+                        self.algos.append("dstar")
+                    if "9" in self.input:
+                        self.algos.append("theta")
+                    if "w" in self.input.lower():
+                        self.algos.append("weighted_astar")
+                    if "g" in self.input.lower():
+                        self.algos.append("greedy")
+                    if "b" in self.input.lower():
+                        self.algos.append("bfs_bitboard")
+                    if "a" in self.input.lower():
+                        self.algos.append("astar_buckets")
+                    if "d" in self.input.lower():
+                        self.algos.append("dijkstra_buckets")
+                    if "s" in self.input.lower():
+                        self.algos.append("astar_store")
+                    if "t" in self.input.lower():
+                        self.algos.append("dijkstra_store")
+
+            while "alt" in self.algos:
+                self.input = input(f"How many landmarks for ALT? (default {LANDMARK_COUNT})\n")
+                if not self.input:
+                    self.pathfinder.landmark_count = LANDMARK_COUNT
+                    break
+                elif self.input.isdigit() and int(self.input) > 0:
+                    self.pathfinder.landmark_count = int(self.input)
+                    break
+                print("Entry must be a positive integer")
+
+            while "weighted_astar" in self.algos:
+                self.input = input(f"Epsilon of Weighted A*, paths cost at most 1 + epsilon times the cheapest one? "
+                                   f"(default {EPSILON})\n")
+                if not self.input:
+                    self.pathfinder.epsilon = EPSILON
+                    break
+                try:
+                    self.pathfinder.epsilon = float(self.input)
+                except ValueError:
+                    self.pathfinder.epsilon = -1
+                if self.pathfinder.epsilon >= 0:
+                    break
+                print("Entry must be a positive number")
 
             while not self.n_cycles > 0:
                 self.input = input("How many times do you want to run each algorithm?\n")
@@ -293,9 +536,14 @@ class Console:
                 else:
                     self.n_cycles = abs(int(self.input))
 
+            if "astar_buckets" in self.algos or "dijkstra_buckets" in self.algos:
+                set_cost_scale(self.pathfinder)
+
+            set_limits(self.pathfinder)
+
         def run():
             for algo in self.algos:
-                self.pathfinder.algo = algo
+                set_algo(self.pathfinder, algo)
                 self.pathfinder.init_search(prep=False)
                 for n in range(self.n_cycles):
                     print(f"Running {algo.capitalize()} ({n + 1}/{self.n_cycles})...")
@@ -306,30 +554,139 @@ class Console:
                         self.pathfinder.soft_reset()
                 stats[f"{algo}_time"] = self.pathfinder.algo_dt / self.n_cycles
                 stats[f"{algo}_len"] = len(self.pathfinder.shortest_path)
+                reached[algo] = get_position(self.pathfinder.reached_goal)
+                if self.pathfinder.stopped_early:
+                    stopped.append(algo)
+                if algo == "theta":
+                    stats["theta_los_checks"] = self.pathfinder.line_of_sight.checks
+                    stats["theta_los_time"] = self.pathfinder.line_of_sight.dt
+                if algo in ("astar", "weighted_astar", "greedy", "astar_buckets", "dijkstra_buckets"):
+                    stats[f"{algo}_expansions"] = len(self.pathfinder.search_engine.closed)
+                    stats[f"{algo}_ratio"] = round(self.pathfinder.get_cost_ratio(), 3)
+                if algo in ("astar_store", "dijkstra_store"):
+                    stats[f"{algo}_expansions"] = self.pathfinder.store_engine.expanded
+                    stats[f"{algo}_ratio"] = round(self.pathfinder.get_cost_ratio(), 3)
 
                 self.pathfinder.soft_reset(timer=True)
 
         def save():
+            tables = self.pathfinder.landmark_tables
+            landmarks_kb = round(tables.memory / 1024, 1) if "alt" in self.algos and tables else 0
+            store = self.pathfinder.store
+            store_kb = round(store.memory / 1024, 1) if store else 0
+            graph = self.pathfinder.graph
+            graph_kb = round(graph.memory / 1024, 1) if graph else 0
             text = (f"Pathfinding algorithm benchmarks made on grid '{self.grid.name}'\n"
                     f"\n"
                     f"Diagonal movement (no corner cutting) allowed:    {self.pathfinder.diago}\n"
                     f"Rectangular Symetry Reduction (RSR) applied:      {self.pathfinder.apply_rsr}\n"
+                    f"Bidirectional BFS, A* and Dijkstra:               {self.pathfinder.bidirectional}\n"
+                    f"Lazy neighbors (set on first expansion):          {self.pathfinder.lazy_neighbors}\n"
                     f"\n"
                     f"RSR preprocess time:                      {self.pathfinder.rsr_prep_dt / 10 ** 3} s\n"
                     f"Loading neighbors preprocess time:        {self.pathfinder.neighbors_prep_dt / 10 ** 3} s\n"
+                    f"CSR adjacency build time (in neighbors):  {self.pathfinder.graph_prep_dt / 10 ** 3} s\n"
+                    f"CSR adjacency size:                       {graph_kb} KB ({len(graph or ())} edges)\n"
+                    f"Neighbors set on expansion:               {self.pathfinder.lazy_count} nodes\n"
+                    f"Connected components preprocess time:     {self.pathfinder.components_prep_dt / 10 ** 3} s\n"
+                    f"BFS bitboard preprocess time:             {self.pathfinder.bitboard_prep_dt / 10 ** 3} s\n"
+                    f"Flat grid store preprocess time:          {self.pathfinder.store_prep_dt / 10 ** 3} s\n"
+                    f"Flat grid store size:                     {store_kb} KB\n"
+                    f"JPS+ jump tables preprocess time:         {self.pathfinder.jump_tables_prep_dt / 10 ** 3} s\n"
+                    f"HPA* abstract graph preprocess time:      {self.pathfinder.hierarchy_prep_dt / 10 ** 3} s\n"
+                    f"ALT landmark tables preprocess time:      {self.pathfinder.landmarks_prep_dt / 10 ** 3} s\n"
+                    f"ALT landmark tables size:                 {landmarks_kb} KB\n"
                     f"\n"
                     f"Each algorithm was tested  {self.n_cycles}  times\n\n"
                     f"\tA* algorithm: \n"
                     f"\tFound a path of {stats['astar_len']} nodes in "
                     f"{stats['astar_time']} ms on average\n"
+                    f"\tExpanded {stats['astar_expansions']} nodes, path cost {stats['astar_ratio']} times the "
+                    f"cheapest\n"
+                    f"\n"
+                    f"\tWeighted A* (epsilon {self.pathfinder.epsilon}):  \n"
+                    f"\tFound a path of {stats['weighted_astar_len']} nodes in "
+                    f"{stats['weighted_astar_time']} ms on average\n"
+                    f"\tExpanded {stats['weighted_astar_expansions']} nodes, path cost "
+                    f"{stats['weighted_astar_ratio']} times the cheapest\n"
+                    f"\n"
+                    f"\tGreedy Best First Search:  \n"
+                    f"\tFound a path of {stats['greedy_len']} nodes in "
+                    f"{stats['greedy_time']} ms on average\n"
+                    f"\tExpanded {stats['greedy_expansions']} nodes, path cost {stats['greedy_ratio']} times the "
+                    f"cheapest\n"
                     f"\n"
                     f"\tBreadth First Search:  \n"
                     f"\tFound a path of {stats['bfs_len']} nodes in "
                     f"{stats['bfs_time']} ms on average\n"
                     f"\n"
+                    f"\tBreadth First Search on bitboards:  \n"
+                    f"\tFound a path of {stats['bfs_bitboard_len']} nodes in "
+                    f"{stats['bfs_bitboard_time']} ms on average\n"
+                    f"\n"
                     f"\tDijkstra's Algorithm:  \n"
                     f"\tFound a path of {stats['dijkstra_len']} nodes in "
-                    f"{stats['dijkstra_time']} ms on average\n")
+                    f"{stats['dijkstra_time']} ms on average\n"
+                    f"\n"
+                    f"\tA* on a bucket queue (straight moves cost {self.pathfinder.cost_scale}):  \n"
+                    f"\tFound a path of {stats['astar_buckets_len']} nodes in "
+                    f"{stats['astar_buckets_time']} ms on average\n"
+                    f"\tExpanded {stats['astar_buckets_expansions']} nodes, path cost "
+                    f"{stats['astar_buckets_ratio']} times the cheapest\n"
+                    f"\n"
+                    f"\tDijkstra on a bucket queue (straight moves cost {self.pathfinder.cost_scale}):  \n"
+                    f"\tFound a path of {stats['dijkstra_buckets_len']} nodes in "
+                    f"{stats['dijkstra_buckets_time']} ms on average\n"
+                    f"\tExpanded {stats['dijkstra_buckets_expansions']} nodes, path cost "
+                    f"{stats['dijkstra_buckets_ratio']} times the cheapest\n"
+                    f"\n"
+                    f"\tA* on the flat grid store:  \n"
+                    f"\tFound a path of {stats['astar_store_len']} nodes in "
+                    f"{stats['astar_store_time']} ms on average\n"
+                    f"\tExpanded {stats['astar_store_expansions']} nodes, path cost "
+                    f"{stats['astar_store_ratio']} times the cheapest\n"
+                    f"\n"
+                    f"\tDijkstra on the flat grid store:  \n"
+                    f"\tFound a path of {stats['dijkstra_store_len']} nodes in "
+                    f"{stats['dijkstra_store_time']} ms on average\n"
+                    f"\tExpanded {stats['dijkstra_store_expansions']} nodes, path cost "
+                    f"{stats['dijkstra_store_ratio']} times the cheapest\n"
+                    f"\n"
+                    f"\tJump Point Search:  \n"
+                    f"\tFound a path of {stats['jps_len']} nodes in "
+                    f"{stats['jps_time']} ms on average\n"
+                    f"\n"
+                    f"\tJPS+:  \n"
+                    f"\tFound a path of {stats['jps_plus_len']} nodes in "
+                    f"{stats['jps_plus_time']} ms on average\n"
+                    f"\n"
+                    f"\tHPA*:  \n"
+                    f"\tFound a path of {stats['hpa_len']} nodes in "
+                    f"{stats['hpa_time']} ms on average\n"
+                    f"\n"
+                    f"\tALT ({self.pathfinder.landmark_count} landmarks):  \n"
+                    f"\tFound a path of {stats['alt_len']} nodes in "
+                    f"{stats['alt_time']} ms on average\n"
+                    f"\n"
+                    f"\tD* Lite:  \n"
+                    f"\tFound a path of {stats['dstar_len']} nodes in "
+                    f"{stats['dstar_time']} ms on average\n"
+                    f"\n"
+                    f"\tTheta*:  \n"
+                    f"\tFound a path of {stats['theta_len']} nodes in "
+                    f"{stats['theta_time']} ms on average\n"
+                    f"\tRan {stats['theta_los_checks']} line of sight checks in {stats['theta_los_time']} ms "
+                    f"(last run)\n")
+
+            if stopped:
+                text += (f"\nStopped early (time limit {self.pathfinder.time_limit} ms, step limit "
+                         f"{self.pathfinder.expansion_limit}), the path lengths are the ones of partial paths:\n"
+                         f"\t{', '.join(stopped)}\n")
+
+            if self.grid.extra_ends:
+                text += f"\nEnd node reached (out of {1 + len(self.grid.extra_ends)}):\n"
+                for algo, position in reached.items():
+                    text += f"\t{algo}: {position}\n"
 
             print(text)
 
@@ -355,158 +712,318 @@ class Console:
 
         main()
 
-    def main(self):
-        self.select_grid()
-        self.choose_test()
-        self.test()
+    def replay(self):
+        def main():
+            setup()
+            text = run()
+            save(text)
 
+        # Same stream of edits on every run of a grid
+        edits = Random(0)
 
-class SimpleGrid:
-    def __init__(self):
-        self.all_nodes = [[]]
-        self.start = None
-        self.end = None
-        self.name = None
+        def setup():
+            while True:
+                self.input = input("Allow diagonal movements between nodes? y/n\n")
+                if self.input.lower() == "y":
+                    self.pathfinder.diago = True
+                    break
+                elif self.input.lower() == "n":
+                    self.pathfinder.diago = False
+                    break
 
+            self.n_cycles = 0
+            while not self.n_cycles > 0:
+                self.input = input("How many wall edits do you want to replay?\n")
+                if not self.input.isdigit():
+                    print("Entry must be positive integer")
+                    continue
+                else:
+                    self.n_cycles = int(self.input)
 
-CYCLE_MOVES = {"right": lambda col, row: (col + 1, row),
-               "left": lambda col, row: (col - 1, row),
-               "down": lambda col, row: (col, row + 1),
-               "up": lambda col, row: (col, row - 1),
-               "topright": lambda col, row: (col + 1, row - 1),
-               "topleft": lambda col, row: (col - 1, row - 1),
-               "downright": lambda col, row: (col + 1, row + 1),
-               "downleft": lambda col, row: (col - 1, row + 1)
-               }
+        def run():
+            # A second pathfinder on the same grid searches from scratch after every edit, as a reset would
+            scratch = SimplePathFinder(self.grid)
+            scratch.algo = "astar"
+            scratch.diago = self.pathfinder.diago
+
+            self.pathfinder.apply_rsr = False
+            self.pathfinder.bidirectional = False
+            self.pathfinder.algo = "dstar"
+            self.pathfinder.init_search()
+            self.pathfinder.run()
+            first_search_dt = self.pathfinder.algo_dt
 
+            replan_dt = scratch_dt = 0
+            applied = 0
+            mismatches = []  # (edit number, repaired cost, A* cost) of the repaired paths that are not the cheapest
+            columns, rows = len(self.grid.all_nodes), len(self.grid.all_nodes[0])
 
-class SimpleNode:
-    """Object for representing every tile (node on the grid)"""
+            for n in range(self.n_cycles):
+                node = self.grid.all_nodes[edits.randrange(columns)][edits.randrange(rows)]
+                if node is self.grid.start or node is self.grid.end:
+                    continue
+                applied += 1
+                node.status ^= Node.WALL
+                self.grid.version += 1
+
+                self.pathfinder.handle_edits([node])
+                replan_dt += self.pathfinder.replan_dt
+                scratch.handle_edits([node])
+
+                # Reset after the edit: soft_reset checks if the goals can be reached with the edited walls
+                scratch.soft_reset(neighbors=True, timer=True)
+                scratch.init_search()
+                scratch.run()
+                scratch_dt += scratch.neighbors_prep_dt + scratch.algo_dt
+
+                # Both costs are INF when there is no path anymore
+                repaired, cheapest = get_path_cost(self.pathfinder.shortest_path), get_path_cost(scratch.shortest_path)
+                mismatch = repaired != cheapest and abs(repaired - cheapest) > 1e-6
+                if mismatch:
+                    mismatches.append((n + 1, repaired, cheapest))
+
+                print(f"Edit ({n + 1}/{self.n_cycles}): {'added' if node.status & Node.WALL else 'removed'} wall at "
+                      f"({node.column}, {node.row}), path of {len(self.pathfinder.shortest_path)} nodes"
+                      f"{', cost differs from A*' if mismatch else ''}")
+
+            edit_count = max(applied, 1)
+            text = (f"Replay of {applied} random wall edits made on grid '{self.grid.name}' "
+                    f"({self.n_cycles - applied} landing on the start or end skipped)\n"
+                    f"\n"
+                    f"Diagonal movement (no corner cutting) allowed:    {self.pathfinder.diago}\n"
+                    f"\n"
+                    f"\tD* Lite first search in {round(first_search_dt, 2)} ms\n"
+                    f"\tD* Lite repaired the path in {round(replan_dt / edit_count, 2)} ms on average\n"
+                    f"\tA* from scratch (neighbors included) in {round(scratch_dt / edit_count, 2)} ms on average\n"
+                    f"\tRepaired paths costing more or less than the A* ones: {len(mismatches)}\n")
+            for number, repaired, cheapest in mismatches:
+                text += f"\t\tEdit {number}: repaired path cost {round(repaired, 5)}, A* cost {round(cheapest, 5)}\n"
 
-    # Those attributes will be used as instance attributes, but it was simpler to define them here since they
-    # always start with the same values
+            print(text)
+            return text
 
-    is_path = False
-    is_wall = False
-    visited = False
-    neighbors = None
-    came_from = None
-    cost_so_far = 0
-    heuristic = 0
-    priority = 0
+        def save(text):
+            inp = input("Do you wish to save test data to a file? y/n\n")
 
-    # for RSR
-    sym_rect = None
-    is_sym_rect = False
-    is_border = False
-    is_start = False
-    is_end = False
+            save_name = None
+            if inp.lower() == "y":
 
-    def __init__(self, node: Node) -> None:
-        """ Create a Node object
+                while not save_name:
+                    root = tkinter.Tk()
+                    root.attributes("-alpha", 0)
+                    save_name = filedialog.asksaveasfilename(initialdir=self.data_path, defaultextension=".txt",
+                                                             parent=root)
+                    root.update()
+                    try:
+                        root.destroy()
+                    except:
+                        pass
 
-        :param node: Node to be copied
-        """
-        self.column = node.column
-        self.row = node.row
-        self.is_wall = node.status & Node.WALL
-        self.is_start = node.status & Node.START
-        self.is_end = node.status & Node.END
+                with open(f"{save_name}", "w") as file:
+                    file.write(text)
 
-    # TODO: Optimize this method
-    def update_sym_rect_neighbors(self, grid: List[List['SimpleNode']]) -> None:
-        """ For a Node in the border of a symmetry rectangle, change its neighbor in the symmetry rectangle for
-        the next one that is a border (jump through rectangle)"""
+        main()
 
-        def cycle_node(direction: str, current: 'SimpleNode') -> Tuple['SimpleNode', int]:
-            """ Increment neighbor's position in given direction until the neighbor is a border
+    def batch(self):
+        def main():
+            setup()
+            text = run()
+            save(text)
 
-            :param direction: current's direction key from initial node
-            :param current: current neigbor of the initial node
-            :return: final neighbor and cost multiplier (number of nodes from initial to final)
-            """
+        def setup():
+            while True:
+                self.input = input("Allow diagonal movements between nodes? y/n\n")
+                if self.input.lower() == "y":
+                    self.pathfinder.diago = True
+                    break
+                elif self.input.lower() == "n":
+                    self.pathfinder.diago = False
+                    break
+            while True:
+                self.input = input("Do you wish to apply rectangular symmetry recduction? y/n\n")
+                if self.input.lower() == "y":
+                    self.pathfinder.apply_rsr = True
+                    break
+                elif self.input.lower() == "n":
+                    self.pathfinder.apply_rsr = False
+                    break
+            while True:
+                self.input = input("Set the neighbors of a node when it is first expanded (lazy neighbors)? y/n\n")
+                if self.input.lower() == "y":
+                    self.pathfinder.lazy_neighbors = True
+                    break
+                elif self.input.lower() == "n":
+                    self.pathfinder.lazy_neighbors = False
+                    break
 
-            cost_multiplier = 1
+            self.algos = []
+            while not self.algos:
+                self.input = input("Please select what algorithm(s) you want to run the queries with:\n"
+                                   "1 - Breadth first search algorithm\n"
+                                   "2 - A* algorithm\n"
+                                   "3 - Dijkstra's algorithm\n"
+                                   "4 - Jump Point Search algorithm (RSR is ignored)\n"
+                                   "5 - JPS+ algorithm (RSR is ignored)\n"
+                                   "6 - HPA* algorithm (RSR is ignored)\n"
+                                   "7 - ALT algorithm (A* with landmarks)\n"
+                                   f"8 - Weighted A* algorithm (epsilon {self.pathfinder.epsilon})\n"
+                                   "9 - Greedy best first search algorithm\n"
+                                   "b - Breadth first search on bitboards\n"
+                                   "a - A* algorithm on a bucket queue (integer costs)\n"
+                                   "d - Dijkstra's algorithm on a bucket queue (integer costs)\n"
+                                   "s - A* algorithm on the flat grid store\n"
+                                   "t - Dijkstra's algorithm on the flat grid store\n"
+                                   "f - Flow fields (reverse Dijkstra from each end, reused by the queries to it)\n"
+                                   + ("v - NumPy wavefront distance maps (reused like the flow fields)\n"
+                                      "c - NumPy chamfer sweep distance maps (reused like the flow fields)\n"
+                                      if NUMPY_AVAILABLE else "(NumPy is not installed, no NumPy distance maps)\n") +
+                                   "('1-3' or '2, 3' or even '13' will run corresponding algorithms)\n")
+                for number, algo in zip("123456789", ("bfs", "astar", "dijkstra", "jps", "jps_plus", "hpa", "alt",
+                                                      "weighted_astar", "greedy")):
+                    if number in self.input:
+                        self.algos.append(algo)
+                if "b" in self.input.lower():
+                    self.algos.append("bfs_bitboard")
+                if "a" in self.input.lower():
+                    self.algos.append("astar_buckets")
+                if "d" in self.input.lower():
+                    self.algos.append("dijkstra_buckets")
+                if "s" in self.input.lower():
+                    self.algos.append("astar_store")
+                if "t" in self.input.lower():
+                    self.algos.append("dijkstra_store")
+                if "f" in self.input.lower():
+                    self.algos.append("flow")
+                if "v" in self.input.lower() and NUMPY_AVAILABLE:
+                    self.algos.append("wavefront")
+                if "c" in self.input.lower() and NUMPY_AVAILABLE:
+                    self.algos.append("chamfer")
 
-            while current.is_sym_rect:
-                cost_multiplier += 1
-                new_col, new_row = CYCLE_MOVES[direction](current.column, current.row)
-                current = grid[new_col][new_row]
+            self.n_cycles = 0
+            while not self.n_cycles > 0:
+                self.input = input("How many random (start, end) queries do you want to run?\n")
+                if not self.input.isdigit():
+                    print("Entry must be positive integer")
+                    continue
+                else:
+                    self.n_cycles = int(self.input)
 
-            return current, cost_multiplier
+            while True:
+                self.input = input("How many different ends should the queries go to? (default random ends)\n")
+                if not self.input:
+                    self.end_count = 0
+                    break
+                elif self.input.isdigit() and int(self.input) > 0:
+                    self.end_count = int(self.input)
+                    break
+                print("Entry must be a positive integer")
 
-        for direction, (neighbor, cost) in self.neighbors.items():
-            if neighbor.is_sym_rect:
-                current, cost_mult = cycle_node(direction, neighbor)
-                self.neighbors[direction] = current, cost * cost_mult
+            if "astar_buckets" in self.algos or "dijkstra_buckets" in self.algos:
+                set_cost_scale(self.pathfinder)
 
-    def get_available_neighbors(self) -> List[Tuple['SimpleNode', int]]:
-        """ Return available (not walls and not visited) neighbors and their cost as a list.
+            set_limits(self.pathfinder)
 
-        :return: List of adjacent node objects
-        """
+        def run():
+            self.pathfinder.bidirectional = False
+            ends = f"{self.end_count} different ends" if self.end_count else "random ends"
+            text = (f"Batch of {self.n_cycles} random queries ({ends}) made on grid '{self.grid.name}'\n"
+                    f"\n"
+                    f"Diagonal movement (no corner cutting) allowed:    {self.pathfinder.diago}\n"
+                    f"Rectangular Symetry Reduction (RSR) applied:      {self.pathfinder.apply_rsr}\n"
+                    f"Lazy neighbors (set on first expansion):          {self.pathfinder.lazy_neighbors}\n"
+                    f"\n")
 
-        neighbors = []
+            cheapest = None  # Results of A* or Dijkstra, the other paths are compared with theirs
+            for algo in self.algos:
+                print(f"Running {algo.capitalize()} on {self.n_cycles} queries...")
+                graph, lazy_count = None, 0
+                # Same queries for every algorithm
+                pairs = random_pairs(self.grid.all_nodes, self.n_cycles, lambda node: not node.status & Node.WALL,
+                                     end_count=self.end_count)
+                if algo in FIELD_TYPES:
+                    fields = FieldCache(field_type=FIELD_TYPES[algo])
+                    results = self.pathfinder.run_field_batch(pairs, fields)
+                else:
+                    set_algo(self.pathfinder, algo)
+                    results = self.pathfinder.run_batch(pairs)
+                    graph, graph_dt = self.pathfinder.graph, self.pathfinder.graph_prep_dt
+                    lazy_count = self.pathfinder.lazy_count
+                    self.pathfinder.soft_reset(neighbors=True, timer=True)
 
-        for node, cost in self.neighbors.values():
-            if not (node.is_wall or node.visited):
-                neighbors.append((node, cost))
+                text += (f"\t{algo.capitalize()}:\n"
+                         f"\tPreprocessed once in {round(results.prep_dt, 2)} ms\n")
+                if graph:
+                    text += (f"\tCompiled {len(graph)} edges into CSR arrays ({round(graph.memory / 1024, 1)} KB) "
+                             f"in {round(graph_dt, 2)} ms\n")
+                if lazy_count:
+                    text += f"\tSet the neighbors of {lazy_count} nodes on their first expansion\n"
+                text += (f"\tFound {results.found} paths out of {len(results)} queries in "
+                         f"{round(results.total_time, 2)} ms ({round(results.throughput, 1)} queries per second)\n"
+                         f"\tQueries took {round(min(results.times, default=0), 3)} ms to "
+                         f"{round(max(results.times, default=0), 3)} ms\n")
+                if results.stopped:
+                    text += f"\t{results.stopped} queries were stopped by the time or step limit\n"
+                if algo in FIELD_TYPES:
+                    text += f"\tComputed the fields of {fields.misses} ends, reused them {fields.hits} times\n"
+
+                if algo in ("astar", "dijkstra"):
+                    cheapest = results
+                elif cheapest is not None:
+                    ratios = [cost / best for cost, best, length, best_length
+                              in zip(results.costs, cheapest.costs, results.lengths, cheapest.lengths)
+                              if length and best_length and best]
+                    if ratios:
+                        text += (f"\tPaths cost {round(sum(ratios) / len(ratios), 3)} times the cheapest on average "
+                                 f"({round(max(ratios), 3)} at most)\n")
+                text += "\n"
 
-        return neighbors
+            print(text)
+            return text
 
-    def get_neighbors(self, grid: List[List['SimpleNode']], diago_allowed: bool = False) -> None:
-        """ Sets a dict of all adjacent neighbors in the form neighbors["direction"] = node, cost
+        def save(text):
+            inp = input("Do you wish to save test data to a file? y/n\n")
 
-        :param grid: Grid on which the node is located
-        :param diago_allowed: Sets if diagonal neighbors should be included, does not allow corner-cutting
-        :return: None
-        """
+            save_name = None
+            if inp.lower() == "y":
 
-        # could definitely make this more compact, see update_sym_rect_neighbors()
+                while not save_name:
+                    root = tkinter.Tk()
+                    root.attributes("-alpha", 0)
+                    save_name = filedialog.asksaveasfilename(initialdir=self.data_path, defaultextension=".txt",
+                                                             parent=root)
+                    root.update()
+                    try:
+                        root.destroy()
+                    except:
+                        pass
 
-        neighbors = {}
+                with open(f"{save_name}", "w") as file:
+                    file.write(text)
 
-        try:
-            neighbors["right"] = grid[self.column + 1][self.row], 1  # right
-        except IndexError:
-            pass
-        try:
-            neighbors["down"] = grid[self.column][self.row + 1], 1  # down
-        except IndexError:
-            pass
+        main()
 
-        if not self.row == 0:
-            neighbors["up"] = grid[self.column][self.row - 1], 1  # up
-        if not self.column == 0:
-            neighbors["left"] = grid[self.column - 1][self.row], 1  # left
+    def main(self):
+        self.select_grid()
+        self.place_ends()
+        self.choose_test()
+        self.test()
 
-        if diago_allowed:
 
-            try:
-                if not neighbors["down"][0].is_wall and not neighbors["right"][0].is_wall:
-                    neighbors["downright"] = grid[self.column + 1][self.row + 1], 1.41421  # botright
-            except KeyError:
-                pass
-            try:
-                if not neighbors["up"][0].is_wall and not neighbors["right"][0].is_wall:
-                    neighbors["topright"] = grid[self.column + 1][self.row - 1], 1.41421  # topright
-            except KeyError:
-                pass
+class SimpleGrid:
+    def __init__(self):
+        self.all_nodes = [[]]
+        self.start = None
+        self.end = None
+        self.extra_ends = []  # END nodes other than end, see SimplePathFinder.init_goals
+        self.version = 0  # changes when walls are edited, see flow.FieldCache
+        self.name = None
 
-            try:
-                if not neighbors["down"][0].is_wall and not neighbors["left"][0].is_wall:
-                    neighbors["downleft"] = grid[self.column - 1][self.row + 1], 1.41421  # botleft
-            except KeyError:
-                pass
-            try:
-                if not neighbors["up"][0].is_wall and not neighbors["left"][0].is_wall:
-                    neighbors["topleft"] = grid[self.column - 1][self.row - 1], 1.41421  # topleft
-            except KeyError:
-                pass
 
-        self.neighbors = neighbors
-        if self.is_border:  # if self is border...
-            self.update_sym_rect_neighbors(grid)
+def get_position(node: Optional[Node]) -> str:
+    """ Return the (column, row) position of a node as text, '-' for None"""
+    if node is None:
+        return "-"
+    return f"({node.column}, {node.row})"
 
 
 def get_dt(func):
@@ -528,18 +1045,61 @@ class SimplePathFinder:
 
     diago = False
     apply_rsr = False
+    bidirectional = False  # for BFS, ASTAR and DIJKSTRA
 
     algo = "bfs"
 
-    dijkstra_cost_so_far = 0
-
-    frontier = []
-    queue = deque()  # for ASTAR
-    to_be_removed = []
+    wall_mask = None  # for JPS, wall_mask[column][row] -> bool
+    jump_tables = {}  # for JPS+, diago -> jps.JumpTables, loaded with the grid
+    rectangles = None  # for RSR, rsr.SymmetryRectangles
+    hierarchy = None  # for HPA*, hpa.Hierarchy
+    landmark_tables = None  # for ALT, alt.LandmarkTables, loaded with the grid
+    landmark_count = LANDMARK_COUNT
+    replanner = None  # for D* Lite, dstar.DStarLite, kept between wall edits
+    line_of_sight = None  # for THETA*, theta.LineOfSight of the last search
+    epsilon = EPSILON  # for WEIGHTED A*, the heuristic is weighted by 1 + epsilon
+    bucket_queue = False  # for ASTAR and DIJKSTRA, search with integer costs on a bucket queue (see BucketSearch)
+    grid_store = False  # for ASTAR and DIJKSTRA, search on the flat store.GridStore instead of the nodes
+    store = None  # store.GridStore of the walls and weights, kept up to date with edits (see handle_edits)
+    store_engine = None  # for ASTAR and DIJKSTRA on the grid store
+    cost_scale = COST_SCALE  # for the bucket queue, integer cost of a straight move
+
+    time_limit = 0  # ms, run stops the search after it (see search), 0 for no limit
+    expansion_limit = 0  # steps, run stops the search after it (see search), 0 for no limit
+    stopped_early = False  # the last search reached a limit or was cancelled, shortest_path is a partial path
+    cancel_event = None  # threading.Event, set by cancel to stop the search from another thread
+    goals = set()  # END nodes the search stops at (see init_goals)
+    reached_goal = None  # END node the last path leads to
+    flow_fields = None  # flow.FieldCache, distance and flow fields by grid version and goal
+    flow_field = None  # flow.FlowField of the last set_flow_field
+    components = None  # components.ComponentIndex, kept up to date with wall edits (see handle_edits)
+    compiled_graph = True  # searches on the plain neighbors walk graph.CompiledGraph instead of the node dicts
+    graph = None  # graph.CompiledGraph of the neighbors, compiled by set_neighbors
+    lazy_neighbors = False  # the neighbors of a node are set when it is first expanded instead of by set_neighbors
+    lazy_count = 0  # nodes whose neighbors were set on expansion since set_neighbors
+    bfs_engine = "nodes"  # for BFS, "nodes" or "bitboard" (bitboard.BitboardBFS, RSR and bidirectional are ignored)
+    bitboard = None  # bitboard.BitboardGrid of the walls, for BFS on bitboards
+
+    frontier = []  # for BFS, current layer
+    next_frontier = []  # for BFS, layer being built from the current one
+    queue = []  # for ASTAR and DIJKSTRA, binary heap shared with the HeapSearch engine
+    search_engine = None
+    layered_engine = None  # for BFS with RSR
+    bitboard_engine = None  # for BFS on bitboards
+    bidirectional_engine = None
     shortest_path = []
 
     neighbors_prep_dt = 0
     rsr_prep_dt = 0
+    jump_tables_prep_dt = 0
+    hierarchy_prep_dt = 0
+    landmarks_prep_dt = 0
+    replan_dt = 0
+    flow_prep_dt = 0
+    components_prep_dt = 0
+    store_prep_dt = 0
+    graph_prep_dt = 0  # part of neighbors_prep_dt
+    bitboard_prep_dt = 0
     algo_dt = 0
 
     def __init__(self, grid: SimpleGrid):
@@ -548,14 +1108,31 @@ class SimplePathFinder:
         :param grid: associated grid object to apply pathfinding
         """
         self.grid = grid
+        self.flow_fields = FieldCache()
+        self.cancel_event = Event()
+
+    def build_path(self, goal: Optional[Node] = None) -> List:
+        """ Creates the path from end to start (see trace_path)
 
-    def build_path(self) -> List:
-        """ Creates the path from end to start by recursively adding node.came_from from end to start and reversing
-        the path"""
+        :param goal: END node the path leads to, grid.end if None
+        :return: path from start to the goal
+        """
 
         self.path_found = True
+        self.reached_goal = goal if goal is not None else self.grid.end
 
-        current = self.grid.end
+        return self.trace_path(self.reached_goal)
+
+    def trace_path(self, node: Node) -> List:
+        """ Creates the path from start to a node by recursively adding node.came_from from the node to start and
+        reversing the path. The moves between jump points, RSR jumps, abstract nodes or any-angle waypoints are filled
+        in.
+
+        :param node: Last node of the path
+        :return: path from start to the node
+        """
+
+        current = node
         path = [current]
 
         while current is not self.grid.start:
@@ -564,37 +1141,358 @@ class SimplePathFinder:
 
         path.reverse()
 
+        if self.algo == self.hpa:
+            path = self.hierarchy.refine(path)
+        elif self.algo == self.theta:
+            path = fill_segments(path, self.grid.all_nodes, self.line_of_sight)
+        elif self.algo in (self.jps, self.jps_plus) or self.apply_rsr:
+            path = fill_path(path, self.grid.all_nodes, self.diago)
+
         return path
 
+    def get_partial_path(self) -> List:
+        """ Return the path from start to the most promising node reached by a search that was stopped early: the
+        node waiting to be expanded (in the BFS frontier or in the open list) that is the nearest to the goals by the
+        heuristic of A*. The bidirectional searches and D* Lite (which searches from the end) have no partial path.
+
+        :return: path from start to that node, empty if there is none
+        """
+
+        if self.bidirectional_engine or self.replanner:
+            return []
+
+        if self.store_engine:
+            engine = self.store_engine
+            all_nodes = self.grid.all_nodes
+            candidates = {all_nodes[column][row]: index
+                          for index in engine.get_open() for column, row in [self.store.position(index)]}
+            if not candidates:
+                return []
+            last = min(candidates, key=get_goals_heuristic(self.goals, self.diago))
+            return self.trace_path(self.link_store_path(engine.get_path(candidates[last])))
+
+        if self.bitboard_engine:
+            all_nodes = self.grid.all_nodes
+            candidates = [all_nodes[column][row] for column, row in self.bitboard_engine.get_last_layer()]
+            if not candidates:
+                return []
+            last = min(candidates, key=get_goals_heuristic(self.goals, self.diago))
+            return [all_nodes[column][row] for column, row in self.bitboard_engine.get_path(last.column, last.row)]
+        elif self.layered_engine:
+            candidates = [node for layer in self.layered_engine.layers for node in layer]
+        elif self.algo == self.bfs:
+            candidates = self.frontier
+        else:
+            closed = self.search_engine.closed
+            candidates = [entry[-1] for entry in self.queue if entry[-1] not in closed]
+
+        if not candidates:
+            return []
+
+        return self.trace_path(min(candidates, key=get_goals_heuristic(self.goals, self.diago)))
+
+    def cancel(self) -> None:
+        """ Stops the running search at its next step (see search), can be called from another thread
+
+        :return: None
+        """
+        self.cancel_event.set()
+
+    def search(self, time_limit: float = 0, expansion_limit: int = 0) -> List:
+        """ Runs the search set by init_search until it is done, unless it is stopped early: once time_limit ms have
+        passed, after expansion_limit steps (one node is expanded per step, one layer for BFS) or when cancel is called.
+        The limits are checked between steps, 0 means no limit. A search stopped early is over (path_found is set)
+        with stopped_early set and the partial path to the most promising node as shortest_path (see
+        get_partial_path).
+
+        :param time_limit: Wall-clock time limit (ms)
+        :param expansion_limit: Maximum number of steps
+        :return: The path found, the partial path if stopped early, empty if there is no path
+        """
+
+        deadline = perf_counter_ns() + time_limit * 10 ** 6 if time_limit else None
+        steps = 0
+
+        while not self.path_found:
+            if self.cancel_event.is_set() or deadline and perf_counter_ns() >= deadline \
+                    or expansion_limit and steps >= expansion_limit:
+                self.stopped_early = True
+                self.path_found = True
+                self.shortest_path = self.get_partial_path()
+                break
+
+            self.algo_dt += self.algo()
+            steps += 1
+
+        return self.shortest_path
+
     @get_dt
     def set_neighbors(self):
+        """ Sets the neighbors of every free node and the wall mask. With lazy_neighbors the neighbors are only
+        cleared, get_lazy_neighbors sets them when a node is first expanded and keeps them until the next call
+
+        :return: None
+        """
         for column in self.grid.all_nodes:
             for node in column:
-                if not node.is_sym_rect and not node.is_wall:
+                if self.lazy_neighbors:
+                    node.neighbors = None
+                elif not node.status & (Node.SYM_RECT | Node.WALL):
                     node.get_neighbors(self.grid.all_nodes, self.diago)
 
+        self.wall_mask = [[bool(node.status & Node.WALL) for node in column] for column in self.grid.all_nodes]
+        self.lazy_count = 0
+
+        self.graph = None
+        if self.compiled_graph and not self.lazy_neighbors:
+            self.graph_prep_dt = self.set_graph()
+
+    def get_lazy_neighbors(self, node: Node) -> List[Tuple[Node, float]]:
+        """ Returns the passable neighbors of a node, setting them first if the node has none yet (lazy_neighbors).
+        Used as the successors of the searches on the plain neighbors in lazy mode
+
+        :param node: Expanded node
+        :return: (neighbor, cost) list
+        """
+        if node.neighbors is None:
+            node.get_neighbors(self.grid.all_nodes, self.diago)
+            self.lazy_count += 1
+        return node.get_passable_neighbors()
+
+    @get_dt
+    def set_graph(self) -> None:
+        """ Compiles the neighbors set by set_neighbors into CSR arrays (see graph.CompiledGraph), walked by the
+        searches on the plain neighbors (A*, Weighted A*, Greedy, Dijkstra, ALT and BFS) instead of the node dicts
+
+        :return: None
+        """
+        self.graph = CompiledGraph(self.grid.all_nodes)
+
+    @get_dt
+    def set_components(self) -> None:
+        """ Labels the connected components of the free cells, unless the labels already match the walls (they are
+        updated by handle_edits when walls are edited)
+
+        :return: None
+        """
+        if self.components is None or not self.components.matches(self.wall_mask):
+            self.components = ComponentIndex(self.wall_mask)
+
+    @get_dt
+    def set_jump_tables(self) -> None:
+        """ Computes the JPS+ jump distance tables for the current walls, unless the tables already computed (or
+        loaded with the grid) still match them. Needs the wall mask from set_neighbors.
+
+        :return: None
+        """
+        tables = self.jump_tables.get(self.diago)
+        if tables is None or not tables.matches(self.wall_mask, self.diago):
+            self.jump_tables = {**self.jump_tables, self.diago: JumpTables(self.wall_mask, self.diago)}
+
+    @get_dt
+    def set_hierarchy(self) -> None:
+        """ Builds the HPA* abstract graph for the current walls and weights, unless the one already built still
+        matches them. Needs the wall mask from set_neighbors.
+
+        :return: None
+        """
+        if self.hierarchy is None or not self.hierarchy.matches(self.grid.all_nodes, self.wall_mask, self.diago):
+            self.hierarchy = Hierarchy(self.grid.all_nodes, self.wall_mask, self.diago)
+
+    @get_dt
+    def set_bitboard(self) -> None:
+        """ Builds the bitboard of the free cells for BFS on bitboards, unless the one already built still matches the
+        walls. Needs the wall mask from set_neighbors.
+
+        :return: None
+        """
+        if self.bitboard is None or not self.bitboard.matches(self.wall_mask):
+            self.bitboard = BitboardGrid(self.wall_mask)
+
+    @get_dt
+    def set_store(self) -> None:
+        """ Fills the flat grid store with the walls and weights, unless it was filled for the grid version (it is
+        updated by handle_edits when cells are edited). Needs the wall mask from set_neighbors.
+
+        :return: None
+        """
+        if self.store is None or not self.store.matches(self.grid.version):
+            weights = [[node.weight for node in column] for column in self.grid.all_nodes]
+            self.store = GridStore(self.wall_mask, weights, self.grid.version)
+
+    @get_dt
+    def set_landmark_tables(self) -> None:
+        """ Selects the ALT landmarks and computes their distance tables for the current walls and weights, unless the
+        tables already computed (or loaded with the grid) still match them. Needs the wall mask from set_neighbors.
+
+        :return: None
+        """
+        weights = [[node.weight for node in column] for column in self.grid.all_nodes]
+        tables = self.landmark_tables
+        if tables is None or not tables.matches(self.wall_mask, weights, self.diago, self.landmark_count):
+            self.landmark_tables = LandmarkTables(self.wall_mask, weights, self.diago, self.landmark_count,
+                                                  (self.grid.start.column, self.grid.start.row))
+
     def soft_reset(self, neighbors=False, timer=False):
         self.search_is_init = False
         self.path_found = False
+        self.stopped_early = False
+        self.cancel_event.clear()
         if timer:
             self.algo_dt = 0
         if neighbors:
             self.rsr_prep_dt = 0
             self.neighbors_prep_dt = 0
+            self.jump_tables_prep_dt = 0
+            self.hierarchy_prep_dt = 0
+            self.landmarks_prep_dt = 0
+            self.flow_prep_dt = 0
+            self.components_prep_dt = 0
+            self.bitboard_prep_dt = 0
+            self.store_prep_dt = 0
+            self.graph_prep_dt = 0
+            self.graph = None
         self.frontier = [self.grid.start]
-        self.queue = deque()
-        self.queue.append((self.grid.start, 0))
-        self.to_be_removed = []
+        self.next_frontier = []
+        self.init_goals()
+        self.init_heap_search()
+        self.init_bidirectional_search()
+        self.init_replanner()
         self.shortest_path = []
-        self.dijkstra_cost_so_far = 0
+        if self.components is not None and self.goals_unreachable():
+            self.path_found = True
 
+        flags = Node.VISITED | Node.BORDER | Node.SYM_RECT if neighbors else Node.VISITED
         for column in self.grid.all_nodes:
             for node in column:
-                node.visited = False
+                node.status &= ~flags
                 if neighbors:
-                    node.is_border = False
-                    node.is_sym_rect = False
                     node.neighbors = None
+        self.grid.start.status |= Node.VISITED
+
+    @get_dt
+    def set_flow_field(self, goal: Optional[Node] = None) -> None:
+        """ Gets the distance and flow fields to the goal for the current walls, weights and diagonal setting. They
+        are computed with one reverse Dijkstra and cached until the grid is edited (see flow.FieldCache), any start
+        then reads its path from them with get_field_path, without a search.
+
+        :param goal: Goal node, grid.end if None
+        :return: None
+        """
+        goal = goal if goal is not None else self.grid.end
+        self.flow_field = self.flow_fields.get(self.grid.version, self.grid.all_nodes,
+                                               lambda node: node.status & Node.WALL, self.diago, goal)
+
+    def get_field_path(self, start: Optional[Node] = None) -> List:
+        """ Return the path from start to the goal of the last set_flow_field, following the flow field
+
+        :param start: Starting node, grid.start if None
+        :return: Nodes from start to the goal, empty if there is no path
+        """
+        return self.flow_field.get_path(start if start is not None else self.grid.start)
+
+    def get_cost_ratio(self) -> float:
+        """ Return the cost of the path found over the cost of a cheapest path to the goals: 1 for the optimal
+        algorithms, at most 1 + epsilon for Weighted A*. The cheapest cost is read from one distance field seeded with
+        all the goals, cached for the grid version (see set_flow_field). Theta* paths are measured through the cells
+        they cross. It costs a reverse Dijkstra over the grid, call it once per path.
+
+        :return: cost ratio, 0 if no path was found or the search was stopped early
+        """
+
+        if not self.shortest_path or self.stopped_early:
+            return 0
+
+        is_wall = lambda node: node.status & Node.WALL
+        optimal = self.flow_fields.get(self.grid.version, self.grid.all_nodes, is_wall, self.diago, self.goals) \
+            .get_distance(self.grid.start)
+        return get_path_cost(self.shortest_path) / optimal if optimal else 1
+
+    def run_batch(self, pairs: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]],
+                  keep_paths: bool = False) -> BatchResults:
+        """ Runs self.algo on every (start, end) pair of positions of self.grid. The preprocess (neighbors, RSR and
+        the tables of the algorithm) is done once for all the queries. The search engines keep their state in sets
+        and dicts instead of the nodes, so the grid needs no reset between queries (BFS uses algo.LayeredSearch for
+        this reason). Queries whose end is not in the connected component of the start (walls are in none) find no
+        path without a search. The start, end and extra end nodes of the grid are restored afterwards, the search
+        state needs a soft_reset.
+
+        :param pairs: ((start column, start row), (end column, end row)) pairs, can be a generator
+        :param keep_paths: Keeps the path of every query in the results
+        :return: BatchResults with the length, cost, time (and path) of every query
+        """
+
+        grid = self.grid
+        start, end, extra_ends = grid.start, grid.end, grid.extra_ends
+        grid.extra_ends = []
+        results = BatchResults(keep_paths)
+
+        pairs = iter(pairs)
+        first = next(pairs, None)
+        if first is None:
+            return results
+
+        # The start of the first query is the seed of the ALT landmarks
+        (start_column, start_row), (end_column, end_row) = first
+        grid.start, grid.end = grid.all_nodes[start_column][start_row], grid.all_nodes[end_column][end_row]
+        self.init_search()
+        results.prep_dt = self.rsr_prep_dt + self.neighbors_prep_dt + self.components_prep_dt + \
+            self.jump_tables_prep_dt + self.hierarchy_prep_dt + self.landmarks_prep_dt + self.bitboard_prep_dt + \
+            self.store_prep_dt
+
+        for (start_column, start_row), (end_column, end_row) in chain([first], pairs):
+            query_start = perf_counter_ns()
+
+            grid.start = grid.all_nodes[start_column][start_row]
+            grid.end = grid.all_nodes[end_column][end_row]
+            self.path_found = False
+            self.stopped_early = False
+            self.shortest_path = []
+
+            self.init_goals()
+            if not self.goals_unreachable():
+                self.frontier = [grid.start]
+                self.init_heap_search()
+                if self.algo == self.bfs and not self.apply_rsr and not self.bitboard_engine:
+                    neighbors = self.get_lazy_neighbors if self.lazy_neighbors else Node.get_passable_neighbors
+                    self.layered_engine = LayeredSearch(grid.start, lambda node: [
+                        (neighbor, 1) for neighbor, cost in neighbors(node)])
+                self.init_bidirectional_search()
+                self.init_replanner()
+
+                self.search(self.time_limit, self.expansion_limit)
+
+            results.add(self.shortest_path, (perf_counter_ns() - query_start) / 10 ** 6, self.stopped_early)
+
+        grid.start, grid.end, grid.extra_ends = start, end, extra_ends
+        self.search_is_init = False
+        return results
+
+    def run_field_batch(self, pairs: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]], fields: FieldCache,
+                        keep_paths: bool = False) -> BatchResults:
+        """ Answers every (start, end) pair of positions of self.grid from the goal rooted fields of the end (see
+        flow.FieldCache): the fields of an end are computed by the first query to it, the next ones only read their
+        path. Query times include the fields they computed.
+
+        :param pairs: ((start column, start row), (end column, end row)) pairs, can be a generator
+        :param fields: Cache of the fields, its field_type computes them (flow.FlowField, wavefront.DistanceMap)
+        :param keep_paths: Keeps the path of every query in the results
+        :return: BatchResults with the length, cost, time (and path) of every query
+        """
+
+        all_nodes = self.grid.all_nodes
+        results = BatchResults(keep_paths)
+
+        for (start_column, start_row), (end_column, end_row) in pairs:
+            query_start = perf_counter_ns()
+
+            field = fields.get(self.grid.version, all_nodes, lambda node: node.status & Node.WALL, self.diago,
+                               all_nodes[end_column][end_row])
+            path = field.get_path(all_nodes[start_column][start_row])
+
+            results.add(path, (perf_counter_ns() - query_start) / 10 ** 6)
+
+        return results
 
     def init_search(self, prep=True) -> None:
         """ Initializes all search algorithms, by setting neighbors on the grid and setting starting point and applying
@@ -606,7 +1504,15 @@ class SimplePathFinder:
         algorithms = {
             "bfs": self.bfs,
             "astar": self.astar,
-            "dijkstra": self.dijkstra
+            "weighted_astar": self.weighted_astar,
+            "greedy": self.greedy,
+            "alt": self.alt,
+            "theta": self.theta,
+            "dijkstra": self.dijkstra,
+            "jps": self.jps,
+            "jps_plus": self.jps_plus,
+            "hpa": self.hpa,
+            "dstar": self.dstar
         }
         if isinstance(self.algo, str):
             self.algo = algorithms[self.algo]
@@ -616,15 +1522,237 @@ class SimplePathFinder:
                 self.rsr_prep_dt = self.apply_RSR()
 
             self.neighbors_prep_dt = self.set_neighbors()
+            self.components_prep_dt = self.set_components()
+
+        if self.algo == self.jps_plus:
+            self.jump_tables_prep_dt = self.set_jump_tables()
+
+        if self.algo == self.hpa:
+            self.hierarchy_prep_dt = self.set_hierarchy()
+
+        if self.algo == self.alt:
+            self.landmarks_prep_dt = self.set_landmark_tables()
+
+        if self.grid_store and self.algo in (self.astar, self.dijkstra):
+            self.store_prep_dt = self.set_store()
+
+        if self.algo == self.bfs and self.bfs_engine == "bitboard":
+            self.bitboard_prep_dt = self.set_bitboard()
 
         # Init all algorithms
-        self.grid.start.visited = True
+        self.stopped_early = False
+        self.cancel_event.clear()
+        self.grid.start.status |= Node.VISITED
         self.frontier = [self.grid.start]
-        self.queue = deque()
-        self.queue.append((self.grid.start, self.grid.start.priority))
+        self.next_frontier = []
+        self.init_goals()
+        self.init_heap_search()
+        self.init_bidirectional_search()
+        self.init_replanner()
+
+        if self.goals_unreachable():
+            self.path_found = True
 
         self.search_is_init = True
 
+    def init_goals(self) -> None:
+        """ Sets the END nodes the search stops at. The one sided BFS, Dijkstra, A* and Theta* stop at the first of
+        grid.end and grid.extra_ends they reach, which is the nearest one (Weighted A* and Greedy Best First Search
+        stop at the first one too), the other algorithms only search for grid.end
+
+        :return: None
+        """
+
+        self.reached_goal = None
+        self.goals = {self.grid.end}
+
+        if self.algo in (self.bfs, self.dijkstra, self.astar, self.weighted_astar, self.greedy, self.theta) \
+                and not self.bidirectional:
+            self.goals.update(self.grid.extra_ends)
+
+    def goals_unreachable(self) -> bool:
+        """ Return True if no goal is in the connected component of the start node, there is then no path and no
+        need to search. Needs the component index from set_components.
+
+        :return: unreachable
+        """
+        return not any(self.components.connected(self.grid.start, goal) for goal in self.goals)
+
+    def get_rectangle_jumps(self, count_moves: bool = False) -> RectangleJumps:
+        """ Return the successor generator jumping across the RSR rectangles for the current start and goals
+
+        :param count_moves: Costs are numbers of moves (for BFS) instead of distances
+        :return: RectangleJumps object
+        """
+        return RectangleJumps(self.rectangles, self.grid.all_nodes, (self.grid.start, *self.goals), self.diago,
+                              count_moves, self.get_lazy_neighbors if self.lazy_neighbors else None)
+
+    def init_heap_search(self) -> None:
+        """ Creates the HeapSearch engine used by A*, Weighted A* (A* with the heuristic weighted by 1 + epsilon),
+        Greedy Best First Search (the heuristic alone), ALT (A* with the landmark heuristic), Theta* (any-angle A*),
+        Dijkstra (A* without heuristic), JPS/JPS+ (A* on jump points) and HPA* (A* on the abstract graph), the
+        BucketSearch engine used instead by A* and Dijkstra with self.bucket_queue (Dial's buckets, integer costs),
+        the StoreSearch engine used instead by A* and Dijkstra with self.grid_store (flat arrays, RSR is ignored),
+        the LayeredSearch engine used by BFS with RSR and the BitboardBFS engine used by BFS on bitboards
+
+        :return: None
+        """
+
+        successors = self.get_lazy_neighbors if self.lazy_neighbors else None
+        self.layered_engine = None
+        self.store_engine = None
+        self.bitboard_engine = None
+
+        if self.algo == self.dijkstra:
+            heuristic = lambda node: 0
+        elif self.algo == self.alt:
+            heuristic = self.landmark_tables.get_heuristic(self.grid.end, get_heuristic(self.grid.end, self.diago))
+        else:
+            heuristic = get_goals_heuristic(self.goals, self.diago)
+
+        if self.algo == self.weighted_astar:
+            goals_heuristic, weight = heuristic, 1 + self.epsilon
+            heuristic = lambda node: weight * goals_heuristic(node)
+
+        if self.algo == self.jps:
+            successors = JumpPointSearch(self.grid.all_nodes, self.wall_mask, self.grid.end, self.diago).successors
+        elif self.algo == self.jps_plus:
+            successors = JumpPointSearchPlus(self.grid.all_nodes, self.jump_tables[self.diago],
+                                             self.grid.end).successors
+        elif self.algo == self.hpa:
+            successors = HierarchicalQuery(self.hierarchy, self.grid.start, self.grid.end).successors
+        elif self.apply_rsr:
+            successors = self.get_rectangle_jumps().successors
+
+        if self.bucket_queue and self.algo in (self.astar, self.dijkstra):
+            if self.algo == self.astar:
+                heuristic = get_integer_heuristic(self.goals, self.diago, self.cost_scale)
+            self.search_engine = BucketSearch(self.grid.start, heuristic, successors, self.cost_scale, self.graph)
+        elif self.algo == self.theta:
+            goals = self.goals
+            self.line_of_sight = LineOfSight(self.wall_mask)
+            heuristic = lambda node: min(distance(node, goal) for goal in goals)
+            self.search_engine = ThetaStarSearch(self.grid.start, heuristic, self.line_of_sight, successors,
+                                                 self.graph)
+        elif self.algo == self.greedy:
+            self.search_engine = GreedySearch(self.grid.start, heuristic, successors, self.graph)
+        else:
+            self.search_engine = HeapSearch(self.grid.start, heuristic, successors, self.graph)
+        self.queue = self.search_engine.queue
+
+        if self.algo == self.bfs and self.bfs_engine == "bitboard":
+            self.bitboard_engine = BitboardBFS(self.bitboard, self.grid.start, self.goals, self.diago)
+        elif self.algo == self.bfs and self.apply_rsr:
+            self.layered_engine = LayeredSearch(self.grid.start, self.get_rectangle_jumps(True).successors)
+
+        if self.grid_store and self.algo in (self.astar, self.dijkstra):
+            self.store_engine = StoreSearch(self.store, self.grid.start, self.goals, self.diago,
+                                            self.algo == self.astar)
+
+    def init_bidirectional_search(self) -> None:
+        """ Creates the bidirectional engine if the bidirectional variant of BFS, A* or Dijkstra is used (not with the
+        bucket queue or the grid store)
+
+        :return: None
+        """
+
+        self.bidirectional_engine = None
+
+        if not self.bidirectional:
+            return
+
+        start, end = self.grid.start, self.grid.end
+        if self.apply_rsr:
+            successors = self.get_rectangle_jumps().successors
+        else:
+            successors = self.get_lazy_neighbors if self.lazy_neighbors else None
+
+        # RSR jumps span several moves, BFS then uses the one sided LayeredSearch
+        if self.algo == self.bfs and not self.apply_rsr and self.bfs_engine == "nodes":
+            self.bidirectional_engine = BidirectionalBFS(start, end, successors, self.graph)
+        elif self.algo == self.dijkstra and not (self.bucket_queue or self.grid_store):
+            self.bidirectional_engine = BidirectionalHeapSearch(start, end, lambda node: 0, lambda node: 0,
+                                                                successors, self.graph)
+        elif self.algo == self.astar and not (self.bucket_queue or self.grid_store):
+            self.bidirectional_engine = BidirectionalHeapSearch(start, end, get_heuristic(end, self.diago),
+                                                                get_heuristic(start, self.diago), successors,
+                                                                self.graph)
+
+    def init_replanner(self) -> None:
+        """ Creates the D* Lite search state if D* Lite is used, it needs the wall mask from set_neighbors
+
+        :return: None
+        """
+
+        self.replanner = None
+
+        if self.algo == self.dstar:
+            weights = [[node.weight for node in column] for column in self.grid.all_nodes]
+            self.replanner = DStarLite(self.grid.all_nodes, self.wall_mask, weights, self.diago, self.grid.start,
+                                       self.grid.end)
+
+    def bidirectional_step(self) -> None:
+        """ Does one step of the bidirectional engine, builds the path once the engine is done
+
+        :return: None
+        """
+
+        engine = self.bidirectional_engine
+
+        if not engine.done:
+            engine.step()
+
+        if engine.done:
+            if engine.meeting is None:
+                self.path_found = True
+            else:
+                engine.link_path()
+                self.shortest_path = self.build_path()
+
+    def handle_edits(self, nodes: List[Node]) -> None:
+        """ Passes edited cells (walls drawn or erased, weights changed) to the component index, the grid store and to
+        D* Lite, which repairs its path instead of searching again
+
+        :param nodes: Edited nodes
+        :return: None
+        """
+        if self.components is not None:
+            for node in nodes:
+                self.components.update_cell(node.column, node.row, node.status & Node.WALL)
+
+        if self.store is not None:
+            # The edit moved the grid one version forward, a store that was already out of date (grid reset, loaded
+            # or resized) is dropped and rebuilt by set_store
+            if self.store.matches(self.grid.version - 1):
+                for node in nodes:
+                    self.store.update_cell(node.column, node.row, node.status & Node.WALL, node.weight)
+                self.store.version = self.grid.version
+            else:
+                self.store = None
+
+        if self.search_is_init and self.algo == self.dstar:
+            self.replan_dt = self.replan(nodes)
+
+    @get_dt
+    def replan(self, nodes: List[Node]) -> None:
+        """ Updates the D* Lite search state with edited cells (walls or weights) and repairs the path, only the nodes
+        whose cost to the end changed are expanded again
+
+        :param nodes: Edited nodes
+        :return: None
+        """
+
+        self.shortest_path = []
+
+        for node in nodes:
+            self.replanner.update_cell(node.column, node.row, bool(node.status & Node.WALL), node.weight)
+
+        while not self.replanner.done:
+            self.replanner.step()
+
+        if self.replanner.link_path():
+            self.shortest_path = self.build_path()
+
     def check_done(self) -> bool:
         """ Checks if the queue/frontier is empty, if it is, post a no path found event and terminate processing
         timer.
@@ -636,86 +1764,219 @@ class SimplePathFinder:
             self.path_found = True
         return self.path_found
 
-    def clean_frontier(self) -> None:
-        """ Remove processed nodes from the frontier
-        """
-        for node in self.to_be_removed:
-            if node in self.frontier:
-                self.frontier.remove(node)
-        self.to_be_removed.clear()
-
-    def expand_frontier(self, node: SimpleNode, costs: bool = False) -> None:
-        """ Adds the available neighbors of the nodes to the frontier and marks the current node as visited
+    def expand_frontier(self, node: Node) -> Optional[Node]:
+        """ Adds the available neighbors of the node to the next frontier layer and marks them as visited
 
         :param node: current node
-        :param costs: True if the algorithm needs to know the cost_so_far of each node (Dijkstra)
-        :return:
+        :return: The END node reached (it is not added to the next layer), None if no END node was reached
         """
 
+        goals = self.goals
+
+        if self.graph is not None:
+            graph = self.graph
+            targets = graph.targets
+            index = node.column * graph.height + node.row
+            for edge in range(graph.offsets[index], graph.offsets[index + 1]):
+                neighbor = targets[edge]
+                if neighbor.status & (Node.WALL | Node.VISITED):
+                    continue
+                neighbor.status |= Node.VISITED
+                neighbor.came_from = node
+                if neighbor in goals:
+                    return neighbor
+                self.next_frontier.append(neighbor)
+
+            return None
+
+        if node.neighbors is None and self.lazy_neighbors:
+            node.get_neighbors(self.grid.all_nodes, self.diago)
+            self.lazy_count += 1
+
         for neighbor, cost in node.get_available_neighbors():
-            if costs:
-                neighbor.cost_so_far = node.cost_so_far + cost
-            neighbor.visited = True
-            self.frontier.append(neighbor)
+            neighbor.status |= Node.VISITED
             neighbor.came_from = node
+            if neighbor in goals:
+                return neighbor
+            self.next_frontier.append(neighbor)
+
+        return None
+
+    def layered_bfs(self) -> None:
+        """ Does one layer of the BFS on a grid reduced by RSR (see algo.LayeredSearch), the path is built once an
+        END node is expanded
+
+        :return: None
+        """
+
+        engine = self.layered_engine
+
+        if not engine.layers:
+            self.path_found = True
+            return
+
+        goal = next((node for node in engine.step() if node in self.goals), None)
+
+        if goal is not None:
+            self.shortest_path = self.build_path(goal)
+
+    def bitboard_bfs(self) -> None:
+        """ Does one layer of the BFS on bitboards (see bitboard.BitboardBFS), the path is built once an END node is
+        reached
+
+        :return: None
+        """
+
+        engine = self.bitboard_engine
+
+        if engine.done:
+            self.path_found = True
+            return
+
+        goal = engine.step()
+
+        if goal is not None:
+            all_nodes = self.grid.all_nodes
+            self.path_found = True
+            self.reached_goal = all_nodes[goal[0]][goal[1]]
+            self.shortest_path = [all_nodes[column][row] for column, row in engine.get_path(*goal)]
 
     @get_dt
     def bfs(self) -> None:
-        """ Does a breadth first search (flood fill) on self.grid
-         Not compatible with RSR (path will not be optimal)
+        """ Does a level synchronous breadth first search (flood fill) on self.grid, one layer is expanded per call.
+         The next layer is built in a second list and the two are swapped, so processed nodes never need to be removed
+         from the frontier. Stops as soon as the end node is generated. Cell weights are ignored.
+         With self.bidirectional, algo.BidirectionalBFS expands a layer from the start or from the end per call instead.
+         With RSR, jumps across rectangles span several layers so algo.LayeredSearch is used instead.
+         With self.bfs_engine set to "bitboard", the layers are bitboards (see bitboard.BitboardBFS)
 
         :return: None
         """
 
+        if self.bitboard_engine:
+            return self.bitboard_bfs()
+
+        if self.bidirectional_engine:
+            return self.bidirectional_step()
+
+        if self.layered_engine:
+            return self.layered_bfs()
+
         if self.check_done():
             return
 
-        self.clean_frontier()
+        for node in self.frontier:
+            goal = self.expand_frontier(node)
+            if goal is not None:
+                self.shortest_path = self.build_path(goal)
+                return
 
-        for node_no in range(len(self.frontier)):
-            node = self.frontier[node_no]
-            if node is self.grid.end:
-                self.shortest_path = self.build_path()
+        self.frontier, self.next_frontier = self.next_frontier, self.frontier
+        self.next_frontier.clear()
+
+    def link_store_path(self, positions: List[Tuple[int, int]]) -> Node:
+        """ Writes node.came_from along a path of (column, row) positions found on the grid store, so it can be
+        walked like the paths of the other engines (see trace_path)
+
+        :param positions: Positions from start to the last node
+        :return: The last node
+        """
 
-            self.to_be_removed.append(node)
+        all_nodes = self.grid.all_nodes
+        previous = None
+        for column, row in positions:
+            node = all_nodes[column][row]
+            node.came_from = previous
+            previous = node
+        return previous
 
-            self.expand_frontier(node)
+    def store_step(self) -> None:
+        """ Expands one cell of A* or Dijkstra on the flat grid store (see store.StoreSearch), the path is built once
+        a goal is reached. Nodes are only used for the path
+
+        :return: None
+        """
+
+        engine = self.store_engine
+
+        if engine.done:
+            self.path_found = True
+            return
+
+        index = engine.step()
+        if index is None:
+            return
+
+        if engine.goal is not None:
+            self.shortest_path = self.build_path(self.link_store_path(engine.get_path()))
 
     @get_dt
     def dijkstra(self) -> None:
-        """ Dijkstra's Algorithm (weighted flood fill). This one could work with weighed graphs and is compatible
-        with RSR
+        """ Dijkstra's Algorithm (weighted flood fill), one node is expanded per call (see algo.HeapSearch).
+        Each node is popped once in order of cost, so it works with weighted cells and is compatible with RSR.
+        With self.bidirectional, algo.BidirectionalHeapSearch expands a node from either end per call
 
         :return: None
         """
 
-        if self.diago:
-            self.dijkstra_cost_so_far += 1.41422
-        else:
-            self.dijkstra_cost_so_far += 1
+        if self.store_engine:
+            return self.store_step()
+
+        if self.bidirectional_engine:
+            return self.bidirectional_step()
 
         if self.check_done():
             return
 
-        self.clean_frontier()
+        node = self.search_engine.step()
 
-        for node_no in range(len(self.frontier)):
-            node = self.frontier[node_no]
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
 
-            if not node.cost_so_far <= self.dijkstra_cost_so_far:
-                continue
+    @get_dt
+    def astar(self) -> None:
+        """ Does A* algorithm on self.grid, one node is expanded per call (see algo.HeapSearch)
+        Compatible with RSR and weighted cells. With self.bidirectional, algo.BidirectionalHeapSearch expands a node
+        from either end per call
 
-            if node is self.grid.end:
-                self.shortest_path = self.build_path()
+        :return: None
+        """
+
+        if self.store_engine:
+            return self.store_step()
+
+        if self.bidirectional_engine:
+            return self.bidirectional_step()
 
-            self.to_be_removed.append(node)
+        if self.check_done():
+            return
 
-            self.expand_frontier(node, True)
+        node = self.search_engine.step()
+
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
 
     @get_dt
-    def astar(self) -> None:
-        """ Does A* algorithm on self.grid
-        Compatible with RSR
+    def weighted_astar(self) -> None:
+        """ Does Weighted A* on self.grid, one node is expanded per call (see algo.HeapSearch). The heuristic is
+        weighted by 1 + self.epsilon, the path found costs at most 1 + epsilon times the cheapest one. Compatible with
+        RSR and weighted cells
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
+
+    @get_dt
+    def greedy(self) -> None:
+        """ Does Greedy Best First Search on self.grid, one node is expanded per call (see algo.GreedySearch), in order
+        of the heuristic alone. The path has no cost bound. Compatible with RSR and weighted cells
 
         :return: None
         """
@@ -723,109 +1984,155 @@ class SimplePathFinder:
         if self.check_done():
             return
 
-        node = self.queue.popleft()[0]
+        node = self.search_engine.step()
+
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
+
+    @get_dt
+    def alt(self) -> None:
+        """ Does A* on self.grid with the landmark heuristic of alt.LandmarkTables, one node is expanded per call (see
+        algo.HeapSearch). Compatible with RSR and weighted cells
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
 
         if node is self.grid.end:
             self.shortest_path = self.build_path()
 
-        # I don't feel like it's worth wrapping this in another function, since no other algorithm uses it
-        for neighbor, cost in node.get_available_neighbors():
-            neighbor.visited = True
-            neighbor.came_from = node
-            neighbor.cost_so_far = node.cost_so_far + cost
+    @get_dt
+    def theta(self) -> None:
+        """ Does Theta* on self.grid, one node is expanded per call (see algo.ThetaStarSearch). Nodes are linked to
+        any node they see in a straight line. Compatible with RSR, cell weights are ignored
+
+        :return: None
+        """
 
-            if self.diago:
-                # Eucledian distance, was not proving to be efficient, also paths are weirder
-                # neighbor.heuristic = (((self.grid.end.row - neighbor.row)**2
-                #                        + (self.grid.end.column - neighbor.column)**2) ** .5)
+        if self.check_done():
+            return
 
-                # Thus we switch to diagonal (45 deg only) distance (octile, not chess)
-                dx = abs(neighbor.column - self.grid.end.column)
-                dy = abs(neighbor.row - self.grid.end.row)
-                neighbor.heuristic = dx + dy + (1.41421 - 2) * min(dx, dy)
-                # neighbor.heuristic = (dx + dy) - 0.5857864376269049 * min(dx, dy)
+        node = self.search_engine.step()
 
-                # neighbor.heuristic = max(dx, dy) + 0.41421 * min(dx, dy)
+        if node in self.goals:
+            self.shortest_path = self.build_path(node)
 
-            else:
-                neighbor.heuristic = abs(self.grid.end.row - neighbor.row) + abs(self.grid.end.column - neighbor.column)
+    @get_dt
+    def jps(self) -> None:
+        """ Does Jump Point Search on self.grid, one jump point is expanded per call (see jps.JumpPointSearch).
+        Only for uniform cost grids: RSR and cell weights are ignored. The path is filled between jump points so it
+        has the same length as the A* one
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+
+        if node is self.grid.end:
+            self.shortest_path = self.build_path()
+
+    @get_dt
+    def jps_plus(self) -> None:
+        """ Does JPS+ on self.grid: Jump Point Search reading its jumps from the precomputed jps.JumpTables instead of
+        scanning the grid. One jump point is expanded per call, RSR and cell weights are ignored.
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+
+        if node is self.grid.end:
+            self.shortest_path = self.build_path()
 
-            # This is to reduce comparison between ints and floats while keeping some precision
-            neighbor.priority = neighbor.cost_so_far + neighbor.heuristic
+    @get_dt
+    def hpa(self) -> None:
+        """ Does HPA* on self.grid: A* on the abstract graph of hpa.Hierarchy, one abstract node (cluster entrance) is
+        expanded per call. The abstract path is refined inside each cluster once the end is reached, it can be a bit
+        longer than the A* one. RSR is ignored, cell weights are supported
+
+        :return: None
+        """
+
+        if self.check_done():
+            return
+
+        node = self.search_engine.step()
+
+        if node is self.grid.end:
+            self.shortest_path = self.build_path()
+
+    @get_dt
+    def dstar(self) -> None:
+        """ Does D* Lite on self.grid (see dstar.DStarLite), one node is expanded per call from the end towards the
+        start. The search state is kept once the path is found, see replan. RSR is ignored, cell weights are supported
+
+        :return: None
+        """
+
+        if not self.replanner.done:
+            self.replanner.step()
+            return
 
-            index = bisect_left(self.queue, neighbor.priority, key=lambda x: x[1])
-            self.queue.insert(index, (neighbor, neighbor.priority))
+        if self.replanner.link_path():
+            self.shortest_path = self.build_path()
+        else:
+            self.path_found = True
 
-    def symmetry_rectangle(self, start: SimpleNode, size: int) -> None:
-        """Simulates an object creation by defining the nodes inside the square as borders or sym_rect if they are
-        contained in the borders. This allows to skip neighbors when we are running our pathfinding algorithm.
-        This applies on nodes in cst.all_nodes.
+    def symmetry_rectangle(self, left: int, top: int, right: int, bottom: int) -> None:
+        """Marks the nodes of a rectangle as borders, or sym_rect if they are contained in the borders. Sym_rect nodes
+        get no neighbors, the searches jump over them (see rsr.RectangleJumps).
 
-        :param start: Top-left node of the square
-        :param size: Length of a side of the square
+        :param left: First column of the rectangle
+        :param top: First row of the rectangle
+        :param right: Last column of the rectangle
+        :param bottom: Last row of the rectangle
         :return: None"""
 
-        for column in range(size):
-            for row in range(size):
-                node = self.grid.all_nodes[start.column + column][start.row + row]
+        for column in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                node = self.grid.all_nodes[column][row]
 
-                if row == 0 or row == size - 1 or column == 0 or column == size - 1:
-                    node.is_border = True
+                if row in (top, bottom) or column in (left, right):
+                    node.status |= Node.BORDER
                 else:
-                    node.is_sym_rect = True
+                    node.status |= Node.SYM_RECT
 
-    # noinspection PyUnresolvedReferences
     @get_dt
     def apply_RSR(self) -> None:
-        """Applies Rectangular symmetry reduction to self.grid, regrouping any square of free nodes (not walls)
-        together, square sides must be atleast 4, or it will be skipped.
+        """Applies Rectangular symmetry reduction to self.grid: free nodes are decomposed into maximal empty rectangles
+        (see rsr.SymmetryRectangles), sides must be atleast rsr.MIN_SIZE. The start and end nodes can be inside of a
+        rectangle, the searches then link them to its borders.
         :return: None"""
 
-        # It would be nice to be able to prevent it from trying to apply RSR to nodes that have already been RSR'd...
-        # But using a flat copy of cst.all_nodes takes too much time to process.
-        # Also, it is slow even while the algorithms are running...
+        # Weighted cells are left out, jumping through a rectangle assumes every node inside costs the same
+        free_mask = get_free_mask(self.grid.all_nodes, lambda node: not node.status & Node.WALL and node.weight == 1)
+        self.rectangles = SymmetryRectangles(free_mask)
 
-        for column in self.grid.all_nodes:
-            for start in column:
-                if not (start.is_wall or start.is_border or start.is_sym_rect or start.is_start or start.is_end):
-                    start_col, start_row = start.column, start.row
-                    size = 1
-                    hit_wall = False
-
-                    while not hit_wall:
-                        size += 1
-
-                        # Look at new border (lower and right)
-                        try:
-                            for add in range(size):
-                                node = self.grid.all_nodes[start_col + size - 1][start_row + add]
-                                if node.is_wall or node.is_border or node.is_sym_rect or node.is_start or node.is_end:
-                                    hit_wall = True
-                                    break
-
-                                node = self.grid.all_nodes[start_col + add][start_row + size - 1]
-                                if node.is_wall or node.is_border or node.is_sym_rect or node.is_start or node.is_end:
-                                    hit_wall = True
-                                    break
-                        except IndexError:
-                            break
-
-                    size -= 1
-                    if size >= 4:
-                        self.symmetry_rectangle(start, size)
+        for rectangle in self.rectangles.rectangles:
+            self.symmetry_rectangle(*rectangle)
 
     def run(self) -> None:
         """
         Procedure to run the algorithm chosen in init_search.
         Note: running display steps as True with run_interval = -1 will loop chosen algorithm until a path
         is found (or no path) and show visited nodes, whereas setting display steps to False will loop until a
-        path is found (or no path) but won't show visited nodes.
+        path is found (or no path) but won't show visited nodes. The search stops early at self.time_limit or
+        self.expansion_limit (see search).
 
         :return: None
         """
 
-        while not self.path_found:
-            self.algo_dt += self.algo()
+        self.search(self.time_limit, self.expansion_limit)
 
 
 def init_pathfinder(grid: SimpleGrid) -> SimplePathFinder:
@@ -836,39 +2143,6 @@ def init_pathfinder(grid: SimpleGrid) -> SimplePathFinder:
     return SimplePathFinder(grid)
 
 
-# from bisect! did not want to update to python 3.10 just for that... (Since only version 3.10 has key kwarg)
-def bisect_left(a, x, lo=0, hi=None, *, key=None):
-    """Return the index where to insert item x in list a, assuming a is sorted.
-    The return value i is such that all e in a[:i] have e < x, and all e in
-    a[i:] have e >= x.  So if x already appears in the list, a.insert(i, x) will
-    insert just before the leftmost x already there.
-    Optional args lo (default 0) and hi (default len(a)) bound the
-    slice of a to be searched.
-    """
-
-    if lo < 0:
-        raise ValueError('lo must be non-negative')
-    if hi is None:
-        hi = len(a)
-    # Note, the comparison uses "<" to match the
-    # __lt__() logic in list.sort() and in heapq.
-    if key is None:
-        while lo < hi:
-            mid = (lo + hi) // 2
-            if a[mid] < x:
-                lo = mid + 1
-            else:
-                hi = mid
-    else:
-        while lo < hi:
-            mid = (lo + hi) // 2
-            if key(a[mid]) < x:
-                lo = mid + 1
-            else:
-                hi = mid
-    return lo
-
-
 if __name__ == "__main__":
     grid = SimpleGrid()
     pathfinder = init_pathfinder(grid)
@@ -0,0 +1,159 @@
+""" The THETA module holds the line-of-sight checks of Theta*, the any-angle variant of A* (see algo.ThetaStarSearch):
+a node can be linked to any node it sees in a straight line instead of only to its neighbors, so paths are not made of
+8-direction zigzags. LineOfSight traces the segment between two cell centers over a flat copy of the wall flags and
+caches the results for the duration of a search, it also counts the checks and times them.
+It reads walls from a wall mask (wall_mask[column][row] -> bool), so it works with the nodes of both pathfinders (only
+column and row are used).
+"""
+
+from math import hypot
+from time import perf_counter_ns
+from typing import *
+
+
+def distance(node: Any, other: Any) -> float:
+    """ Return the straight line distance between the centers of two nodes"""
+    return hypot(node.column - other.column, node.row - other.row)
+
+
+class LineOfSight:
+    """ Visibility between cell centers for one search. A segment is blocked by every wall cell it passes through,
+    when it passes exactly through the corner of four cells, the two cells beside it must be free (no corner-cutting,
+    like diagonal moves).
+    checks counts the segments traced, cache_hits the checks answered by the cache and dt the time spent in both (ms).
+    """
+
+    def __init__(self, wall_mask: List[List[bool]]) -> None:
+        """ Copy the wall flags
+
+        :param wall_mask: wall_mask[column][row] is True for walls
+        """
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        # Flat grid column by column with a border of walls: index = (column + 1) * stride + row + 1
+        self.stride = self.height + 2
+        self.free = bytearray((self.width + 2) * self.stride)
+        for column in range(self.width):
+            offset = (column + 1) * self.stride + 1
+            self.free[offset: offset + self.height] = bytes(not wall for wall in wall_mask[column])
+
+        self.cache = {}  # (index, index) ordered pair -> visibility
+        self.checks = 0
+        self.cache_hits = 0
+        self.dt = 0
+
+    def is_visible(self, node: Any, other: Any) -> bool:
+        """ Return True if the segment between the centers of the two nodes crosses no wall
+
+        :param node: First node
+        :param other: Second node
+        :return: visibility
+        """
+
+        start = perf_counter_ns()
+
+        stride = self.stride
+        first = (node.column + 1) * stride + node.row + 1
+        second = (other.column + 1) * stride + other.row + 1
+        key = (first, second) if first < second else (second, first)
+
+        visible = self.cache.get(key)
+        if visible is None:
+            visible = self.trace(node.column, node.row, other.column, other.row)
+            self.cache[key] = visible
+            self.checks += 1
+        else:
+            self.cache_hits += 1
+
+        self.dt += (perf_counter_ns() - start) / 10 ** 6
+        return visible
+
+    def trace(self, column: int, row: int, end_column: int, end_row: int) -> bool:
+        """ Walk the cells the segment passes through, in integer arithmetic: after ix horizontal and iy vertical
+        steps, the sign of (1 + 2 * ix) * ny - (1 + 2 * iy) * nx tells if the segment leaves the current cell through
+        its vertical side, its horizontal side or its corner. The result does not depend on the direction.
+
+        :param column: Column of the first cell
+        :param row: Row of the first cell
+        :param end_column: Column of the last cell
+        :param end_row: Row of the last cell
+        :return: True if every cell is free
+        """
+
+        free = self.free
+        stride = self.stride
+        nx, ny = abs(end_column - column), abs(end_row - row)
+        step_x = stride if end_column > column else -stride
+        step_y = 1 if end_row > row else -1
+
+        index = (column + 1) * stride + row + 1
+        ix = iy = 0
+
+        while ix < nx or iy < ny:
+            decision = (1 + 2 * ix) * ny - (1 + 2 * iy) * nx
+            if decision == 0:
+                if not (free[index + step_x] and free[index + step_y]):
+                    return False
+                index += step_x + step_y
+                ix += 1
+                iy += 1
+            elif decision < 0:
+                index += step_x
+                ix += 1
+            else:
+                index += step_y
+                iy += 1
+
+            if not free[index]:
+                return False
+
+        return True
+
+    def get_cells(self, node: Any, other: Any) -> List[Tuple[int, int]]:
+        """ Return the (column, row) of the cells the segment between two visible nodes passes through, the first one
+        excluded. Corner crossings go straight to the diagonal cell. Used to draw any-angle paths on the grid.
+
+        :param node: First node
+        :param other: Second node
+        :return: cells list
+        """
+
+        column, row = node.column, node.row
+        nx, ny = abs(other.column - column), abs(other.row - row)
+        step_x = 1 if other.column > column else -1
+        step_y = 1 if other.row > row else -1
+
+        cells = []
+        ix = iy = 0
+        while ix < nx or iy < ny:
+            decision = (1 + 2 * ix) * ny - (1 + 2 * iy) * nx
+            if decision <= 0:
+                column += step_x
+                ix += 1
+            if decision >= 0:
+                row += step_y
+                iy += 1
+            cells.append((column, row))
+
+        return cells
+
+
+def fill_segments(path: List[Any], all_nodes: List[List[Any]], line_of_sight: LineOfSight) -> List[Any]:
+    """ Return the path with the cells crossed between its waypoints, for drawing. Consecutive waypoints of an
+    any-angle path see each other.
+
+    :param path: Waypoints from start to end
+    :param all_nodes: Grid of nodes (all_nodes[column][row])
+    :param line_of_sight: LineOfSight of the search
+    :return: Path with every crossed node
+    """
+
+    if not path:
+        return path
+
+    full_path = [path[0]]
+    for node, next_node in zip(path, path[1:]):
+        full_path += [all_nodes[column][row] for column, row in line_of_sight.get_cells(node, next_node)]
+
+    return full_path
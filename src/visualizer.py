@@ -52,6 +52,11 @@ def main():
 
         grid.handle_grid(main_gui)
 
+        if grid.edited:
+            grid.version += 1
+            pathfinder.handle_edits(grid.edited)
+            grid.edited.clear()
+
         if pathfinder.running:
             pathfinder.run(main_gui.run_interval_button.dict["value"],
                            main_gui.wait_time_button.dict["value"])
@@ -0,0 +1,257 @@
+""" The WAVEFRONT module holds goal rooted distance maps computed with NumPy array operations instead of one node at a
+time: the grid is turned into 2-D arrays of wall flags and weights, and the cost from every cell to the goals is
+found either by a vectorized wavefront (fronts of cells at about the same distance are expanded at once, nearest
+first) or by chamfer sweeps (forward and backward passes over the columns, each column relaxed at once, until nothing
+changes).
+Paths are read by gradient descent on the map: from the start, move to the neighbor the map says is on a cheapest
+path, until a goal is reached.
+DistanceMap has the interface of flow.FlowField, so flow.FieldCache can keep either of them.
+Costs are integers (SCALE times the costs of the searches, a diagonal move costs 141421 times the weight) so the sums
+are exact and the descent can compare them for equality.
+NumPy is optional, only this module needs it (see AVAILABLE).
+It follows the movement rules of Node.get_neighbors with walls read from a wall mask (wall_mask[column][row] -> bool),
+so it works with the nodes of both pathfinders (only column and row are used).
+"""
+
+from typing import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+AVAILABLE = np is not None
+WAVEFRONT = "wavefront"
+CHAMFER = "chamfer"
+SCALE = 100000  # Distances are stored as integers, SCALE times the costs
+INF = float("inf")
+NO_DISTANCE = 2 ** 60  # Distance of the cells that can not reach a goal, fits in int64 even after adding a cost
+
+
+def sweep_line(distances: Any, costs: Any, jumps: Any) -> Any:
+    """ Relax the cells of a line from the cells before them on the line: distance[r] becomes the minimum over k <= r
+    of distances[k] plus the costs of entering the cells k to r - 1. With prefix the sums of the costs of the cells
+    before r, it is prefix[r] + min(distances[k] - prefix[k]), a cumulative minimum. A wall adds a jump bigger than any
+    distance to the prefix, so no cell is relaxed across a wall.
+
+    :param distances: 1-D int64 array of distances
+    :param costs: 1-D int64 array, cost of entering each cell (0 for walls)
+    :param jumps: 1-D int64 array, the jump of walls and 0 for free cells
+    :return: relaxed distances, the ones relaxed across a wall are at least the jump and must be dropped
+    """
+    prefix = np.zeros_like(costs)
+    np.cumsum((costs + jumps)[:-1], out=prefix[1:])
+    return np.minimum.accumulate(distances - prefix) + prefix
+
+
+class DistanceMap:
+    """ Distance map to one or more goals in 2-D int64 arrays over a wall-padded grid: distances[column + 1, row + 1]
+    is SCALE times the cost of a cheapest path from the cell to the nearest goal, NO_DISTANCE if no goal can be
+    reached. Moves cost the weight of the cell they enter, like for the searches. iterations counts the wavefront
+    passes or the pairs of sweeps.
+    """
+
+    def __init__(self, all_nodes: List[List[Any]], wall_mask: List[List[bool]], weights: List[List[float]],
+                 diago: bool, goals: Union[Any, Iterable[Any]], method: str = WAVEFRONT) -> None:
+        """ Compute the map
+
+        :param all_nodes: Grid of nodes (all_nodes[column][row])
+        :param wall_mask: wall_mask[column][row] is True for walls
+        :param weights: weights[column][row] is the cost multiplier of entering the cell
+        :param diago: Allows diagonal moves (no corner-cutting)
+        :param goals: Goal node, or nodes
+        :param method: WAVEFRONT or CHAMFER
+        """
+        if np is None:
+            raise ImportError("Distance maps need NumPy (pip install numpy)")
+
+        self.all_nodes = all_nodes
+        self.diago = diago
+        self.method = method
+        self.width = len(wall_mask)
+        self.height = len(wall_mask[0])
+
+        self.free = np.zeros((self.width + 2, self.height + 2), dtype=bool)
+        self.free[1:-1, 1:-1] = ~np.array(wall_mask, dtype=bool)
+        self.weights = np.ones((self.width + 2, self.height + 2))
+        self.weights[1:-1, 1:-1] = np.array(weights, dtype=float)
+
+        # (column offset, row offset, cost for a weight of 1), the cells beside a diagonal move must be free
+        self.moves = [(1, 0, SCALE), (-1, 0, SCALE), (0, 1, SCALE), (0, -1, SCALE)]
+        if diago:
+            self.moves += [(dx, dy, 141421) for dx in (1, -1) for dy in (1, -1)]
+        self.step_costs = [self.get_step_costs(*move) for move in self.moves]
+
+        self.goals = [goals] if hasattr(goals, "column") else list(goals)
+        self.distances = np.full((self.width + 2, self.height + 2), NO_DISTANCE, dtype=np.int64)
+        for goal in self.goals:
+            if self.free[goal.column + 1, goal.row + 1]:
+                self.distances[goal.column + 1, goal.row + 1] = 0
+        self.iterations = 0
+
+        if method == CHAMFER:
+            self.chamfer()
+        else:
+            self.wavefront()
+
+        reached = self.distances[self.distances < NO_DISTANCE]
+        self.max_distance = reached.max() / SCALE if reached.size else 0
+
+    def get_step_costs(self, dx: int, dy: int, cost: int) -> Any:
+        """ Return the cost of the move from every cell, NO_DISTANCE where the move is not allowed
+
+        :param dx: Column offset of the move
+        :param dy: Row offset of the move
+        :param cost: Cost of the move for a weight of 1
+        :return: (width, height) int64 array
+        """
+        width, height = self.width, self.height
+        free = self.free
+        target = (slice(1 + dx, width + 1 + dx), slice(1 + dy, height + 1 + dy))
+
+        allowed = free[1:-1, 1:-1] & free[target]
+        if dx and dy:
+            allowed &= free[1 + dx: width + 1 + dx, 1:-1] & free[1:-1, 1 + dy: height + 1 + dy]
+
+        return np.where(allowed, np.rint(cost * self.weights[target]).astype(np.int64), NO_DISTANCE)
+
+    @property
+    def memory(self) -> int:
+        """ Size of the map in bytes"""
+        return self.distances.nbytes
+
+    def wavefront(self) -> None:
+        """ Expand the cells by fronts of increasing distance: each pass takes the pending cells (reached but not
+        expanded) closer than the nearest one plus the cheapest move, and relaxes the cells that can move to them at
+        once. Moves cost at least the cheapest move, so these cells can not be improved anymore and every cell is
+        expanded once (Dial's buckets, a bucket per pass). The cells are gathered by flat index (index = (column + 1)
+        * stride + row + 1) so a pass costs the size of the front, not of the grid.
+
+        :return: None
+        """
+
+        stride = self.height + 2
+        distances = self.distances.reshape(-1)  # A view, updates go to self.distances
+
+        # (flat step, cost of the move from each cell) with the padding cells unable to move
+        moves = []
+        for (dx, dy, cost), step_costs in zip(self.moves, self.step_costs):
+            padded = np.full(self.distances.shape, NO_DISTANCE, dtype=np.int64)
+            padded[1:-1, 1:-1] = step_costs
+            moves.append((dx * stride + dy, padded.reshape(-1)))
+        cheapest = min((int(step_costs.min()) for step_costs in self.step_costs), default=NO_DISTANCE)
+
+        pending = np.flatnonzero(distances == 0)
+        while pending.size:
+            self.iterations += 1
+
+            pending_distances = distances[pending]
+            front = pending_distances < pending_distances.min() + cheapest
+            expanded, pending = pending[front], [pending[~front]]
+
+            # The cells that can move to an expanded cell (moves are symmetric) are relaxed from it
+            expanded_distances = distances[expanded]
+            for step, costs in moves:
+                cells = expanded - step
+                relaxed = expanded_distances + costs[cells]
+                improved = relaxed < distances[cells]
+                distances[cells[improved]] = relaxed[improved]
+                pending.append(cells[improved])
+
+            pending = np.unique(np.concatenate(pending))
+
+    def chamfer(self) -> None:
+        """ Sweep the columns forward then backward, then the rows forward then backward, until no distance changes.
+        A column is relaxed from the column before it in the sweep (straight and diagonal moves), then along itself in
+        both directions (see sweep_line). Rows are swept the same way on the transposed arrays.
+
+        :return: None
+        """
+
+        walls = ~self.free[1:-1, 1:-1]
+
+        # The cost of entering each cell along a line, and jumps across walls bigger than any distance
+        costs = np.where(walls, 0, np.rint(SCALE * self.weights[1:-1, 1:-1]).astype(np.int64))
+        jump = int(costs.sum()) * 2 + 1
+        jumps = np.where(walls, jump, 0)
+
+        sweeps = []
+        for transposed in (False, True):
+            for direction in (-1, 1):
+                moves = []
+                for (dx, dy, cost), step_costs in zip(self.moves, self.step_costs):
+                    if transposed:
+                        dx, dy, step_costs = dy, dx, step_costs.T
+                    if dx == direction:
+                        moves.append((dy, step_costs))
+                sweeps.append((transposed, direction, moves))
+
+        changed = True
+        while changed:
+            self.iterations += 1
+            changed = False
+
+            for transposed, direction, moves in sweeps:
+                distances, line_walls, line_costs, line_jumps = self.distances, walls, costs, jumps
+                if transposed:
+                    distances, line_walls, line_costs, line_jumps = distances.T, walls.T, costs.T, jumps.T
+                length = distances.shape[1] - 2
+                lines = range(len(line_walls)) if direction == -1 else range(len(line_walls) - 1, -1, -1)
+
+                for line in lines:
+                    current = distances[line + 1, 1:-1]
+                    previous = distances[line + 1 + direction]
+                    relaxed = current.copy()
+                    for dy, step_costs in moves:
+                        np.minimum(relaxed, previous[1 + dy: length + 1 + dy] + step_costs[line], out=relaxed)
+
+                    costs_along, jumps_along = line_costs[line], line_jumps[line]
+                    np.minimum(relaxed, sweep_line(relaxed, costs_along, jumps_along), out=relaxed)
+                    np.minimum(relaxed, sweep_line(relaxed[::-1], costs_along[::-1], jumps_along[::-1])[::-1],
+                               out=relaxed)
+                    relaxed[(relaxed >= jump) | line_walls[line]] = NO_DISTANCE
+
+                    if (relaxed < current).any():
+                        changed = True
+                        current[...] = relaxed
+
+    def get_distance(self, node: Any) -> float:
+        """ Return the cost of a cheapest path from the node to the nearest goal, INF if it can not reach one"""
+        distance = self.distances[node.column + 1, node.row + 1]
+        return INF if distance == NO_DISTANCE else distance / SCALE
+
+    def get_direction(self, node: Any) -> Optional[Tuple[int, int]]:
+        """ Return the (column, row) offset of the first move from the node towards the nearest goal, None at a goal
+        or if none can be reached. It is the move whose cost plus the distance of the cell it enters is the distance
+        of the node.
+        """
+
+        column, row = node.column, node.row
+        distance = self.distances[column + 1, row + 1]
+        if distance == 0 or distance == NO_DISTANCE:
+            return None
+
+        for (dx, dy, cost), step_costs in zip(self.moves, self.step_costs):
+            step_cost = step_costs[column, row]
+            if step_cost != NO_DISTANCE and self.distances[column + 1 + dx, row + 1 + dy] + step_cost == distance:
+                return dx, dy
+
+    def get_path(self, start: Any) -> List[Any]:
+        """ Descend the map from the start node to the nearest goal
+
+        :param start: Starting node
+        :return: Nodes from start to goal, empty if no goal can be reached
+        """
+
+        if self.distances[start.column + 1, start.row + 1] == NO_DISTANCE:
+            return []
+
+        all_nodes = self.all_nodes
+        path = [start]
+        direction = self.get_direction(start)
+        while direction is not None:
+            node = path[-1]
+            path.append(all_nodes[node.column + direction[0]][node.row + direction[1]])
+            direction = self.get_direction(path[-1])
+
+        return path